@@ -1,9 +1,12 @@
+import importlib
+
 import streamlit as st
 from datetime import datetime, timedelta
 from utils import format_timestamp, delete_button
 from auth import require_role
 from notifications import send_notification
 from firebase_init import db, firestore
+from firestore_utils import count_documents_many
 from google.cloud.firestore_v1.base_query import FieldFilter
 
 # ----------------------------
@@ -14,7 +17,7 @@ def admin_utilities_ui():
     """Main admin utilities interface"""
     st.title("🛠️ Admin Utilities")
 
-    tab1, tab2, tab3, tab4 = st.tabs(["📊 Dashboard", "📜 Audit Logs", "🧹 Cleanup", "📦 Archive Events"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Dashboard", "📜 Audit Logs", "🧹 Cleanup", "📦 Archive Events", "🤖 AI Costs"])
 
     with tab1:
         _admin_dashboard()
@@ -24,6 +27,9 @@ def admin_utilities_ui():
         _cleanup_tools()
     with tab4:
         _archive_event_tool()
+    with tab5:
+        from llm_usage import show_llm_usage_report
+        show_llm_usage_report()
 
 # ----------------------------
 # 📊 Dashboard Snapshot
@@ -32,45 +38,44 @@ def _admin_dashboard():
     """Display admin dashboard with system statistics"""
     st.subheader("📈 App Snapshot")
     
+    stats = get_system_stats()
+    if not stats:
+        return
+
     try:
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            events = list(db.collection("events").stream())
-            active_events = len([e for e in events if e.to_dict().get("status") == "active"])
-            st.metric("Total Events", len(events))
-            st.metric("Active Events", active_events)
+            st.metric("Total Events", stats["events"]["total"])
+            st.metric("Active Events", stats["events"]["active"])
 
         with col2:
-            suggestions = list(db.collection("suggestions").where("status", "==", "pending").stream())
-            st.metric("Pending Suggestions", len(suggestions))
-            
-            users = list(db.collection("users").stream())
-            st.metric("Total Users", len(users))
+            st.metric("Pending Suggestions", stats["suggestions"]["pending"])
+            st.metric("Total Users", stats["users"]["total"])
 
         with col3:
-            recipes = list(db.collection("recipes").stream())
-            st.metric("Total Recipes", len(recipes))
-            
-            deleted_files = list(db.collection("files").where(filter=FieldFilter("deleted", "==", True)).stream())
-            st.metric("Active Files", len(files))
+            st.metric("Total Recipes", stats["recipes"]["total"])
+            st.metric("Active Files", stats["files"]["total"] - stats["files"]["deleted"])
 
         st.divider()
 
         # Additional metrics
         col4, col5, col6 = st.columns(3)
         with col4:
-            tags = list(db.collection("tags").stream())
-            st.metric("Tag Variants", len(tags))
+            st.metric("Tag Variants", stats["tags"]["total"])
         
         with col5:
-            deleted_files = list(db.collection("files").where(filter=FieldFilter("deleted", "==", True)).stream())
-            st.metric("Soft-Deleted Files", len(deleted_files))
+            st.metric("Soft-Deleted Files", stats["files"]["deleted"])
         
         with col6:
             now = datetime.utcnow()
             month_ago = now - timedelta(days=30)
-            recent_logs = list(db.collection("logs").where(filter=FieldFilter("timestamp", ">=", month_ago)).stream())
+            recent_logs = (
+                db.collection("logs")
+                .where(filter=FieldFilter("timestamp", ">=", month_ago))
+                .select(["user_id"])
+                .stream()
+            )
             unique_users = set(log.to_dict().get("user_id") for log in recent_logs if log.to_dict().get("user_id"))
             st.metric("Active Users (30d)", len(unique_users))
 
@@ -80,22 +85,16 @@ def _admin_dashboard():
         # Check for common issues
         warnings = []
         
-        if len(suggestions) > 10:
-            warnings.append(f"⚠️ {len(suggestions)} pending suggestions need review")
+        pending_suggestions = stats["suggestions"]["pending"]
+        if pending_suggestions > 10:
+            warnings.append(f"⚠️ {pending_suggestions} pending suggestions need review")
         
-        if len(deleted_files) > 50:
-            warnings.append(f"⚠️ {len(deleted_files)} deleted files could be cleaned up")
+        deleted_files = stats["files"]["deleted"]
+        if deleted_files > 50:
+            warnings.append(f"⚠️ {deleted_files} deleted files could be cleaned up")
         
-        orphaned_files = 0
-        for file_doc in files:
-            file_data = file_doc.to_dict()
-            if file_data.get("event_id"):
-                event_exists = db.collection("events").document(file_data["event_id"]).get().exists
-                if not event_exists:
-                    orphaned_files += 1
-        
-        if orphaned_files > 0:
-            warnings.append(f"⚠️ {orphaned_files} files linked to non-existent events")
+        # Orphaned-file detection needs one read per linked file; it lives
+        # behind the "Find Orphaned Files" button in the Cleanup tab.
         
         if warnings:
             for warning in warnings:
@@ -237,8 +236,9 @@ def _cleanup_tools():
                     st.write(f"- {file_data.get('filename', 'Unknown')} (linked to {file_data.get('event_id')})")
                 
                 if st.button("🧹 Unlink Orphaned Files"):
+                    from file_storage import update_file
                     for file_id, _ in orphaned:
-                        db.collection("files").document(file_id).update({"event_id": None})
+                        update_file(file_id, {"event_id": None})
                     
                     st.success(f"✅ Unlinked {len(orphaned)} orphaned files")
             else:
@@ -298,6 +298,43 @@ def _cleanup_tools():
     except Exception as e:
         st.error(f"❌ Could not check deleted files: {e}")
 
+    st.divider()
+
+    # Rebuild maintained counters from source collections
+    st.markdown("### 🔢 Rollups & Counters")
+    st.caption("Recompute pre-aggregated statistics from scratch (backfill or repair drift)")
+
+    for label, module, function, describe in ROLLUP_REBUILDS:
+        if st.button(f"🔄 {label}"):
+            try:
+                result = getattr(importlib.import_module(module), function)()
+                st.success(f"✅ {describe(result)}")
+            except Exception as e:
+                st.error(f"❌ {label} failed: {e}")
+
+
+def _describe_file_drift(drift: dict) -> str:
+    if not drift:
+        return "File statistics were already accurate"
+    return "Repaired drift: " + ", ".join(f"{k} {a}→{b}" for k, (a, b) in drift.items())
+
+
+# Rebuild buttons for the maintained rollups: (label, module, function,
+# success message from its return value). Modules are imported on click.
+ROLLUP_REBUILDS = [
+    ("Rebuild Receipt Spend Rollups", "receipts", "rebuild_receipt_rollups",
+     lambda n: f"Rebuilt spend rollups from {n} receipts"),
+    ("Rebuild Event Summary", "events", "rebuild_event_summary",
+     lambda n: f"Rebuilt event summary from {n} events"),
+    ("Rebuild Post-Event Analytics", "post_event_rollup", "rebuild_post_event_rollup",
+     lambda n: f"Rebuilt post-event analytics from {n} reviewed events"),
+    ("Rebuild AI Usage Counters", "ai_chat", "rebuild_ai_usage_rollups",
+     lambda n: f"Rebuilt AI usage counters from {n} conversations"),
+    ("Reconcile File Statistics", "file_storage", "reconcile_file_stats", _describe_file_drift),
+    ("Rebuild Tag Index", "tag_utils", "rebuild_tag_index",
+     lambda n: f"Tag index rebuilt ({n} tags)"),
+]
+
 # ----------------------------
 # 📦 Archive Events
 # ----------------------------
@@ -392,62 +429,44 @@ def _archive_event_tool():
 # 📊 System Statistics
 # ----------------------------
 def get_system_stats():
-    """Get comprehensive system statistics"""
+    """Get comprehensive system statistics.
+
+    Every figure is a server-side COUNT aggregation, so the cost does not
+    grow with the size of the collections.
+    """
     try:
-        stats = {
-            "events": {
-                "total": 0,
-                "active": 0,
-                "completed": 0,
-                "archived": 0
-            },
-            "users": {"total": 0, "admins": 0, "managers": 0},
-            "files": {"total": 0, "deleted": 0},
-            "suggestions": {"pending": 0, "approved": 0, "rejected": 0}
-        }
-        
-        # Count events
-        events = list(db.collection("events").stream())
-        stats["events"]["total"] = len(events)
-        
-        for event_doc in events:
-            event_data = event_doc.to_dict()
-            status = event_data.get("status", "planning")
-            if status == "active":
-                stats["events"]["active"] += 1
-            elif status == "complete":
-                stats["events"]["completed"] += 1
-            
-            if event_data.get("archived"):
-                stats["events"]["archived"] += 1
-        
-        # Count users
-        users = list(db.collection("users").stream())
-        stats["users"]["total"] = len(users)
-        
-        for user_doc in users:
-            user_data = user_doc.to_dict()
-            role = user_data.get("role", "viewer")
-            if role == "admin":
-                stats["users"]["admins"] += 1
-            elif role == "manager":
-                stats["users"]["managers"] += 1
-        
-        # Count files
-        files = list(db.collection("files").stream())
-        stats["files"]["total"] = len(files)
-        stats["files"]["deleted"] = len([f for f in files if f.to_dict().get("deleted")])
-        
-        # Count suggestions
-        suggestions = list(db.collection("suggestions").stream())
-        for suggestion_doc in suggestions:
-            suggestion_data = suggestion_doc.to_dict()
-            status = suggestion_data.get("status", "pending")
-            if status in stats["suggestions"]:
-                stats["suggestions"][status] += 1
-        
+        events = db.collection("events")
+        users = db.collection("users")
+        files = db.collection("files")
+        suggestions = db.collection("suggestions")
+
+        counts = count_documents_many({
+            "events.total": events,
+            "events.active": events.where(filter=FieldFilter("status", "==", "active")),
+            "events.completed": events.where(filter=FieldFilter("status", "==", "complete")),
+            "events.archived": events.where(filter=FieldFilter("archived", "==", True)),
+            "users.total": users,
+            "users.admins": users.where(filter=FieldFilter("role", "==", "admin")),
+            "users.managers": users.where(filter=FieldFilter("role", "==", "manager")),
+            "files.total": files,
+            "files.deleted": files.where(filter=FieldFilter("deleted", "==", True)),
+            "suggestions.total": suggestions,
+            "suggestions.approved": suggestions.where(filter=FieldFilter("status", "==", "approved")),
+            "suggestions.rejected": suggestions.where(filter=FieldFilter("status", "==", "rejected")),
+            "recipes.total": db.collection("recipes"),
+            "tags.total": db.collection("tags"),
+        })
+
+        stats = {}
+        for key, value in counts.items():
+            group, name = key.split(".")
+            stats.setdefault(group, {})[name] = value
+        # Legacy suggestions have no status and count as pending; a query
+        # can't match a missing field, so pending is everything not decided
+        by_status = stats["suggestions"]
+        by_status["pending"] = by_status.pop("total") - by_status["approved"] - by_status["rejected"]
         return stats
-        
+
     except Exception as e:
         st.error(f"Could not calculate system statistics: {e}")
         return None
@@ -2,28 +2,19 @@ import streamlit as st
 from datetime import datetime
 from auth import get_user_role
 from firebase_init import db
-from utils import format_date, generate_id, get_active_event, get_active_event_id, value_to_text, delete_button
+from utils import format_date, generate_id, get_active_event_id, value_to_text, delete_button
 import json
+from concurrent.futures import ThreadPoolExecutor
 from google.cloud.firestore_v1.base_query import FieldFilter
 from firebase_admin import firestore
-
-# Initialize OpenAI client
-
-try:
-    from openai import OpenAI
-    
-    api_key = st.secrets.get("openai", {}).get("api_key", "")
-    if api_key and api_key != "":
-        client = OpenAI(api_key=api_key)
-    else:
-        client = None
-        st.warning("⚠️ OpenAI API key not configured")
-except ImportError:
-    client = None
-    st.error("❌ OpenAI library not installed")
-except Exception as e:
-    client = None
-    st.error(f"❌ OpenAI initialization failed: {e}")
+from firestore_utils import counter_key, increment_counters
+from llm_gateway import chat_completion, stream_chat_completion, llm_available
+from metrics import register_queue
+from chat_history import (
+    recent_messages, compact_history, apply_compaction, clear_compaction,
+    fallback_summary, SUMMARY_TOKEN_BUDGET,
+)
+from chat_context import get_active_event_id_cached, get_event_context, format_event_context
 
 # ----------------------------
 # 💬 AI Chat Assistant UI
@@ -36,28 +27,28 @@ def ai_chat_ui(user: dict | None = None) -> None:
     if not user:
         st.warning("You must be signed in to use the assistant.")
         return
-    selected_recipe_id = st.session_state.get("selected_recipe_id")
     recipe_context = None
-    if selected_recipe_id:
-        try:
-            recipe_doc = db.collection("recipes").document(selected_recipe_id).get()
-            if recipe_doc.exists:
-                recipe_context = recipe_doc.to_dict()
-        except Exception as e:
-            st.warning(f"⚠️ Failed to load recipe context: {e}")
+    try:
+        recipe_context = _selected_recipe_context()
+    except Exception as e:
+        st.warning(f"⚠️ Failed to load recipe context: {e}")
 
 
     # Check if OpenAI is available
-    if not client:
+    if not llm_available():
         st.error("🤖 AI Assistant is currently unavailable. Please check the configuration.")
         return
 
     role = get_user_role(user)
 
+    # Pick up a history summary that finished since the last rerun
+    apply_compaction(st.session_state)
+
     # Show current context
-    active_event = get_active_event()
+    active_event_id = get_active_event_id_cached()
+    active_event = get_event_context(active_event_id) if active_event_id else None
     if active_event:
-        st.info(f"🎯 Active Event: **{active_event.get('name', 'Unknown')}** ({active_event.get('guest_count', 0)} guests)")
+        st.info(f"🎯 Active Event: **{active_event.get('name') or 'Unknown'}** ({active_event.get('guest_count') or 0} guests)")
     else:
         st.info("💡 No active event. AI will provide general catering assistance.")
 
@@ -119,6 +110,7 @@ def ai_chat_ui(user: dict | None = None) -> None:
                             handle_ai_action(action)
 
     # Chat input
+    pending = None
     with st.form("chat_input_form", clear_on_submit=True):
         user_input = st.text_area(
             "Ask your question:", 
@@ -133,51 +125,55 @@ def ai_chat_ui(user: dict | None = None) -> None:
             send_button = st.form_submit_button("Send", type="primary", use_container_width=True)
         
         if send_button and user_input.strip():
-            with st.spinner("🤖 Thinking..."):
-                response = get_openai_response(user_input.strip(), role, user, include_context)
-                
-                # Add to chat history
-                st.session_state.chat_history.append({
-                    "sender": "user",
-                    "content": user_input.strip(),
-                    "timestamp": format_date(datetime.now())
-                })
-                
-                st.session_state.chat_history.append({
-                    "sender": "ai",
-                    "content": response["content"],
-                    "actions": response.get("actions", []),
-                    "timestamp": format_date(datetime.now())
-                })
-                
-                # Log conversation
-                log_conversation(user["id"], user_input.strip(), response["content"], role)
-                
-                st.rerun()
+            pending = (user_input.strip(), include_context)
+
+    # Stream the answer below the form as tokens arrive
+    if pending:
+        prompt, include_context = pending
+        st.markdown(f"**🧑 You:** {prompt}")
+        st.markdown("**🤖 AI:**")
+        result = {}
+        # History is read for the prompt before this turn is appended
+        st.write_stream(stream_openai_response(prompt, role, user, include_context, result))
+
+        st.session_state.chat_history.append({
+            "sender": "user",
+            "content": prompt,
+            "timestamp": format_date(datetime.now())
+        })
+        st.session_state.chat_history.append({
+            "sender": "ai",
+            "content": result["content"],
+            "actions": result.get("actions", []),
+            "timestamp": format_date(datetime.now())
+        })
+
+        # Log conversation without holding up the response
+        log_conversation_async(user["id"], prompt, result["content"], role, result.get("usage"))
+        compact_history(st.session_state, _summarize_history, _log_executor.submit)
+
+        st.rerun()
 
     # Clear chat button
     if delete_button("🗑️ Clear Conversation", key="clear_chat"):
         st.session_state.chat_history = []
+        clear_compaction(st.session_state)
         st.success("Conversation cleared")
         st.rerun()
 
 # ----------------------------
 # 🤖 AI Response Generation
 # ----------------------------
-def get_openai_response(prompt: str, role: str, user: dict, include_context: bool = True) -> dict:
-    """Get response from OpenAI with full context"""
-    if not client:
-        return {
-            "content": "⚠️ AI service is not available. Please check the configuration.",
-            "actions": []
-        }
-    
-    try:
-        # Build context
-        context = build_context(user, include_context)
-        
-        # System message
-        system_message = f"""You are a professional catering assistant for Mountain Medicine Catering. 
+CHAT_MODEL = "gpt-4o-mini"
+CHAT_MAX_TOKENS = 1000
+
+def _build_messages(prompt: str, role: str, user: dict, include_context: bool = True) -> list:
+    """System prompt, recent history and the new prompt as chat messages"""
+    # Build context
+    context = build_context(user, include_context)
+
+    # System message
+    system_message = f"""You are a professional catering assistant for Mountain Medicine Catering. 
 You help with event planning, menu design, shopping lists, timelines, and coordination.
 
 User role: {role}
@@ -188,27 +184,50 @@ When relevant, suggest concrete actions the user can take.
 Format your responses with clear sections using markdown.
 If you suggest creating lists or documents, format them properly."""
 
-        # Get recent chat history for context
-        recent_history = []
-        for chat in st.session_state.get("chat_history", [])[-10:]:
-            recent_history.append({
-                "role": "user" if chat["sender"] == "user" else "assistant",
-                "content": chat["content"]
-            })
+    # Older turns travel as a rolling summary, recent ones verbatim
+    summary = st.session_state.get("chat_summary")
+    if summary:
+        system_message += f"\n\nEarlier in this conversation:\n{summary}"
+
+    recent_history = []
+    for chat in recent_messages(st.session_state.get("chat_history", [])):
+        recent_history.append({
+            "role": "user" if chat["sender"] == "user" else "assistant",
+            "content": chat["content"]
+        })
 
-        # Build messages
-        messages = [
-            {"role": "system", "content": system_message}
-        ]
-        messages.extend(recent_history)
-        messages.append({"role": "user", "content": prompt})
+    # Build messages
+    messages = [
+        {"role": "system", "content": system_message}
+    ]
+    messages.extend(recent_history)
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+def _usage_dict(usage) -> dict:
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+    }
+
+def get_openai_response(prompt: str, role: str, user: dict, include_context: bool = True) -> dict:
+    """Get response from OpenAI with full context"""
+    if not llm_available():
+        return {
+            "content": "⚠️ AI service is not available. Please check the configuration.",
+            "actions": []
+        }
+    
+    try:
+        messages = _build_messages(prompt, role, user, include_context)
 
         # Get response
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = chat_completion(
+            "chat",
+            model=CHAT_MODEL,
             messages=messages,
             temperature=0.7,
-            max_tokens=1000,
+            max_tokens=CHAT_MAX_TOKENS,
         )
         
         content = response.choices[0].message.content.strip()
@@ -218,7 +237,8 @@ If you suggest creating lists or documents, format them properly."""
         
         return {
             "content": content,
-            "actions": actions
+            "actions": actions,
+            "usage": _usage_dict(getattr(response, "usage", None)),
         }
         
     except Exception as e:
@@ -227,12 +247,78 @@ If you suggest creating lists or documents, format them properly."""
             "actions": []
         }
 
+def _summarize_history(previous: str, chats: list) -> str:
+    """Fold older turns into the rolling conversation summary"""
+    if not llm_available():
+        return fallback_summary(previous, chats)
+    transcript = "\n".join(
+        f"{'User' if c.get('sender') == 'user' else 'Assistant'}: {c.get('content', '')}"
+        for c in chats
+    )
+    response = chat_completion(
+        "chat_summary",
+        model=CHAT_MODEL,
+        messages=[
+            {"role": "system", "content": (
+                "Update the running summary of a catering planning chat. Keep decisions, "
+                "numbers, dates, dietary needs and open questions. Use short bullet points."
+            )},
+            {"role": "user", "content": f"Current summary:\n{previous or '(none)'}\n\nNew turns:\n{transcript}"},
+        ],
+        temperature=0.2,
+        max_tokens=SUMMARY_TOKEN_BUDGET,
+    )
+    return response.choices[0].message.content.strip()
+
+def stream_openai_response(prompt: str, role: str, user: dict, include_context: bool, result: dict):
+    """Yield response text as it arrives (for st.write_stream).
+
+    When the stream ends ``result`` holds the same keys as
+    get_openai_response(): content, actions and usage.
+    """
+    result.update(content="", actions=[], usage={})
+    if not llm_available():
+        result["content"] = "⚠️ AI service is not available. Please check the configuration."
+        yield result["content"]
+        return
+
+    chunks = []
+    try:
+        messages = _build_messages(prompt, role, user, include_context)
+        # The final chunk carries token usage
+        stream = stream_chat_completion(
+            "chat",
+            model=CHAT_MODEL,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=CHAT_MAX_TOKENS,
+            stream_options={"include_usage": True},
+        )
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                result["usage"] = _usage_dict(chunk.usage)
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                chunks.append(text)
+                yield text
+    except Exception as e:
+        error = f"\n\n⚠️ I encountered an error: {str(e)}. Please try again or rephrase your question."
+        chunks.append(error)
+        yield error
+
+    result["content"] = "".join(chunks).strip()
+    # Actions are only extracted once the whole response is known
+    result["actions"] = extract_actions(result["content"], prompt)
+
 # ----------------------------
 # 🎯 Quick Action Handlers
 # ----------------------------
 def handle_quick_action(action_type: str):
     """Handle quick action button clicks"""
-    active_event = get_active_event()
+    active_event_id = get_active_event_id_cached()
+    active_event = get_event_context(active_event_id) if active_event_id else None
     
     if not active_event and action_type != "general":
         st.warning("Please activate an event first to use this quick action.")
@@ -246,20 +332,19 @@ def handle_quick_action(action_type: str):
     }
     
     if action_type in prompts:
-        # Add to chat as if user typed it
-        st.session_state.setdefault("chat_history", []).append({
-            "sender": "user",
-            "content": prompts[action_type],
-            "timestamp": format_date(datetime.now())
-        })
-        
         # Get AI response
         user = st.session_state.get("user")
         role = get_user_role(user)
         
         with st.spinner("🤖 Generating..."):
             response = get_openai_response(prompts[action_type], role, user, True)
-            
+
+            # Add to chat as if user typed it
+            st.session_state.setdefault("chat_history", []).append({
+                "sender": "user",
+                "content": prompts[action_type],
+                "timestamp": format_date(datetime.now())
+            })
             st.session_state.chat_history.append({
                 "sender": "ai",
                 "content": response["content"],
@@ -267,51 +352,49 @@ def handle_quick_action(action_type: str):
                 "timestamp": format_date(datetime.now())
             })
             
-            log_conversation(user["id"], prompts[action_type], response["content"], role)
+            log_conversation_async(user["id"], prompts[action_type], response["content"], role, response.get("usage"))
+            compact_history(st.session_state, _summarize_history, _log_executor.submit)
         
         st.rerun()
 
 # ----------------------------
 # 🔧 Helper Functions
 # ----------------------------
+def _selected_recipe_context() -> dict | None:
+    """Selected recipe, read once per selection and kept in the session."""
+    recipe_id = st.session_state.get("selected_recipe_id")
+    if not recipe_id:
+        return None
+    cached = st.session_state.get("chat_recipe_context")
+    if cached and cached.get("id") == recipe_id:
+        return cached["recipe"]
+    recipe_doc = db.collection("recipes").document(recipe_id).get()
+    recipe = recipe_doc.to_dict() if recipe_doc.exists else None
+    st.session_state["chat_recipe_context"] = {"id": recipe_id, "recipe": recipe}
+    return recipe
+
 def build_context(user: dict, include_event: bool = True) -> str:
-    """Build context string for AI"""
+    """Build context string for AI from the cached recipe and event snapshots"""
     context_parts = []
-        # Add recipe context if available
-    recipe_id = st.session_state.get("selected_recipe_id")
-    if recipe_id:
-        try:
-            recipe_doc = db.collection("recipes").document(recipe_id).get()
-            if recipe_doc.exists:
-                recipe = recipe_doc.to_dict()
-                context_parts.append(f"Recipe: {recipe.get('name', 'Unnamed')}")
-                context_parts.append("Ingredients:\n" + recipe.get("ingredients", "—"))
-                context_parts.append("Instructions:\n" + recipe.get("instructions", "—"))
-        except Exception as e:
-            context_parts.append("⚠️ Failed to load selected recipe context.")
+    # Add recipe context if available
+    try:
+        recipe = _selected_recipe_context()
+        if recipe:
+            context_parts.append(f"Recipe: {recipe.get('name', 'Unnamed')}")
+            context_parts.append("Ingredients:\n" + value_to_text(recipe.get("ingredients", "—")))
+            context_parts.append("Instructions:\n" + value_to_text(recipe.get("instructions", "—")))
+    except Exception:
+        context_parts.append("⚠️ Failed to load selected recipe context.")
 
-    
     if include_event:
-        active_event = get_active_event()
-        if active_event:
-            context_parts.append(f"Active Event: {active_event.get('name', 'Unknown')}")
-            context_parts.append(f"Date: {active_event.get('start_date', 'TBD')} to {active_event.get('end_date', 'TBD')}")
-            context_parts.append(f"Location: {active_event.get('location', 'TBD')}")
-            context_parts.append(f"Guests: {active_event.get('guest_count', 0)}")
-            context_parts.append(f"Staff: {active_event.get('staff_count', 0)}")
-            
-            if active_event.get('dietary_restrictions'):
-                context_parts.append(f"Dietary Restrictions: {active_event['dietary_restrictions']}")
-            if active_event.get('food_allergies'):
-                context_parts.append(f"Allergies: {active_event['food_allergies']}")
-            
-            # Get menu items count
-            try:
-                menu_count = len(list(db.collection("menus").where("event_id", "==", active_event["id"]).stream()))
-                context_parts.append(f"Menu Items: {menu_count}")
-            except:
-                pass
-    
+        try:
+            event_id = get_active_event_id_cached()
+            snapshot = get_event_context(event_id) if event_id else None
+        except Exception:
+            snapshot = None
+        if snapshot:
+            context_parts.extend(format_event_context(snapshot))
+
     return "\n".join(context_parts) if context_parts else "No active event context."
 
 def extract_actions(content: str, prompt: str) -> list:
@@ -419,63 +502,168 @@ def save_ai_shopping_list(event_id: str, content: str):
                     "created_by": "ai_assistant"
                 })
 
-def log_conversation(user_id: str, query: str, response: str, user_role: str):
-    """Log conversation to database"""
+def classify_query(query: str) -> str:
+    """Bucket a chat query into a usage category."""
+    query = (query or "").lower()
+    if "shopping" in query or "grocery" in query:
+        return "shopping"
+    if "menu" in query or "food" in query or "dish" in query:
+        return "menu"
+    if "timeline" in query or "schedule" in query:
+        return "timeline"
+    if "quantity" in query or "portion" in query or "how much" in query:
+        return "quantities"
+    return "other"
+
+def log_conversation(user_id: str, query: str, response: str, user_role: str, usage: dict | None = None):
+    """Log conversation to database and roll it into the usage counters.
+
+    The log entry, the per-day document (ai_usage_daily/<YYYY-MM-DD>) and
+    the per-user document (ai_usage_users/<user_id>) are written in one
+    batch, so the analytics view never has to scan ai_logs.
+    """
     try:
-        db.collection("ai_logs").add({
+        now = datetime.utcnow()
+        category = classify_query(query)
+        usage = usage or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        user_key = counter_key(user_id)
+
+        batch = db.batch()
+        batch.set(db.collection("ai_logs").document(), {
             "query": query,
             "response": response,
             "user_id": user_id,
             "user_role": user_role,
-            "created_at": datetime.utcnow(),
-            "event_id": get_active_event_id()
+            "category": category,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "created_at": now,
+            "event_id": get_active_event_id_cached()
         })
+        increment_counters(
+            db.collection("ai_usage_daily").document(now.strftime("%Y-%m-%d")),
+            {
+                "queries": 1,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                f"categories.{category}": 1,
+                f"users.{user_key}.queries": 1,
+                f"users.{user_key}.tokens": prompt_tokens + completion_tokens,
+            },
+            extra={"date": now.strftime("%Y-%m-%d")},
+            writer=batch,
+        )
+        increment_counters(
+            db.collection("ai_usage_users").document(user_key),
+            {
+                "queries": 1,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                f"categories.{category}": 1,
+            },
+            extra={"user_id": user_id, "user_role": user_role, "last_query_at": now},
+            writer=batch,
+        )
+        batch.commit()
     except Exception as e:
         print(f"Failed to log conversation: {e}")
 
+# One background worker keeps log order and never blocks a chat turn; it
+# also runs history summaries (see chat_history.compact_history)
+_log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-log")
+register_queue("ai_log_writer", _log_executor._work_queue.qsize)
+
+def log_conversation_async(user_id: str, query: str, response: str, user_role: str, usage: dict | None = None):
+    """Queue log_conversation() on the background writer."""
+    _log_executor.submit(log_conversation, user_id, query, response, user_role, usage)
+
+def rebuild_ai_usage_rollups() -> int:
+    """Batch job: rebuild daily and per-user usage counters from ai_logs.
+
+    Older logs have no token counts; they are counted with zero tokens.
+    Returns the number of log entries processed.
+    """
+    daily: dict = {}
+    users: dict = {}
+    count = 0
+    for doc in db.collection("ai_logs").select(
+        ["query", "user_id", "user_role", "created_at", "category", "prompt_tokens", "completion_tokens"]
+    ).stream():
+        log = doc.to_dict()
+        created = log.get("created_at")
+        if not isinstance(created, datetime):
+            continue
+        count += 1
+        day = created.strftime("%Y-%m-%d")
+        category = log.get("category") or classify_query(log.get("query", ""))
+        pt, ct = log.get("prompt_tokens", 0) or 0, log.get("completion_tokens", 0) or 0
+        user_key = counter_key(log.get("user_id"))
+
+        d = daily.setdefault(day, {"date": day, "queries": 0, "prompt_tokens": 0, "completion_tokens": 0, "categories": {}, "users": {}})
+        d["queries"] += 1
+        d["prompt_tokens"] += pt
+        d["completion_tokens"] += ct
+        d["categories"][category] = d["categories"].get(category, 0) + 1
+        du = d["users"].setdefault(user_key, {"queries": 0, "tokens": 0})
+        du["queries"] += 1
+        du["tokens"] += pt + ct
+
+        u = users.setdefault(user_key, {"user_id": log.get("user_id"), "user_role": log.get("user_role"), "queries": 0, "prompt_tokens": 0, "completion_tokens": 0, "categories": {}, "last_query_at": created})
+        u["queries"] += 1
+        u["prompt_tokens"] += pt
+        u["completion_tokens"] += ct
+        u["categories"][category] = u["categories"].get(category, 0) + 1
+        u["last_query_at"] = max(u["last_query_at"], created)
+
+    batch, pending = db.batch(), 0
+    for collection, docs in (("ai_usage_daily", daily), ("ai_usage_users", users)):
+        for doc_id, data in docs.items():
+            batch.set(db.collection(collection).document(doc_id), data)
+            pending += 1
+            if pending >= 400:
+                batch.commit()
+                batch, pending = db.batch(), 0
+    if pending:
+        batch.commit()
+    return count
+
 # ----------------------------
 # 📊 AI Usage Analytics
 # ----------------------------
-def show_ai_usage_analytics():
-    """Show AI usage statistics"""
+def show_ai_usage_analytics(days: int = 90):
+    """Show AI usage statistics from the pre-aggregated daily counters"""
     st.subheader("📊 AI Assistant Usage")
     
     try:
-        # Get usage logs
-        logs = list(db.collection("ai_logs").order_by("created_at", direction=firestore.Query.DESCENDING).limit(100).stream())
+        day_docs = list(
+            db.collection("ai_usage_daily")
+            .order_by("date", direction=firestore.Query.DESCENDING)
+            .limit(days)
+            .stream()
+        )
         
-        if not logs:
+        if not day_docs:
             st.info("No AI usage data yet.")
             return
         
-        # Calculate metrics
-        total_queries = len(logs)
-        unique_users = len(set(log.to_dict().get("user_id") for log in logs))
+        series = sorted((d.to_dict() for d in day_docs), key=lambda d: d.get("date", ""))
         
-        # Common query types
-        query_types = {
-            "shopping": 0,
-            "menu": 0,
-            "timeline": 0,
-            "quantities": 0,
-            "other": 0
-        }
-        
-        for log in logs:
-            query = log.to_dict().get("query", "").lower()
-            if "shopping" in query or "grocery" in query:
-                query_types["shopping"] += 1
-            elif "menu" in query or "food" in query or "dish" in query:
-                query_types["menu"] += 1
-            elif "timeline" in query or "schedule" in query:
-                query_types["timeline"] += 1
-            elif "quantity" in query or "portion" in query or "how much" in query:
-                query_types["quantities"] += 1
-            else:
-                query_types["other"] += 1
+        # Calculate metrics
+        total_queries = sum(d.get("queries", 0) for d in series)
+        total_tokens = sum(d.get("prompt_tokens", 0) + d.get("completion_tokens", 0) for d in series)
+        users = set()
+        query_types = {}
+        for d in series:
+            users.update(d.get("users", {}).keys())
+            for qtype, count in d.get("categories", {}).items():
+                query_types[qtype] = query_types.get(qtype, 0) + count
+        unique_users = len(users)
         
         # Display metrics
-        col1, col2, col3 = st.columns(3)
+        st.caption(f"Last {len(series)} active days")
+        col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             st.metric("Total Queries", total_queries)
@@ -484,6 +672,18 @@ def show_ai_usage_analytics():
         with col3:
             avg_per_user = total_queries / unique_users if unique_users > 0 else 0
             st.metric("Avg Queries/User", f"{avg_per_user:.1f}")
+        with col4:
+            st.metric("Tokens Used", f"{total_tokens:,}")
+        
+        # Daily trend
+        st.markdown("#### Daily Usage")
+        st.line_chart({
+            "queries": {d["date"]: d.get("queries", 0) for d in series},
+        })
+        st.bar_chart({
+            "prompt tokens": {d["date"]: d.get("prompt_tokens", 0) for d in series},
+            "completion tokens": {d["date"]: d.get("completion_tokens", 0) for d in series},
+        })
         
         # Query type breakdown
         st.markdown("#### Query Types")
@@ -4,25 +4,14 @@ import tempfile
 import mimetypes
 import csv
 import re
-import openai
-import fitz  # PyMuPDF
-from PIL import Image
-import pytesseract
-
-# Check if Tesseract is available
-try:
-    tesseract_version = pytesseract.get_tesseract_version()
-    print(f"Tesseract version: {tesseract_version}")
-except Exception as e:
-    print(f"WARNING: Tesseract not found or not configured: {e}")
-from docx import Document
 import requests
-from bs4 import BeautifulSoup
 import json
 from datetime import datetime
 import streamlit as st
 from firebase_init import db, firestore
 from utils import normalize_keys, normalize_recipe_quantities
+from llm_gateway import LLM_MAX_IN_FLIGHT, LLMBusy, chat_completion, llm_available
+from tracing import traced
 from recipes import (
     save_recipe_to_firestore,
     save_event_to_firestore,
@@ -30,26 +19,26 @@ from recipes import (
     save_ingredient_to_firestore,
 )
 
-# Initialize OpenAI client
-try:
-    # Check for environment variable first (which might be overriding)
-    env_key = os.getenv("OPENAI_API_KEY")
-    if env_key:
-        print(f"WARNING: OPENAI_API_KEY environment variable is set and starts with: {env_key[:10]}...")
-    
-    # Use secrets
-    api_key = st.secrets["openai"]["api_key"]
-    
-    # The OpenAI library might be picking up an env var instead of our provided key
-    # Force it to use our key by clearing any env var
-    if "OPENAI_API_KEY" in os.environ:
-        del os.environ["OPENAI_API_KEY"]
-    
-    client = openai.OpenAI(api_key=api_key)
-except Exception as e:
-    print(f"Failed to initialize OpenAI client: {e}")
-    st.error(f"Failed to initialize OpenAI: {str(e)}")
-    client = None
+# --------------------------------------------
+# 📦 Lazy Heavy Imports
+# --------------------------------------------
+# PyMuPDF, Pillow, pytesseract, python-docx and BeautifulSoup are imported
+# where they are used, so importing this module (and every tab that does)
+# stays cheap until a file is actually parsed.
+
+_tesseract_checked = False
+
+def _pytesseract():
+    """pytesseract, checking once (on first OCR) that the tesseract binary is there."""
+    global _tesseract_checked
+    import pytesseract
+    if not _tesseract_checked:
+        _tesseract_checked = True
+        try:
+            print(f"Tesseract version: {pytesseract.get_tesseract_version()}")
+        except Exception as e:
+            print(f"WARNING: Tesseract not found or not configured: {e}")
+    return pytesseract
 
 # --------------------------------------------
 # 🧹 Central Cleaning & Validation Utils
@@ -78,6 +67,7 @@ def is_meaningful_recipe(recipe: dict) -> bool:
 # 🧠 Main Entry Point (Patched)
 # --------------------------------------------
 
+@traced(category="extract")
 def parse_file(uploaded_file, target_type="all", user_id=None, file_id=None):
     st.info("📄 Processing file...")
     print(f"📄 STARTING parse_file() - File: {getattr(uploaded_file, 'name', 'Unknown')}, Type: {getattr(uploaded_file, 'type', 'Unknown')}")
@@ -143,6 +133,7 @@ def parse_file(uploaded_file, target_type="all", user_id=None, file_id=None):
 # 📄 Text Extraction
 # --------------------------------------------
 
+@traced(category="extract")
 def extract_text(uploaded_file):
     mime_type, _ = mimetypes.guess_type(uploaded_file.name)
     
@@ -181,9 +172,11 @@ def extract_text(uploaded_file):
         print(f"Text extraction error: {e}")
         return ""
 
+@traced(category="extract")
 def extract_text_from_pdf(uploaded_file):
     text = ""
     try:
+        import fitz  # PyMuPDF
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
             tmp.write(uploaded_file.read())
             tmp_path = tmp.name
@@ -196,6 +189,7 @@ def extract_text_from_pdf(uploaded_file):
         print(f"PDF parse error: {e}")
     return text
 
+@traced(category="extract")
 def extract_text_with_vision(uploaded_file):
     """Use OpenAI Vision API to extract text from image"""
     try:
@@ -205,15 +199,16 @@ def extract_text_with_vision(uploaded_file):
         # Encode image to base64
         image_data = base64.b64encode(uploaded_file.read()).decode('utf-8')
         
-        # Check if client is initialized
-        if not client:
+        # Check if the AI gateway is configured
+        if not llm_available():
             st.error("❌ OpenAI client not initialized")
             return ""
             
         st.info("🔍 Using Vision API to extract text from image...")
         
         # Create vision request with updated model
-        response = client.chat.completions.create(
+        response = chat_completion(
+            "vision_extract",
             model="gpt-4o",  # Updated model that supports vision
             messages=[
                 {
@@ -247,8 +242,12 @@ def extract_text_with_vision(uploaded_file):
             st.error("❌ OpenAI API key issue. Please check your configuration.")
         return ""
 
+@traced(category="extract")
 def extract_text_from_image(uploaded_file):
     try:
+        from PIL import Image
+        pytesseract = _pytesseract()
+
         # Reset file pointer
         uploaded_file.seek(0)
         
@@ -312,6 +311,7 @@ def extract_text_from_image(uploaded_file):
         print(f"Image OCR error: {e}")
         return ""
 
+@traced(category="extract")
 def extract_text_from_csv(uploaded_file):
     try:
         text = uploaded_file.read().decode("utf-8", errors="ignore")
@@ -322,8 +322,10 @@ def extract_text_from_csv(uploaded_file):
         print(f"CSV parse error: {e}")
         return ""
 
+@traced(category="extract")
 def extract_text_from_docx(uploaded_file):
     try:
+        from docx import Document
         document = Document(uploaded_file)
         return "\n".join([para.text for para in document.paragraphs])
     except Exception as e:
@@ -340,6 +342,7 @@ from urllib.parse import urljoin
 
 def extract_image_from_pdf(uploaded_file):
     try:
+        import fitz  # PyMuPDF
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
             tmp.write(uploaded_file.read())
             tmp_path = tmp.name
@@ -364,6 +367,7 @@ def extract_image_from_pdf(uploaded_file):
 
 def extract_image_from_docx_file(uploaded_file):
     try:
+        from docx import Document
         document = Document(uploaded_file)
         for rel in document.part._rels.values():
             target = rel.target_part
@@ -376,6 +380,7 @@ def extract_image_from_docx_file(uploaded_file):
     return None
 
 
+@traced(category="extract")
 def extract_image_from_file(uploaded_file):
     """Upload the first discovered image to Firebase Storage and return its URL."""
     from firebase_init import get_bucket
@@ -431,12 +436,51 @@ def extract_image_from_soup(soup, base_url):
 # 🤖 AI Prompt Routing (Patched)
 # --------------------------------------------
 
-def query_ai_parser(raw_text, target_type):
-    if not client:
+@traced(category="extract")
+def query_ai_parser(raw_text, target_type="recipes", mode=None, feature="parse_file"):
+    # ``feature`` names the caller in the LLM usage rollups and metrics
+    # Recipe scaling passes the instruction and recipe as a dict
+    if mode == "scaling":
+        target_type = "recipes"
+    if not isinstance(raw_text, str):
+        raw_text = json.dumps(raw_text, default=str)
+
+    if not llm_available():
         st.error("❌ OpenAI client not initialized. Please check your API key in .streamlit/secrets.toml")
         st.info("💡 Add your OpenAI API key to .streamlit/secrets.toml:\n[openai]\napi_key = \"sk-...\"")
         return {}
-    
+
+    try:
+        return _request_ai_parse(raw_text, target_type, feature=feature)
+
+    except json.JSONDecodeError:
+        st.error("❌ Failed to parse AI response as valid JSON.")
+        return {}
+
+    except Exception as e:
+        error_msg = str(e)
+        if "invalid_api_key" in error_msg or "401" in error_msg:
+            # Extract the key that's being used from the error message
+            key_match = re.search(r'provided: (\S+)\.', error_msg)
+            if key_match:
+                bad_key = key_match.group(1)
+                st.error(f"❌ Invalid OpenAI API key being used: {bad_key[:20]}...")
+                st.info(f"Expected key from secrets starts with: {st.secrets['openai']['api_key'][:20]}...")
+            else:
+                st.error("❌ Invalid OpenAI API key. Please check your configuration.")
+            st.info("💡 Check .streamlit/secrets.toml and ensure no OPENAI_API_KEY environment variable is set.")
+        else:
+            st.error(f"OpenAI error: {e}")
+        return {}
+
+
+def _request_ai_parse(raw_text: str, target_type: str = "recipes", feature: str = "parse_file") -> dict:
+    """The parser call itself, free of Streamlit calls so worker threads can use it.
+
+    ``feature`` is the name the call is recorded under in llm_usage and
+    mm_ai_calls_total. Raises json.JSONDecodeError for a non-JSON reply
+    and the client's exception for API errors.
+    """
     system_prompt = (
         "You are an expert data parser. Extract only structured data from unstructured text.\n"
         "Return only a JSON object using proper capitalization.\n"
@@ -471,68 +515,128 @@ Only return a JSON object.
 ```
 """
 
+    response = chat_completion(
+        feature,
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        temperature=0.3,
+        response_format={"type": "json_object"}
+    )
+
+    raw_output = response.choices[0].message.content
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.3,
-            response_format={"type": "json_object"}
-        )
+        return json.loads(raw_output)
+    except json.JSONDecodeError:
+        match = re.search(r"\{.*\}", raw_output, re.DOTALL)
+        if match:
+            return json.loads(match.group(0))
+        raise
 
-        raw_output = response.choices[0].message.content
-        # print("🔍 AI raw output:", raw_output)  # Debug only
+# --------------------------------------------
+# 🌐 Shared HTTP Session
+# --------------------------------------------
 
-        try:
-            return json.loads(raw_output)
-        except json.JSONDecodeError:
-            match = re.search(r"\{.*\}", raw_output, re.DOTALL)
-            if match:
-                return json.loads(match.group(0))
-            raise
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from page_cache import fetch_with_cache
+
+URL_FETCH_TIMEOUT = (5, 15)  # (connect, read) seconds
+URL_FETCH_MAX_PER_HOST = 4
+URL_BATCH_MAX_WORKERS = 8
+# A batch worker whose parse call found the shared LLM gateway busy for its
+# whole queue timeout tries again this many times before giving up on a URL
+URL_BATCH_BUSY_RETRIES = 2
+
+_REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+_http_session = None
+
+
+def get_http_session() -> requests.Session:
+    """Return the process-wide pooled session used for recipe page fetches.
+
+    Each host gets its own connection pool capped at URL_FETCH_MAX_PER_HOST;
+    with pool_block=True extra workers wait for a free connection instead of
+    opening more sockets against the same site.
+    """
+    global _http_session
+    if _http_session is None:
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=URL_FETCH_MAX_PER_HOST,
+            pool_block=True,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.headers.update(_REQUEST_HEADERS)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _http_session = session
+    return _http_session
+
+
+@traced(category="extract")
+def fetch_recipe_page(url: str) -> tuple[str, str | None]:
+    """Download a recipe page and return (page_text, image_url).
+
+    Pages are served from the on-disk page cache when still valid, so
+    re-imports only revalidate instead of downloading again.
+    Raises requests.exceptions.RequestException on network/HTTP errors.
+    """
+    from bs4 import BeautifulSoup
+    html = fetch_with_cache(get_http_session(), url, timeout=URL_FETCH_TIMEOUT)
+    soup = BeautifulSoup(html, "html.parser")
+    text = soup.get_text(separator="\n")
+    image_url = extract_image_from_soup(soup, url)
+    return text, image_url
+
+
+def _recipe_from_page_text(text: str, image_url: str | None, parser=query_ai_parser, feature: str = "parse_url") -> dict:
+    """Run the AI parser over page text and normalize the first recipe."""
+    cleaned_text = clean_raw_text(text)
+    parsed = parser(cleaned_text, "recipes", feature=feature)
 
-    except json.JSONDecodeError:
-        st.error("❌ Failed to parse AI response as valid JSON.")
-        return {}
+    # API may return the recipe nested under a "recipes" key
+    recipe = parsed
+    if isinstance(parsed, dict) and "recipes" in parsed:
+        recipe = parsed["recipes"]
+        if isinstance(recipe, list):
+            recipe = recipe[0] if recipe else {}
 
-    except Exception as e:
-        error_msg = str(e)
-        if "invalid_api_key" in error_msg or "401" in error_msg:
-            # Extract the key that's being used from the error message
-            import re
-            key_match = re.search(r'provided: (\S+)\.', error_msg)
-            if key_match:
-                bad_key = key_match.group(1)
-                st.error(f"❌ Invalid OpenAI API key being used: {bad_key[:20]}...")
-                st.info(f"Expected key from secrets starts with: {st.secrets['openai']['api_key'][:20]}...")
-            else:
-                st.error("❌ Invalid OpenAI API key. Please check your configuration.")
-            st.info("💡 Check .streamlit/secrets.toml and ensure no OPENAI_API_KEY environment variable is set.")
-        else:
-            st.error(f"OpenAI error: {e}")
-        return {}
+    # Normalize key casing for downstream logic
+    recipe = normalize_keys(recipe)
+    normalize_recipe_quantities(recipe)
+    if image_url and not recipe.get("image_url"):
+        recipe["image_url"] = image_url
+    return recipe
 
 # --------------------------------------------
 # 🌐 Parse Recipe From URL (Patched)
 # --------------------------------------------
 
+@traced(category="extract")
 def parse_recipe_from_url(url: str) -> dict:
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
-        resp = requests.get(url, headers=headers, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        text = soup.get_text(separator="\n")
-        image_url = extract_image_from_soup(soup, url)
+        text, image_url = fetch_recipe_page(url)
     except requests.exceptions.RequestException as e:
         st.error(f"Failed to fetch page: {e}")
         if "403" in str(e) or "forbidden" in str(e).lower():
@@ -542,27 +646,12 @@ def parse_recipe_from_url(url: str) -> dict:
         st.error(f"Error parsing URL: {e}")
         return {}
 
-    cleaned_text = clean_raw_text(text)
-    
     # If OpenAI is not available, provide manual entry option
-    if not client:
+    if not llm_available():
         st.warning("⚠️ AI parsing is not available. Please use manual entry or upload a file.")
         return {}
-    
-    parsed = query_ai_parser(cleaned_text, "recipes")
 
-    # API may return the recipe nested under a "recipes" key
-    recipe = parsed
-    if isinstance(parsed, dict) and "recipes" in parsed:
-        recipe = parsed["recipes"]
-        if isinstance(recipe, list):
-            recipe = recipe[0] if recipe else {}
-
-    # Normalize key casing for downstream logic
-    recipe = normalize_keys(recipe)
-    normalize_recipe_quantities(recipe)
-    if image_url and not recipe.get("image_url"):
-        recipe["image_url"] = image_url
+    recipe = _recipe_from_page_text(text, image_url)
 
     if not is_meaningful_recipe(recipe):
         st.warning(
@@ -572,10 +661,86 @@ def parse_recipe_from_url(url: str) -> dict:
 
     return recipe
 
+# --------------------------------------------
+# 📚 Batch Import From URLs
+# --------------------------------------------
+
+def _import_one_url(url: str) -> dict:
+    result = {"url": url, "status": "ok", "recipe": {}, "error": None}
+    try:
+        text, image_url = fetch_recipe_page(url)
+    except requests.exceptions.RequestException as e:
+        result.update(status="fetch_failed", error=str(e))
+        return result
+    except Exception as e:
+        result.update(status="error", error=str(e))
+        return result
+
+    # Runs in a worker thread with no ScriptRunContext: errors go back in the
+    # result for the caller to show, never through st.*
+    try:
+        for attempt in range(URL_BATCH_BUSY_RETRIES + 1):
+            try:
+                recipe = _recipe_from_page_text(text, image_url, parser=_request_ai_parse, feature="parse_url_batch")
+                break
+            except LLMBusy:
+                if attempt == URL_BATCH_BUSY_RETRIES:
+                    raise
+    except json.JSONDecodeError:
+        result.update(status="parse_failed", error="AI response was not valid JSON")
+        return result
+    except Exception as e:
+        result.update(status="parse_failed", error=f"{type(e).__name__}: {e}")
+        return result
+
+    if not is_meaningful_recipe(recipe):
+        result.update(status="unusable", recipe=recipe, error="Recipe content appears incomplete")
+        return result
+
+    result["recipe"] = recipe
+    return result
+
+
+def parse_recipes_from_urls(urls: list[str], max_workers: int | None = None) -> list[dict]:
+    """Fetch and parse many recipe URLs concurrently.
+
+    Pages are downloaded through the shared pooled session and parsed in a
+    thread pool no larger than the LLM gateway's in-flight cap by default,
+    so workers queue on the pool rather than time out waiting for a slot. Returns one result per input URL, in input order:
+    {"url", "status", "recipe", "error"} where status is one of
+    ok / fetch_failed / parse_failed / unusable / invalid_url / error.
+    """
+    cleaned = [u.strip() for u in urls if u and u.strip()]
+    results: list[dict | None] = [None] * len(cleaned)
+
+    if not llm_available():
+        return [
+            {"url": u, "status": "error", "recipe": {}, "error": "OpenAI client not initialized"}
+            for u in cleaned
+        ]
+
+    pending = []
+    for idx, url in enumerate(cleaned):
+        if urlparse(url).scheme not in ("http", "https"):
+            results[idx] = {"url": url, "status": "invalid_url", "recipe": {}, "error": "Not an http(s) URL"}
+        else:
+            pending.append((idx, url))
+
+    if max_workers is None:
+        max_workers = min(URL_BATCH_MAX_WORKERS, LLM_MAX_IN_FLIGHT)
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as pool:
+            futures = {idx: pool.submit(_import_one_url, url) for idx, url in pending}
+            for idx, future in futures.items():
+                results[idx] = future.result()
+
+    return results
+
 # --------------------------------------------
 # 📄 Parse Recipe From File
 # --------------------------------------------
 
+@traced(category="extract")
 def parse_recipe_from_file(uploaded_file) -> dict:
     """Extract text from an uploaded file and parse the first recipe."""
     raw_text = extract_text(uploaded_file)
@@ -584,7 +749,7 @@ def parse_recipe_from_file(uploaded_file) -> dict:
 
     image_url = extract_image_from_file(uploaded_file)
     cleaned_text = clean_raw_text(raw_text)
-    parsed = query_ai_parser(cleaned_text, "recipes")
+    parsed = query_ai_parser(cleaned_text, "recipes", feature="parse_recipe_file")
 
     recipe = parsed
     if isinstance(parsed, dict) and "recipes" in parsed:
@@ -2,6 +2,7 @@
 
 import streamlit as st
 from firebase_init import db
+from chat_context import invalidate_event_context
 from utils import generate_id, format_date, get_active_event_id, get_event_by_id, delete_button
 from auth import require_login, get_user_role
 from datetime import datetime
@@ -22,6 +23,7 @@ def add_allergy_to_event(event_id: str, allergy_data: Dict) -> bool:
         
         # Add to event's allergies subcollection
         db.collection("events").document(event_id).collection("allergies").document(allergy_id).set(allergy_data)
+        invalidate_event_context(event_id)
         
         # Update ingredient allergen info
         for ingredient_id in allergy_data.get('ingredient_ids', []):
@@ -49,6 +51,7 @@ def update_allergy(event_id: str, allergy_id: str, updates: Dict) -> bool:
     """Update an allergy entry"""
     try:
         db.collection("events").document(event_id).collection("allergies").document(allergy_id).update(updates)
+        invalidate_event_context(event_id)
         return True
     except Exception as e:
         st.error(f"Failed to update allergy: {e}")
@@ -69,6 +72,7 @@ def delete_allergy(event_id: str, allergy_id: str) -> bool:
         
         # Delete the allergy
         db.collection("events").document(event_id).collection("allergies").document(allergy_id).delete()
+        invalidate_event_context(event_id)
         
         # Update event file allergens array
         _update_event_file_allergens(event_id)
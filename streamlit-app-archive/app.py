@@ -7,29 +7,13 @@ from user_session_initializer import enrich_session_from_token
 from layout import apply_theme, render_top_navbar, render_enhanced_sidebar, render_leave_event_button
 from ui_components import show_event_mode_banner, inject_layout_fixes
 from utils import format_date, get_active_event, session_get, log_user_action
-from dashboard import render_dashboard
-from mobile_layout import mobile_layout
-from mobile_components import mobile_safe_columns
-from notifications import notifications_sidebar
 from landing import show as show_landing
-from events import enhanced_event_ui, get_all_events
-from post_event import post_event_ui
-from file_storage import file_manager_ui, show_file_analytics
-from receipts import receipt_upload_ui
-from upload import upload_ui_desktop, upload_ui_mobile
-from pdf_export import pdf_export_ui
-from event_planning_dashboard import event_planning_dashboard_ui
-from event_modifications import event_modifications_ui
-from bulk_suggestions import bulk_suggestions_ui
-from audit import audit_log_ui
-from roles import role_admin_ui as admin_panel_ui
-from ingredients import ingredient_catalogue_ui
-from allergies import allergy_management_ui
-from packing import packing_ui
-from ai_chat import ai_chat_ui
-from recipes import recipes_page
-from admin_utilities import admin_utilities_ui
-from historical_menus import historical_menus_ui
+# Tab modules (and the parsing / OCR / AI libraries behind them) are
+# imported on first use through tab_registry
+from tab_registry import TAB_ENTRY_POINTS, lazy_tab, load_tab
+from firestore_profiler import profile_rerun, render_firestore_debug_panel
+from metrics import rerun_metrics
+from tracing import span, trace_rerun, traced
 
 # Add custom JavaScript for better session handling
 components.html("""
@@ -179,6 +163,7 @@ def initialize_event_mode_state():
         except Exception:
             pass
 
+@traced("handle_auth", "auth")
 def handle_auth():
     query_params = st.query_params
 
@@ -306,18 +291,8 @@ def main():
 
     from firebase_init import db, firestore
 
-    TABS = {
-        "Dashboard": render_dashboard,
-        "Events": enhanced_event_ui,
-        "Recipes": recipes_page,
-        "Ingredients": ingredient_catalogue_ui,
-        "Allergies": allergy_management_ui,
-        "Historical Menus": historical_menus_ui,
-        "Upload": file_manager_ui,
-        "Receipts": receipt_upload_ui,
-        "Admin Panel": render_admin_panel,
-        "Assistant": ai_chat_ui
-    }
+    TABS = {tab: load_tab(tab) for tab in TAB_ENTRY_POINTS}
+    TABS["Admin Panel"] = render_admin_panel
 
     visible_tabs = list(TABS.keys())
     role = user.get("role", "viewer") if user else "viewer"
@@ -335,11 +310,13 @@ def main():
 
     if selected_tab in TABS:
         try:
-            if selected_tab == "Upload":
-                upload_ui_mobile() if st.session_state.get("mobile_mode") else upload_ui_desktop()
-                show_file_analytics()
-            else:
-                TABS[selected_tab](user)
+            with span(f"tab {selected_tab}", "tab"):
+                if selected_tab == "Upload":
+                    upload_ui = "upload_ui_mobile" if st.session_state.get("mobile_mode") else "upload_ui_desktop"
+                    lazy_tab("upload", upload_ui)()
+                    lazy_tab("file_storage", "show_file_analytics")()
+                else:
+                    TABS[selected_tab](user)
         except Exception as e:
             st.error(f"Failed to render '{selected_tab}': {e}")
     else:
@@ -350,6 +327,12 @@ def render_admin_panel(user):
     if role != "admin":
         st.warning("Access denied. Admins only.")
         return
-    admin_panel_ui()
+    load_tab("Admin Panel")()
+
+def _current_tab() -> str:
+    return st.session_state.get("top_nav", "")
 
-main()
+with rerun_metrics(_current_tab), trace_rerun(_current_tab), profile_rerun(_current_tab):
+    main()
+if get_user_role() == "admin":
+    render_firestore_debug_panel()
@@ -1,9 +1,6 @@
 import streamlit as st
-from firebase_admin import firestore
+from firebase_init import db, firestore
 from utils import format_date
-from firebase_admin import firestore
-
-db = firestore.client()
 
 # ----------------------------
 # 📜 Fetch Recent Logs
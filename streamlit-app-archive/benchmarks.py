@@ -0,0 +1,533 @@
+"""
+⏱️ Benchmarks
+Repeatable performance numbers for the app's data paths:
+- Tab scenarios (Events, Recipes, Historical Menus, Allergies, Packing,
+  Admin stats) run the real tab functions in Streamlit bare mode against a
+  seeded synthetic dataset, recording wall time and Firestore reads,
+  writes and round trips
+- Microbenchmarks for ingredient parsing, fraction formatting, menu
+  scaling and the text extractors
+- --imports times cold imports instead: the app.py shell and each tab
+  module in a fresh interpreter, and which heavy libraries they pull in
+- Results are written as JSON; --compare flags regressions against a
+  previous run, including newly flagged N+1 query shapes
+
+Always runs on the in-memory Firestore backend and the offline LLM backend.
+
+    python benchmarks.py --scale small --out bench.json
+    python benchmarks.py --scale small --compare bench.json
+    python benchmarks.py --imports --out imports.json
+"""
+
+import os
+
+# Must be set before any app module imports firebase_init / llm_gateway
+os.environ.setdefault("MM_FIRESTORE_BACKEND", "memory")
+os.environ.setdefault("MM_LLM_BACKEND", "fake")
+os.environ.setdefault("MM_FIRESTORE_PROFILE", "1")
+os.environ.setdefault("MM_LLM_FAKE_LATENCY", "fixed:0")
+os.environ.setdefault("MM_LLM_RPM", "1000000")
+os.environ.setdefault("MM_LLM_BURST", "1000")
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+import argparse
+import ast
+import io
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from firestore_profiler import begin_rerun, end_rerun
+
+BENCH_RESULTS_VERSION = 1
+# A scenario is a regression when its warm median slows down by more than this
+DEFAULT_REGRESSION_THRESHOLD = 0.20
+
+# ----------------------------
+# 🧮 Measurement
+# ----------------------------
+
+def _ops(stats_before: dict, stats_after: dict) -> dict:
+    """Firestore cost between two MemoryFirestore.stats snapshots."""
+    delta = {k: stats_after.get(k, 0) - stats_before.get(k, 0) for k in stats_after}
+    return {
+        "reads": delta.get("docs_read", 0),
+        "writes": delta.get("docs_written", 0),
+        "queries": delta.get("query", 0) + delta.get("aggregate", 0) + delta.get("list", 0),
+        "gets": delta.get("get", 0) + delta.get("get_all", 0),
+        "round_trips": sum(v for k, v in delta.items() if not k.startswith("docs_")),
+    }
+
+
+def _summary_ms(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "min": round(ordered[0], 3),
+        "median": round(statistics.median(ordered), 3),
+        "mean": round(statistics.fmean(ordered), 3),
+        "p95": round(ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))], 3),
+    }
+
+
+def _measure(db, fn) -> tuple[float, dict, str | None]:
+    before = dict(db.stats)
+    error = None
+    start = time.perf_counter()
+    try:
+        fn()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return elapsed_ms, _ops(before, dict(db.stats)), error
+
+
+def _clear_caches():
+    try:
+        st.cache_data.clear()
+    except Exception:
+        pass
+    from chat_context import invalidate_event_context
+    invalidate_event_context()
+
+# ----------------------------
+# 🗂️ Tab Scenarios
+# ----------------------------
+
+def _set_active_event(db, event_id):
+    db.collection("config").document("global").set({"active_event": event_id}, merge=True)
+
+
+def _tab_scenarios(ctx: dict) -> dict:
+    """name -> (setup, run); setup is untimed."""
+    from admin_utilities import _admin_dashboard
+    from allergies import allergy_management_ui
+    from events import enhanced_event_ui
+    from historical_menus import historical_menus_ui
+    from packing import packing_ui
+    from recipes import recipes_page
+
+    db, user, event_id = ctx["db"], ctx["user"], ctx["event_id"]
+    in_event = lambda: _set_active_event(db, event_id)
+    all_events = lambda: _set_active_event(db, None)
+    return {
+        "events": (all_events, lambda: enhanced_event_ui(user)),
+        "recipes": (all_events, lambda: recipes_page(user)),
+        "historical_menus": (all_events, lambda: historical_menus_ui(user)),
+        "allergies": (in_event, lambda: allergy_management_ui(user)),
+        "packing_event": (in_event, packing_ui),
+        "packing_all_events": (all_events, packing_ui),
+        "admin_stats": (all_events, _admin_dashboard),
+    }
+
+
+def run_scenarios(ctx: dict, repeat: int = 5, only: list | None = None) -> dict:
+    """Cold run (caches cleared) plus ``repeat`` warm runs per scenario."""
+    db = ctx["db"]
+    results = {}
+    for name, (setup, run) in _tab_scenarios(ctx).items():
+        if only and name not in only:
+            continue
+        st.session_state.clear()
+        st.session_state["user"] = ctx["user"]
+        setup()
+        _clear_caches()
+
+        begin_rerun(name)
+        cold_ms, cold_ops, error = _measure(db, run)
+        profile = end_rerun(log=False)
+        warm_ms, warm_ops = [], cold_ops
+        for _ in range(repeat if error is None else 0):
+            elapsed, warm_ops, error = _measure(db, run)
+            warm_ms.append(elapsed)
+            if error:
+                break
+        results[name] = {
+            "cold": {"wall_ms": round(cold_ms, 3), "ops": cold_ops},
+            "warm": {"wall_ms": _summary_ms(warm_ms) if warm_ms else None, "ops": warm_ops},
+            "n_plus_one": [
+                {k: entry[k] for k in ("kind", "shape", "calls", "callers")}
+                for entry in (profile or {}).get("n_plus_one", [])
+            ],
+            "error": error,
+        }
+        print(f"  {name:<20} cold {cold_ms:9.1f} ms  reads {cold_ops['reads']:>7,}  round trips {cold_ops['round_trips']:>6,}"
+              + (f"  ⚠️ {error}" if error else ""))
+        for entry in results[name]["n_plus_one"]:
+            print(f"    N+1: {entry['calls']}× {entry['kind']} {entry['shape']}")
+    return results
+
+# ----------------------------
+# 🔬 Microbenchmarks
+# ----------------------------
+
+class _Upload(io.BytesIO):
+    """Stand-in for a Streamlit UploadedFile."""
+
+    def __init__(self, data: bytes, name: str, type: str):
+        super().__init__(data)
+        self.name = name
+        self.type = type
+
+
+def _pdf_bytes(text: str) -> bytes:
+    import fitz
+    doc = fitz.open()
+    for start in range(0, len(text.splitlines()), 50):
+        page = doc.new_page()
+        page.insert_text((36, 48), "\n".join(text.splitlines()[start:start + 50]), fontsize=9)
+    return doc.tobytes()
+
+
+def _docx_bytes(text: str) -> bytes:
+    from docx import Document
+    document = Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def _png_bytes(text: str) -> bytes:
+    from PIL import Image, ImageDraw
+    lines = text.splitlines()[:30]
+    image = Image.new("RGB", (900, 20 * len(lines) + 40), "white")
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((20, 20 + 20 * i), line, fill="black")
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
+
+def _time_per_op(fn, inputs: list, repeat: int) -> dict:
+    """Best and median ns/op over ``repeat`` passes across ``inputs``."""
+    passes = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for value in inputs:
+            fn(value)
+        passes.append((time.perf_counter_ns() - start) / max(1, len(inputs)))
+    return {"ops": len(inputs), "ns_per_op": {"best": round(min(passes)), "median": round(statistics.median(passes))}}
+
+
+def run_microbenchmarks(ctx: dict, repeat: int = 5, seed: int = 42) -> dict:
+    from ai_parsing_engine import extract_text
+    from ingredients import categorize_ingredient, normalize_ingredient, parse_ingredient_line
+    from smart_recipe_scaler import scale_menu
+    from utils import format_fraction
+
+    db, rng = ctx["db"], random.Random(seed)
+    recipes = [d.to_dict() | {"id": d.id} for d in db.collection("recipes").limit(200).stream()]
+    lines = [p["original"] for r in recipes for p in r.get("parsed_ingredients", [])]
+    names = [p["name"] for r in recipes for p in r.get("parsed_ingredients", [])]
+    fractions = [rng.choice([0.125, 0.25, 1 / 3, 0.5, 2 / 3, 0.75, 1.5, 2.25]) * rng.randint(1, 12) for _ in range(2000)]
+
+    results = {
+        "parse_ingredient_line": _time_per_op(parse_ingredient_line, lines, repeat),
+        "normalize_ingredient": _time_per_op(normalize_ingredient, names, repeat),
+        "categorize_ingredient": _time_per_op(categorize_ingredient, names, repeat),
+        "format_fraction": _time_per_op(format_fraction, fractions, repeat),
+    }
+
+    event_file = db.collection("events").document(ctx["event_id"]).collection("meta").document("event_file").get().to_dict()
+    menu_recipes = recipes[:12]
+    before = dict(db.stats)
+    results["scale_menu"] = _time_per_op(lambda _: scale_menu(event_file, menu_recipes), [None], repeat)
+    results["scale_menu"]["recipes"] = len(menu_recipes)
+    results["scale_menu"]["firestore_ops_per_call"] = {
+        k: v // repeat for k, v in _ops(before, dict(db.stats)).items()
+    }
+
+    text = "\n".join(f"{r['name']}\n{r['ingredients']}\n{r['instructions']}" for r in recipes[:20])
+    extractors = {
+        "extract_text[txt]": lambda: (text.encode("utf-8"), "recipes.txt", "text/plain"),
+        "extract_text[csv]": lambda: ("\n".join(",".join(line.split(" ", 2)) for line in lines).encode("utf-8"), "items.csv", "text/csv"),
+        "extract_text[pdf]": lambda: (_pdf_bytes(text), "recipes.pdf", "application/pdf"),
+        "extract_text[docx]": lambda: (
+            _docx_bytes(text), "recipes.docx",
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        ),
+        "extract_text[image]": lambda: (_png_bytes(text), "recipe.png", "image/png"),
+    }
+    for name, build in extractors.items():
+        try:
+            data, filename, mimetype = build()
+        except ImportError as e:
+            results[name] = {"skipped": f"missing dependency: {e.name}"}
+            continue
+        if not isinstance(data, bytes):
+            results[name] = {"skipped": "could not build sample file"}
+            continue
+        results[name] = _time_per_op(lambda blob: extract_text(_Upload(blob, filename, mimetype)), [data], repeat)
+        results[name]["bytes"] = len(data)
+
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"  {name:<24} skipped ({result['skipped']})")
+        else:
+            print(f"  {name:<24} {result['ns_per_op']['best'] / 1000:12.1f} µs/op")
+    return results
+
+# ----------------------------
+# 🚀 Import Time
+# ----------------------------
+
+# Libraries a cold start should not need before the first tab is rendered
+HEAVY_MODULES = ("openai", "fitz", "PIL", "pytesseract", "docx", "bs4", "networkx", "pyvis", "fpdf", "pandas")
+
+# Runs in a fresh interpreter: imports the shell, then times one module on top
+_IMPORT_PROBE = """
+import json, sys, time
+shell, target = json.loads(sys.argv[1]), sys.argv[2]
+start = time.perf_counter()
+for name in shell:
+    __import__(name)
+shell_seconds = time.perf_counter() - start
+loaded = set(sys.modules)
+start = time.perf_counter()
+if target:
+    __import__(target)
+print(json.dumps({
+    "shell_seconds": shell_seconds,
+    "seconds": time.perf_counter() - start,
+    "shell_modules": sorted(loaded),
+    "new_modules": sorted(set(sys.modules) - loaded),
+}))
+"""
+
+
+def _app_shell_modules() -> list[str]:
+    """Modules app.py imports at the top level, i.e. what every cold start pays for."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def _probe_import(shell: list, target: str = "") -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE, json.dumps(shell), target],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError((proc.stderr.strip().splitlines() or ["import failed"])[-1])
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _heavy(modules: list) -> list:
+    return [m for m in HEAVY_MODULES if m in modules]
+
+
+def run_import_benchmark(repeat: int = 5) -> dict:
+    """Cold import time of the app shell and of each tab module on top of it."""
+    from tab_registry import TAB_ENTRY_POINTS
+
+    shell = _app_shell_modules()
+    samples, heavy = [], []
+    try:
+        for _ in range(repeat):
+            probe = _probe_import(shell)
+            samples.append(probe["shell_seconds"] * 1000)
+            heavy = _heavy(probe["shell_modules"])
+        results = {"shell": {"modules": shell, "ms": _summary_ms(samples), "heavy": heavy}, "tabs": {}}
+    except RuntimeError as e:
+        return {"shell": {"modules": shell, "error": str(e)}, "tabs": {}}
+    print(f"  {'app shell':<24} {results['shell']['ms']['median']:10.1f} ms  {', '.join(heavy)}")
+
+    for tab, (module, _) in TAB_ENTRY_POINTS.items():
+        samples = []
+        try:
+            for _ in range(repeat):
+                probe = _probe_import(shell, module)
+                samples.append(probe["seconds"] * 1000)
+        except RuntimeError as e:
+            results["tabs"][tab] = {"module": module, "error": str(e)}
+            print(f"  {tab:<24} error ({e})")
+            continue
+        heavy = _heavy(probe["new_modules"])
+        results["tabs"][tab] = {"module": module, "ms": _summary_ms(samples), "heavy": heavy}
+        print(f"  {tab:<24} {results['tabs'][tab]['ms']['median']:10.1f} ms  {', '.join(heavy)}")
+    return results
+
+# ----------------------------
+# 📦 Setup & Reporting
+# ----------------------------
+
+def prepare(scale: str, seed: int) -> dict:
+    """Load a fresh dataset into the in-memory backend; returns the run context."""
+    from firebase_init import FIRESTORE_BACKEND, get_db
+    from synthetic_data import load_dataset
+
+    if FIRESTORE_BACKEND != "memory":
+        raise SystemExit("Benchmarks write a synthetic dataset; run them with MM_FIRESTORE_BACKEND=memory.")
+
+    db = get_db()
+    db.clear()
+    # Anchored at today so "last 30 days" style queries see data
+    anchor = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    start = time.perf_counter()
+    counts = load_dataset(db, scale=scale, seed=seed, anchor=anchor)
+    load_seconds = time.perf_counter() - start
+
+    user = next(
+        d.to_dict() | {"id": d.id}
+        for d in db.collection("users").where("role", "==", "admin").limit(1).stream()
+    )
+    event_id = db.collection("config").document("global").get().to_dict()["active_event"]
+    db.reset_stats()
+    return {
+        "db": db,
+        "user": user,
+        "event_id": event_id,
+        "dataset": {
+            "scale": scale,
+            "seed": seed,
+            "documents": {k: v for k, v in counts.items() if not k.startswith("_")},
+            "load_seconds": round(load_seconds, 2),
+        },
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> list[str]:
+    """Human-readable regressions of ``current`` against ``baseline``."""
+    regressions = []
+    for name, now in current.get("scenarios", {}).items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or now.get("error") or before.get("error"):
+            continue
+        for phase in ("cold", "warm"):
+            old_ops, new_ops = before[phase]["ops"], now[phase]["ops"]
+            for key in ("reads", "writes", "round_trips"):
+                if new_ops[key] > old_ops[key]:
+                    regressions.append(f"{name} ({phase}): {key} {old_ops[key]:,} → {new_ops[key]:,}")
+        known = {(e["kind"], e["shape"]) for e in before.get("n_plus_one", [])}
+        for entry in now.get("n_plus_one", []):
+            if (entry["kind"], entry["shape"]) not in known:
+                regressions.append(f"{name}: new N+1 {entry['calls']}× {entry['kind']} {entry['shape']}")
+        old_ms = (before["warm"]["wall_ms"] or {}).get("median")
+        new_ms = (now["warm"]["wall_ms"] or {}).get("median")
+        if old_ms and new_ms and new_ms > old_ms * (1 + threshold):
+            regressions.append(f"{name}: warm median {old_ms:.1f} ms → {new_ms:.1f} ms")
+    for name, now in current.get("micro", {}).items():
+        before = baseline.get("micro", {}).get(name, {})
+        old_ns, new_ns = before.get("ns_per_op", {}).get("best"), now.get("ns_per_op", {}).get("best")
+        if old_ns and new_ns and new_ns > old_ns * (1 + threshold):
+            regressions.append(f"{name}: {old_ns:,} → {new_ns:,} ns/op")
+    old_shell = baseline.get("imports", {}).get("shell", {})
+    new_shell = current.get("imports", {}).get("shell", {})
+    if old_shell.get("ms") and new_shell.get("ms"):
+        old_ms, new_ms = old_shell["ms"]["median"], new_shell["ms"]["median"]
+        if new_ms > old_ms * (1 + threshold):
+            regressions.append(f"app shell import: {old_ms:.1f} ms → {new_ms:.1f} ms")
+        for module in set(new_shell.get("heavy", [])) - set(old_shell.get("heavy", [])):
+            regressions.append(f"app shell now imports {module} at startup")
+    return regressions
+
+
+def _results_header() -> dict:
+    return {
+        "version": BENCH_RESULTS_VERSION,
+        "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def _report(results: dict, args) -> None:
+    """Write results to --out (or stdout) and exit non-zero on --compare regressions."""
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results written to {args.out}", file=sys.stderr)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, results, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) vs {baseline.get('commit') or args.compare}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  - {line}", file=sys.stderr)
+            sys.exit(1)
+        print(f"✅ No regressions vs {baseline.get('commit') or args.compare}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Mountain Medicine performance benchmarks.")
+    parser.add_argument("--scale", default="small", help="synthetic_data scale (tiny, small, medium, large)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5, help="warm runs per scenario / passes per microbenchmark")
+    parser.add_argument("--only", nargs="*", help="scenario names to run (default: all)")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--imports", action="store_true", help="time cold imports of the app shell and tab modules instead")
+    parser.add_argument("--out", help="write JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.imports:
+        print("🚀 Cold imports (fresh interpreter per sample)", file=sys.stderr)
+        sys.stdout, real_stdout = sys.stderr, sys.stdout
+        try:
+            imports = run_import_benchmark(args.repeat)
+        finally:
+            sys.stdout = real_stdout
+        _report(_results_header() | {"imports": imports}, args)
+        return
+
+    print(f"📦 Loading '{args.scale}' dataset (seed {args.seed})...", file=sys.stderr)
+    ctx = prepare(args.scale, args.seed)
+    print(f"🗂️ Tab scenarios ({sum(ctx['dataset']['documents'].values()):,} documents)", file=sys.stderr)
+    sys.stdout, real_stdout = sys.stderr, sys.stdout  # app code prints; keep stdout for JSON
+    try:
+        scenarios = run_scenarios(ctx, args.repeat, args.only)
+        micro = {}
+        if not args.skip_micro:
+            print("🔬 Microbenchmarks")
+            micro = run_microbenchmarks(ctx, args.repeat, args.seed)
+    finally:
+        sys.stdout = real_stdout
+
+    results = _results_header() | {
+        "dataset": ctx["dataset"],
+        "config": {
+            "repeat": args.repeat,
+            "firestore_latency_ms": os.getenv("MM_FIRESTORE_LATENCY_MS", "0"),
+            "llm_fake_latency": os.getenv("MM_LLM_FAKE_LATENCY"),
+        },
+        "scenarios": scenarios,
+        "micro": micro,
+    }
+    _report(results, args)
+
+
+if __name__ == "__main__":
+    main()
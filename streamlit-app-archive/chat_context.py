@@ -0,0 +1,127 @@
+"""
+🧠 Chat context snapshots
+Keeps a per-event snapshot of what the assistant needs to know (event
+fields, menu count, allergies) in process memory so a chat turn does not
+re-read Firestore. Event, menu and allergy writes call
+invalidate_event_context(); a short TTL covers writes made elsewhere.
+"""
+
+import threading
+import time
+
+from firebase_init import get_db
+from firestore_utils import count_documents
+from metrics import observe_cache
+
+CONTEXT_SNAPSHOT_TTL = 300  # seconds
+ACTIVE_EVENT_TTL = 60  # seconds
+MAX_CONTEXT_SNAPSHOTS = 32
+
+EVENT_CONTEXT_FIELDS = [
+    "name", "start_date", "end_date", "location", "guest_count",
+    "staff_count", "dietary_restrictions", "food_allergies",
+]
+
+_snapshots: dict[str, dict] = {}
+_active_event = {"id": None, "loaded_at": 0.0}
+_lock = threading.Lock()
+
+
+def invalidate_event_context(event_id: str | None = None) -> None:
+    """Drop the snapshot for one event (or all of them, plus the active event id)."""
+    with _lock:
+        if event_id is None:
+            _snapshots.clear()
+            _active_event["loaded_at"] = 0.0
+        else:
+            _snapshots.pop(event_id, None)
+
+
+def get_active_event_id_cached() -> str | None:
+    """Active event id from config/global, re-read at most once a minute."""
+    now = time.time()
+    with _lock:
+        if now - _active_event["loaded_at"] < ACTIVE_EVENT_TTL:
+            observe_cache("active_event", True)
+            return _active_event["id"]
+    observe_cache("active_event", False)
+    doc = get_db().collection("config").document("global").get()
+    event_id = doc.to_dict().get("active_event") if doc.exists else None
+    with _lock:
+        _active_event.update(id=event_id, loaded_at=now)
+    return event_id
+
+
+def _load_event_context(event_id: str) -> dict | None:
+    db = get_db()
+    event_ref = db.collection("events").document(event_id)
+    doc = event_ref.get()
+    if not doc.exists:
+        return None
+    event = doc.to_dict()
+    snapshot = {"id": event_id} | {k: event[k] for k in EVENT_CONTEXT_FIELDS if k in event}
+
+    try:
+        snapshot["menu_count"] = count_documents(
+            db.collection("menus").where("event_id", "==", event_id)
+        )
+    except Exception:
+        snapshot["menu_count"] = None
+
+    allergies = []
+    try:
+        for a in event_ref.collection("allergies").select(["person_name", "allergies", "severity"]).stream():
+            data = a.to_dict()
+            allergies.append({
+                "person_name": data.get("person_name", ""),
+                "allergies": data.get("allergies", []),
+                "severity": data.get("severity", ""),
+            })
+    except Exception:
+        pass
+    snapshot["allergies"] = allergies
+    return snapshot
+
+
+def get_event_context(event_id: str) -> dict | None:
+    """Return the cached context snapshot for an event, loading it if needed."""
+    now = time.time()
+    with _lock:
+        entry = _snapshots.get(event_id)
+        if entry and now - entry["loaded_at"] < CONTEXT_SNAPSHOT_TTL:
+            observe_cache("event_context", True)
+            return entry["snapshot"]
+    observe_cache("event_context", False)
+
+    snapshot = _load_event_context(event_id)
+    with _lock:
+        _snapshots[event_id] = {"snapshot": snapshot, "loaded_at": now}
+        if len(_snapshots) > MAX_CONTEXT_SNAPSHOTS:
+            oldest = min(_snapshots, key=lambda k: _snapshots[k]["loaded_at"])
+            _snapshots.pop(oldest, None)
+    return snapshot
+
+
+def format_event_context(snapshot: dict) -> list[str]:
+    """Render a snapshot as the context lines given to the assistant."""
+    parts = [
+        f"Active Event: {snapshot.get('name') or 'Unknown'}",
+        f"Date: {snapshot.get('start_date') or 'TBD'} to {snapshot.get('end_date') or 'TBD'}",
+        f"Location: {snapshot.get('location') or 'TBD'}",
+        f"Guests: {snapshot.get('guest_count') or 0}",
+        f"Staff: {snapshot.get('staff_count') or 0}",
+    ]
+    if snapshot.get("dietary_restrictions"):
+        parts.append(f"Dietary Restrictions: {snapshot['dietary_restrictions']}")
+    if snapshot.get("food_allergies"):
+        parts.append(f"Allergies: {snapshot['food_allergies']}")
+    if snapshot.get("allergies"):
+        guests = [
+            f"{a['person_name']} ({', '.join(a['allergies'] or [])}"
+            + (f", {a['severity']}" if a.get("severity") else "") + ")"
+            for a in snapshot["allergies"]
+        ]
+        parts.append("Guest Allergies: " + "; ".join(guests))
+    if snapshot.get("menu_count") is not None:
+        parts.append(f"Menu Items: {snapshot['menu_count']}")
+    return parts
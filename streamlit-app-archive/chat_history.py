@@ -0,0 +1,116 @@
+"""
+🧾 Chat history budget
+Keeps the assistant prompt bounded on long planning sessions:
+- Recent turns are sent verbatim while they fit a token budget
+- Older turns are folded into a rolling summary in the background; the
+  result is applied on a later rerun so a chat turn never waits on it
+- The session keeps at most MAX_SESSION_MESSAGES entries
+"""
+
+import os
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("MM_CHAT_HISTORY_TOKENS", "1500"))
+SUMMARY_TOKEN_BUDGET = 300
+MAX_SESSION_MESSAGES = 40
+
+# Chat format overhead per message (role, separators)
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+# Session key for the in-flight summary: (future, previous summary, folded chats)
+_SUMMARY_JOB_KEY = "chat_summary_job"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return (len(text or "") + 3) // 4
+
+
+def message_tokens(chat: dict) -> int:
+    return estimate_tokens(chat.get("content", "")) + _MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_message(chat: dict, budget: int) -> dict:
+    """A copy of ``chat`` whose content is cut to fit ``budget`` tokens."""
+    max_chars = max(budget - _MESSAGE_OVERHEAD_TOKENS, 0) * 4
+    content = chat.get("content") or ""
+    if len(content) <= max_chars:
+        return chat
+    return {**chat, "content": content[:max(max_chars - 1, 0)] + "…"}
+
+
+def recent_messages(history: list, budget: int = HISTORY_TOKEN_BUDGET) -> list:
+    """Newest unsummarized entries that fit in ``budget``, oldest first.
+
+    The newest entry is always included, truncated if it alone is over budget.
+    """
+    selected, used = [], 0
+    for chat in reversed(history):
+        if chat.get("summarized"):
+            break
+        cost = message_tokens(chat)
+        if not selected and cost > budget:
+            selected.append(truncate_message(chat, budget))
+            break
+        if used + cost > budget:
+            break
+        selected.append(chat)
+        used += cost
+    selected.reverse()
+    return selected
+
+
+def compact_history(state, summarize, submit, budget: int = HISTORY_TOKEN_BUDGET) -> None:
+    """Start folding turns that no longer fit the budget into the summary.
+
+    ``submit(summarize, previous_summary, chats)`` runs the summary off the
+    script thread (e.g. an executor's ``submit``) and returns a future;
+    apply_compaction() stores its result on a later rerun. Only one summary
+    is in flight per session. Folded entries stay visible in the
+    conversation (flagged ``summarized``) until the session cap drops them.
+    """
+    history = state.get("chat_history", [])
+    if state.get(_SUMMARY_JOB_KEY) is None:
+        keep = recent_messages(history, budget)
+        first_kept = len(history) - len(keep)
+        to_fold = [c for c in history[:first_kept] if not c.get("summarized")]
+        if to_fold:
+            previous = state.get("chat_summary", "")
+            state[_SUMMARY_JOB_KEY] = (submit(summarize, previous, to_fold), previous, to_fold)
+
+    if len(history) > MAX_SESSION_MESSAGES:
+        state["chat_history"] = history[-MAX_SESSION_MESSAGES:]
+
+
+def apply_compaction(state) -> None:
+    """Store a finished background summary and flag the turns it folded."""
+    job = state.get(_SUMMARY_JOB_KEY)
+    if job is None or not job[0].done():
+        return
+    future, previous, folded = state.pop(_SUMMARY_JOB_KEY)
+    try:
+        state["chat_summary"] = future.result()
+    except Exception as e:
+        print(f"Chat history summary failed: {e}")
+        state["chat_summary"] = fallback_summary(previous, folded)
+    for chat in folded:
+        chat["summarized"] = True
+
+
+def clear_compaction(state) -> None:
+    """Forget the rolling summary and any summary still in flight."""
+    state.pop("chat_summary", None)
+    state.pop(_SUMMARY_JOB_KEY, None)
+
+
+def fallback_summary(previous: str, chats: list) -> str:
+    """Summary without a model call: the first line of each folded turn."""
+    lines = [previous] if previous else []
+    for chat in chats:
+        speaker = "User" if chat.get("sender") == "user" else "Assistant"
+        first_line = (chat.get("content") or "").strip().splitlines()[:1]
+        if first_line:
+            lines.append(f"- {speaker}: {first_line[0][:160]}")
+    text = "\n".join(lines)
+    # Keep the newest part when over budget
+    max_chars = SUMMARY_TOKEN_BUDGET * 4
+    return text[-max_chars:]
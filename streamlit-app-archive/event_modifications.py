@@ -1,14 +1,12 @@
 # event_modifications.py
 
 import streamlit as st
-from firebase_admin import firestore
+from firebase_init import db
 from auth import require_role
 from utils import format_date
 from notifications import send_notification
 from datetime import datetime
 
-db = firestore.client()
-
 # ----------------------------
 # 🔧 Suggestion Moderation UI
 # ----------------------------
@@ -8,6 +8,7 @@ from file_storage import save_uploaded_file
 from datetime import datetime
 from layout import render_event_toolbar
 from auth import get_user_id
+from chat_context import invalidate_event_context
 
 # ----------------------------
 # 🧾 Load Event Data
@@ -24,12 +25,9 @@ def get_event_data(event_id):
 # 💾 Save Event Data
 # ----------------------------
 def save_event_data(event_id, data):
-    try:
-        db.collection("events").document(event_id).update(data)
-        return True
-    except Exception as e:
-        st.error(f"❌ Failed to save event: {e}")
-        return False
+    # Route through update_event so the event summary snapshot stays in step
+    from events import update_event
+    return update_event(event_id, data)
 
 # ----------------------------
 # 📋 Event Planning Dashboard - FIXED
@@ -283,6 +281,7 @@ def _render_quick_menu_form(event_id: str, user: dict):
                         }
                         
                         db.collection("menus").document(menu_id).set(menu_data)
+                        invalidate_event_context(event_id)
                         st.success(f"✅ Added: {name}")
                         st.session_state["show_menu_form"] = False
                         
@@ -4,8 +4,12 @@ import streamlit as st
 from utils import get_active_event_id, format_date, generate_id, delete_button
 from ui_components import show_event_mode_banner
 from layout import render_status_indicator
-from datetime import datetime
+from datetime import datetime, timezone
 from firebase_init import db, firestore
+from chat_context import invalidate_event_context
+from firestore_utils import contribution_deltas, guest_count, increment_counters, nest_fields
+from post_event_rollup import affects_rollup, apply_post_event_change, rollup_ref
+from tag_utils import update_tag_index
 
 # ----------------------------
 # 🔥 Get All Events
@@ -47,6 +51,153 @@ def get_all_events() -> list[dict]:
         st.error(f"⚠️ Failed to fetch events: {e}")
         return []
 
+# ----------------------------
+# 📊 Event Summary Snapshot
+# ----------------------------
+
+SUMMARY_REF = ("summaries", "events")
+RECENT_EVENTS_KEPT = 3
+
+def _summary_ref():
+    return db.collection(SUMMARY_REF[0]).document(SUMMARY_REF[1])
+
+def _summary_contribution(event: dict | None) -> dict:
+    """Counter values a single event adds to the summary snapshot."""
+    if not event or event.get("deleted"):
+        return {}
+    return {
+        "total": 1,
+        f"status_counts.{event.get('status', 'planning')}": 1,
+        "total_guests": guest_count(event),
+    }
+
+def _recent_entry(event_id: str, event: dict) -> dict:
+    return {
+        "id": event_id,
+        "name": event.get("name", "Unnamed"),
+        "status": event.get("status", "planning"),
+        "created_at": event.get("created_at"),
+    }
+
+def _created_sort_key(entry: dict) -> float:
+    # Stored timestamps come back tz-aware, fresh ones are naive UTC
+    ts = entry.get("created_at")
+    if not isinstance(ts, datetime):
+        return 0.0
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+def _apply_summary_change(transaction, summary: dict, event_id: str, before: dict | None, after: dict | None) -> None:
+    """Queue counter increments and the recent-events list update on a transaction."""
+    recent = [r for r in summary.get("recent", []) if r.get("id") != event_id]
+    if after and not after.get("deleted"):
+        recent.append(_recent_entry(event_id, after))
+    elif before and any(r.get("id") == event_id for r in summary.get("recent", [])):
+        # The list can't be refilled without a query; flag it for the reader
+        summary["recent_stale"] = True
+    recent.sort(key=_created_sort_key, reverse=True)
+
+    increment_counters(
+        _summary_ref(),
+        contribution_deltas(_summary_contribution, before, after),
+        extra={
+            "recent": recent[:RECENT_EVENTS_KEPT],
+            "recent_stale": summary.get("recent_stale", False),
+            "updated_at": datetime.utcnow(),
+        },
+        writer=transaction,
+    )
+
+def _indexed_tags(event: dict | None) -> list:
+    """Tags an event contributes to the tag index; deleted events contribute none."""
+    if not event or event.get("deleted"):
+        return []
+    return event.get("tags") or []
+
+@firestore.transactional
+def _write_event_txn(transaction, event_ref, changes: dict | None, merge_update: bool) -> None:
+    """Write an event and keep the summary snapshot, post-event rollup and tag index in step, atomically."""
+    event_snap = event_ref.get(transaction=transaction)
+    summary_snap = _summary_ref().get(transaction=transaction)
+    before = event_snap.to_dict() if event_snap.exists else None
+    summary = summary_snap.to_dict() if summary_snap.exists else {}
+
+    if merge_update:
+        after = dict(before or {})
+        after.update({k: v for k, v in changes.items() if k != "version"})
+    else:
+        after = changes
+
+    # Only reviewed events touch the post-event rollup; read it (before any
+    # write, as transactions require) just for those
+    rollup_snap = rollup_ref().get(transaction=transaction) if affects_rollup(before, after) else None
+
+    if merge_update:
+        transaction.update(event_ref, changes)
+    else:
+        transaction.set(event_ref, changes)
+
+    _apply_summary_change(transaction, summary, event_ref.id, before, after)
+    if rollup_snap is not None:
+        rollup = rollup_snap.to_dict() if rollup_snap.exists else {}
+        apply_post_event_change(transaction, rollup, event_ref.id, before, after)
+    update_tag_index(
+        "events", event_ref.id, after.get("name"), _indexed_tags(after),
+        previous_tags=_indexed_tags(before), writer=transaction,
+    )
+
+def get_event_summary() -> dict:
+    """Return the event summary snapshot (one document read).
+
+    If the recent-events list lost an entry to a deletion it is refilled
+    with a small ordered query and written back.
+    """
+    doc = _summary_ref().get()
+    summary = doc.to_dict() if doc.exists else {}
+    if summary.get("recent_stale"):
+        recent = []
+        for d in (
+            db.collection("events")
+            .order_by("created_at", direction=firestore.Query.DESCENDING)
+            .limit(RECENT_EVENTS_KEPT * 4)
+            .stream()
+        ):
+            data = d.to_dict()
+            if not data.get("deleted"):
+                recent.append(_recent_entry(d.id, data))
+            if len(recent) >= RECENT_EVENTS_KEPT:
+                break
+        summary["recent"] = recent
+        summary["recent_stale"] = False
+        _summary_ref().set({"recent": recent, "recent_stale": False}, merge=True)
+    return summary
+
+def rebuild_event_summary() -> int:
+    """Recompute the event summary snapshot from the events collection.
+
+    Backfills data created before the snapshot existed and repairs drift
+    from code paths that write events directly. Returns events scanned.
+    """
+    totals: dict = {}
+    recent = []
+    count = 0
+    for d in db.collection("events").stream():
+        event = d.to_dict()
+        count += 1
+        for key, value in _summary_contribution(event).items():
+            totals[key] = totals.get(key, 0) + value
+        if not event.get("deleted"):
+            recent.append(_recent_entry(d.id, event))
+    recent.sort(key=_created_sort_key, reverse=True)
+
+    _summary_ref().set({"total": 0, "total_guests": 0, "status_counts": {}} | nest_fields(totals) | {
+        "recent": recent[:RECENT_EVENTS_KEPT],
+        "recent_stale": False,
+        "updated_at": datetime.utcnow(),
+    })
+    return count
+
 # ----------------------------
 # ⚡ Smart Event Management
 # ----------------------------
@@ -56,6 +207,7 @@ def activate_event(event_id: str) -> None:
     try:
         # Set global Event Mode
         db.collection("config").document("global").set({"active_event": event_id}, merge=True)
+        invalidate_event_context()
         
         # Ensure session state is updated
         st.session_state["active_event"] = event_id
@@ -83,7 +235,8 @@ def deactivate_event_mode() -> None:
     try:
         # Update global config
         db.collection("config").document("global").update({"active_event": None})
-        
+        invalidate_event_context()
+
         # Ensure session state is cleared
         if "active_event_id" in st.session_state:
             del st.session_state["active_event_id"]
@@ -108,7 +261,8 @@ def complete_event_and_end_sessions(event_id: str) -> bool:
         
         # Clear global active event
         db.collection("config").document("global").update({"active_event": None})
-        
+        invalidate_event_context()
+
         # Clear all user preferences for this event
         users_with_event = db.collection("users").where("last_active_event", "==", event_id).stream()
         batch = db.batch()
@@ -158,7 +312,8 @@ def create_event(event_data: dict, user_id: str) -> str:
         event_data.setdefault("shopping_list", [])
         event_data.setdefault("equipment_list", [])
         
-        db.collection("events").document(event_id).set(event_data)
+        _write_event_txn(db.transaction(), db.collection("events").document(event_id), event_data, False)
+        invalidate_event_context(event_id)
 
          # ✅ Create canonical event_file under /events/{eventId}/meta/event_file
         from event_file import get_default_event_file
@@ -189,7 +344,8 @@ def update_event(event_id: str, updates: dict) -> bool:
             "version": firestore.Increment(1)
         })
         
-        db.collection("events").document(event_id).update(updates)
+        _write_event_txn(db.transaction(), db.collection("events").document(event_id), updates, True)
+        invalidate_event_context(event_id)
         return True
         
     except Exception as e:
@@ -203,16 +359,18 @@ def update_event(event_id: str, updates: dict) -> bool:
 def delete_event(event_id: str) -> bool:
     """Soft delete an event"""
     try:
-        db.collection("events").document(event_id).update({
+        _write_event_txn(db.transaction(), db.collection("events").document(event_id), {
             "deleted": True,
             "deleted_at": datetime.utcnow()
-        })
+        }, True)
+        invalidate_event_context(event_id)
         
         # If this was the active event, clear it and store as recent
         active_event_id = get_active_event_id()
         if active_event_id == event_id:
             st.session_state["recent_event_id"] = event_id
             db.collection("config").document("global").update({"active_event": None})
+            invalidate_event_context()
             if "active_event_id" in st.session_state:
                 del st.session_state["active_event_id"]
         
@@ -393,37 +551,30 @@ def event_ui(user: dict | None, events: list[dict]) -> None:
 def show_event_statistics():
     """Display event statistics dashboard"""
     try:
-        events = get_all_events()
+        summary = get_event_summary()
         
-        if not events:
+        if not summary.get("total"):
             return
         
+        status_counts = summary.get("status_counts", {})
         st.markdown("### Event Statistics")
         
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            total_events = len([e for e in events if not e.get('deleted')])
-            st.metric("Total Events", total_events)
+            st.metric("Total Events", summary.get("total", 0))
         
         with col2:
-            active_events = len([e for e in events if e.get('status') == 'active'])
-            st.metric("Active Events", active_events)
+            st.metric("Active Events", status_counts.get("active", 0))
         
         with col3:
-            completed_events = len([e for e in events if e.get('status') == 'complete'])
-            st.metric("Completed Events", completed_events)
+            st.metric("Completed Events", status_counts.get("complete", 0))
         
         with col4:
-            total_guests = sum(e.get('guest_count', 0) for e in events if not e.get('deleted'))
-            st.metric("Total Guests Served", total_guests)
+            st.metric("Total Guests Served", summary.get("total_guests", 0))
         
         # Show recent activity
-        recent_events = sorted(
-            [e for e in events if not e.get('deleted')], 
-            key=lambda x: x.get('created_at', datetime.min), 
-            reverse=True
-        )[:3]
+        recent_events = summary.get("recent", [])
         
         if recent_events:
             st.markdown("#### Recent Events")
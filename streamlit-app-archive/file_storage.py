@@ -8,6 +8,9 @@ import uuid
 import mimetypes
 from ai_parsing_engine import parse_file, extract_text, parse_recipe_from_file
 from io import BytesIO
+from firestore_utils import counter_key, write_with_counters
+from tag_utils import update_tag_index
+from metrics import in_queue
 
 
 
@@ -72,7 +75,8 @@ def file_manager_ui(user):
                         st.session_state["saveas_file"] = file["id"]
                 with col_d:
                     if delete_button("Delete", key=f"delete_{file['id']}"):
-                        db.collection("files").document(file["id"]).update({"deleted": True})
+                        update_file(file["id"], {"deleted": True})
+                        update_tag_index("files", file["id"], file.get("name"), [], previous_tags=file.get("tags"))
                         st.rerun()
 
     if "editing_file" in st.session_state:
@@ -81,10 +85,12 @@ def file_manager_ui(user):
         tags = st.text_input("Tags (comma-separated)", value=", ".join(file.get("tags", [])))
         event_id = st.text_input("Linked Event ID", value=file.get("event_id", ""))
         if st.button("Save Changes", key="save_changes"):
-            db.collection("files").document(file["id"]).update({
-                "tags": [tag.strip() for tag in tags.split(",") if tag.strip()],
+            new_tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
+            update_file(file["id"], {
+                "tags": new_tags,
                 "event_id": event_id
             })
+            update_tag_index("files", file["id"], file.get("name"), new_tags, previous_tags=file.get("tags"))
             st.success("✅ File updated.")
             del st.session_state["editing_file"]
             st.rerun()
@@ -108,25 +114,97 @@ def file_manager_ui(user):
 # 📊 File Analytics
 # ----------------------------
 
+FILE_STATS_REF = ("summaries", "files")
+
+def _file_stats_ref(db):
+    return db.collection(FILE_STATS_REF[0]).document(FILE_STATS_REF[1])
+
+def _is_linked(file: dict) -> bool:
+    return bool(file.get("event_id") or (file.get("linked_to") or {}).get("events"))
+
+def file_stats_contribution(file: dict | None) -> dict:
+    """Counter values one file adds to summaries/files."""
+    if not file or file.get("deleted"):
+        return {}
+    return {
+        "total": 1,
+        "linked": 1 if _is_linked(file) else 0,
+        f"types.{counter_key(file.get('type', 'other'))}.count": 1,
+        f"contributors.{counter_key(file.get('uploaded_by', 'Unknown'))}": 1,
+    }
+
+def _file_stats_extra(file: dict | None) -> dict:
+    # Keep the readable MIME type next to its sanitized key
+    ftype = (file or {}).get("type", "other")
+    return {f"types.{counter_key(ftype)}.name": ftype}
+
+def update_file(file_id: str, updates: dict) -> None:
+    """Update a file document and keep the file statistics in step."""
+    from firebase_init import get_db
+    db = get_db()
+    write_with_counters(
+        db.collection("files").document(file_id),
+        updates,
+        _file_stats_ref(db),
+        file_stats_contribution,
+        extra=_file_stats_extra,
+    )
+
+def compute_file_stats(db) -> dict:
+    """Recompute the file statistics document from the files collection."""
+    stats = {"total": 0, "linked": 0, "types": {}, "contributors": {}}
+    for doc in db.collection("files").select(
+        ["deleted", "event_id", "linked_to", "type", "uploaded_by"]
+    ).stream():
+        file = doc.to_dict()
+        if file.get("deleted"):
+            continue
+        stats["total"] += 1
+        stats["linked"] += 1 if _is_linked(file) else 0
+        ftype = file.get("type", "other")
+        entry = stats["types"].setdefault(counter_key(ftype), {"name": ftype, "count": 0})
+        entry["count"] += 1
+        ukey = counter_key(file.get("uploaded_by", "Unknown"))
+        stats["contributors"][ukey] = stats["contributors"].get(ukey, 0) + 1
+    return stats
+
+def reconcile_file_stats() -> dict:
+    """Repair drift in summaries/files; returns {field: (stored, actual)} for mismatches."""
+    from firebase_init import get_db
+    db = get_db()
+    actual = compute_file_stats(db)
+    doc = _file_stats_ref(db).get()
+    stored = doc.to_dict() if doc.exists else {}
+
+    drift = {}
+    for field in ("total", "linked"):
+        if stored.get(field, 0) != actual[field]:
+            drift[field] = (stored.get(field, 0), actual[field])
+    stored_contributors = sum(1 for v in stored.get("contributors", {}).values() if v > 0)
+    if stored_contributors != len(actual["contributors"]):
+        drift["contributors"] = (stored_contributors, len(actual["contributors"]))
+    for key, entry in actual["types"].items():
+        stored_count = stored.get("types", {}).get(key, {}).get("count", 0)
+        if stored_count != entry["count"]:
+            drift[f"types.{entry['name']}"] = (stored_count, entry["count"])
+
+    actual["updated_at"] = datetime.utcnow()
+    _file_stats_ref(db).set(actual)
+    return drift
+
 def show_file_analytics():
     from firebase_init import get_db
     db = get_db()
 
     st.subheader("📊 File Analytics")
-    query = db.collection("files").where("deleted", "==", False)
-    files = list(query.stream())
-    file_data = [doc.to_dict() | {"id": doc.id} for doc in files]
+    doc = _file_stats_ref(db).get()
+    stats = doc.to_dict() if doc.exists else {}
 
-    total_files = len(file_data)
-    linked = len([f for f in file_data if f.get("event_id")])
+    total_files = stats.get("total", 0)
+    linked = stats.get("linked", 0)
     unlinked = total_files - linked
-    types = {}
-    contributors = set()
-
-    for file in file_data:
-        contributors.add(file.get("uploaded_by", "Unknown"))
-        ftype = file.get("type", "other")
-        types[ftype] = types.get(ftype, 0) + 1
+    types = {v.get("name", k): v.get("count", 0) for k, v in stats.get("types", {}).items() if v.get("count", 0) > 0}
+    contributors = [k for k, v in stats.get("contributors", {}).items() if v > 0]
 
     st.metric("📁 Total Files", total_files)
     st.metric("🔗 Linked to Events", linked)
@@ -141,6 +219,7 @@ def show_file_analytics():
 # ⬆️ Save Uploaded File
 # ----------------------------
 
+@in_queue("file_upload")
 def save_uploaded_file(file, event_id: str, uploaded_by: str):
     try:
         from firebase_init import get_db, get_bucket
@@ -214,7 +293,14 @@ def save_uploaded_file(file, event_id: str, uploaded_by: str):
         } if recipe else {},
     }
 
-    db.collection("files").document(file_id).set(metadata)
+    write_with_counters(
+        db.collection("files").document(file_id),
+        metadata,
+        _file_stats_ref(db),
+        file_stats_contribution,
+        merge_update=False,
+        extra=_file_stats_extra,
+    )
     return {
         "file_id": file_id,
         "parsed": parsed_data if parsed_data else {"recipes": recipe},
@@ -240,7 +326,7 @@ def link_file_to_entity(file_id: str, entity_type: str, entity_id: str):
     if entity_id not in current_links:
         current_links.append(entity_id)
     linked_to[entity_type] = current_links
-    file_ref.update({"linked_to": linked_to})
+    update_file(file_id, {"linked_to": linked_to})
 
 # ----------------------------
 # 🧩 Link Editor UI
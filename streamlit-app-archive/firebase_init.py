@@ -1,25 +1,51 @@
-import firebase_admin
-from firebase_admin import credentials, firestore, storage
+import os
 import streamlit as st
 
-# Initialize Firebase app (only once)
-if not firebase_admin._apps:
-    try:
-        cred = credentials.Certificate(dict(st.secrets["firebase_admin"]))
-        storage_bucket = st.secrets.get("firebase", {}).get("storageBucket")
-        if not storage_bucket:
-            raise ValueError("Missing firebase.storageBucket in secrets")
-        firebase_admin.initialize_app(cred, {
-            "storageBucket": storage_bucket
-        })
-    except Exception as e:
-        st.error(f"Firebase initialization failed: {str(e)}")
-        raise
-
-# Export Firestore + Storage
-db = firestore.client()
-bucket = storage.bucket()
-firestore = firestore  # expose firestore for Increment, etc.
+# MM_FIRESTORE_BACKEND=memory swaps Firestore/Storage for the in-memory
+# stand-ins in firestore_memory (benchmarks, offline runs). Simulated
+# round-trip latency: MM_FIRESTORE_LATENCY_MS (+ _JITTER_MS, _PER_DOC_MS).
+FIRESTORE_BACKEND = os.getenv("MM_FIRESTORE_BACKEND", "firebase")
+
+if FIRESTORE_BACKEND == "memory":
+    from firestore_memory import MemoryFirestore, MemoryBucket, firestore_module, storage_module
+
+    db = MemoryFirestore(
+        latency=float(os.getenv("MM_FIRESTORE_LATENCY_MS", "0")) / 1000,
+        jitter=float(os.getenv("MM_FIRESTORE_JITTER_MS", "0")) / 1000,
+        per_doc=float(os.getenv("MM_FIRESTORE_PER_DOC_MS", "0")) / 1000,
+    )
+    bucket = MemoryBucket()
+    firestore = firestore_module(db)
+    storage = storage_module(bucket)
+else:
+    import firebase_admin
+    from firebase_admin import credentials, firestore, storage
+
+    # Initialize Firebase app (only once)
+    if not firebase_admin._apps:
+        try:
+            cred = credentials.Certificate(dict(st.secrets["firebase_admin"]))
+            storage_bucket = st.secrets.get("firebase", {}).get("storageBucket")
+            if not storage_bucket:
+                raise ValueError("Missing firebase.storageBucket in secrets")
+            firebase_admin.initialize_app(cred, {
+                "storageBucket": storage_bucket
+            })
+        except Exception as e:
+            st.error(f"Firebase initialization failed: {str(e)}")
+            raise
+
+    # Export Firestore + Storage
+    db = firestore.client()
+    bucket = storage.bucket()
+    firestore = firestore  # expose firestore for Increment, etc.
+
+# MM_FIRESTORE_PROFILE=1 counts reads/writes per rerun (see firestore_profiler);
+# MM_TRACE=1 and MM_METRICS=1 need the same wrapper to see each Firestore call
+if any(os.getenv(flag, "0") == "1" for flag in ("MM_FIRESTORE_PROFILE", "MM_TRACE", "MM_METRICS")):
+    from firestore_profiler import profile_client
+    db = profile_client(db)
+
 __all__ = ["db", "bucket", "firestore"]
 
 # Optional accessors for backward compatibility
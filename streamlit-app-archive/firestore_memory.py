@@ -0,0 +1,743 @@
+"""
+🧠 In-memory Firestore backend
+A stand-in for the Firestore client covering the subset this app uses, so
+tab data paths can be run and timed without a Firebase project:
+- collections, subcollections, collection_group
+- where / order_by / limit / offset / select, stream / get, count()
+- document get / set (merge) / update (dotted paths) / create / delete
+- batches, transactions (@firestore.transactional), get_all
+- Increment, ArrayUnion, ArrayRemove, DELETE_FIELD, SERVER_TIMESTAMP
+- A Storage bucket stand-in (blob upload / make_public / public_url)
+
+Every server round trip sleeps for the configured latency (plus jitter
+and a per-document cost for reads) and is counted in ``client.stats``.
+
+Selected with MM_FIRESTORE_BACKEND=memory (see firebase_init).
+"""
+
+import copy
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+try:
+    from google.api_core.exceptions import AlreadyExists, NotFound
+except ImportError:  # firebase libraries not installed
+    class NotFound(Exception):
+        pass
+
+    class AlreadyExists(Exception):
+        pass
+
+
+_MISSING = object()
+
+
+# ----------------------------
+# 🔧 Sentinels & Transforms
+# ----------------------------
+
+class Sentinel:
+    def __init__(self, description: str):
+        self.description = description
+
+    def __repr__(self):
+        return f"Sentinel: {self.description}"
+
+
+DELETE_FIELD = Sentinel("Value used to delete a field in a document.")
+SERVER_TIMESTAMP = Sentinel("Value used to set a document field to the server timestamp.")
+
+
+class Increment:
+    def __init__(self, value):
+        self.value = value
+
+
+class ArrayUnion:
+    def __init__(self, values):
+        self.values = list(values)
+
+
+class ArrayRemove:
+    def __init__(self, values):
+        self.values = list(values)
+
+
+def _transform_kind(value) -> str | None:
+    # Duck-typed so the real google.cloud.firestore_v1 transforms work too
+    name = type(value).__name__
+    if name in ("Increment", "ArrayUnion", "ArrayRemove"):
+        return name
+    if name == "Sentinel":
+        description = getattr(value, "description", "").lower()
+        if "delete" in description:
+            return "DELETE_FIELD"
+        if "timestamp" in description:
+            return "SERVER_TIMESTAMP"
+    return None
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _normalize(value):
+    """Store values the way Firestore returns them (UTC-aware datetimes, lists, copies)."""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, DocumentReference):
+        return value
+    return copy.deepcopy(value)
+
+
+def _apply_transform(current, value):
+    kind = _transform_kind(value)
+    if kind == "Increment":
+        step = value.value
+        return (current + step) if isinstance(current, (int, float)) and not isinstance(current, bool) else step
+    if kind == "ArrayUnion":
+        result = list(current) if isinstance(current, list) else []
+        for item in value.values:
+            if item not in result:
+                result.append(_normalize(item))
+        return result
+    if kind == "ArrayRemove":
+        return [v for v in (current if isinstance(current, list) else []) if v not in value.values]
+    if kind == "SERVER_TIMESTAMP":
+        return _now()
+    return _normalize(value)
+
+
+# ----------------------------
+# 🗺️ Field Paths
+# ----------------------------
+
+def _split(path: str) -> list[str]:
+    return [p.strip("`") for p in path.split(".")]
+
+
+def get_field(data: dict, path: str):
+    node = data
+    for part in _split(path):
+        if not isinstance(node, dict) or part not in node:
+            return _MISSING
+        node = node[part]
+    return node
+
+
+def _set_path(data: dict, path: list[str], value) -> None:
+    node = data
+    for part in path[:-1]:
+        if not isinstance(node.get(part), dict):
+            node[part] = {}
+        node = node[part]
+    if _transform_kind(value) == "DELETE_FIELD":
+        node.pop(path[-1], None)
+    elif isinstance(value, dict) and not _transform_kind(value):
+        node[path[-1]] = _fresh(value)
+    else:
+        node[path[-1]] = _apply_transform(node.get(path[-1]), value)
+
+
+def _merge(target: dict, changes: dict) -> None:
+    for key, value in changes.items():
+        if isinstance(value, dict) and not _transform_kind(value):
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            _merge(target[key], value)
+        else:
+            _set_path(target, [key], value)
+
+
+def _fresh(data: dict) -> dict:
+    doc = {}
+    _merge(doc, data)
+    return doc
+
+
+# ----------------------------
+# 🔀 Comparison
+# ----------------------------
+
+def _type_rank(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, datetime):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, bytes):
+        return 5
+    if isinstance(value, DocumentReference):
+        return 6
+    if isinstance(value, list):
+        return 8
+    return 9
+
+
+def sort_key(value):
+    value = _normalize(value) if isinstance(value, datetime) else value
+    rank = _type_rank(value)
+    if rank in (2, 3, 4, 5):
+        return (rank, value)
+    if rank == 1:
+        return (rank, int(value))
+    if rank == 6:
+        return (rank, value.path)
+    if rank == 8:
+        return (rank, [sort_key(v) for v in value])
+    if rank == 9:
+        return (rank, repr(value))
+    return (rank, 0)
+
+
+def _matches(data: dict, field: str, op: str, value) -> bool:
+    actual = get_field(data, field)
+    if actual is _MISSING:
+        return False
+    op = op.replace("_", "-").lower()
+    if op == "array-contains":
+        return isinstance(actual, list) and _normalize(value) in actual
+    if op == "array-contains-any":
+        return isinstance(actual, list) and any(_normalize(v) in actual for v in value)
+    if op == "in":
+        return any(sort_key(actual) == sort_key(v) for v in value)
+    if op == "not-in":
+        return actual is not None and all(sort_key(actual) != sort_key(v) for v in value)
+    a, b = sort_key(actual), sort_key(value)
+    if op == "==":
+        return a == b
+    if op == "!=":
+        return actual is not None and a != b
+    if a[0] != b[0]:
+        return False  # range filters only match values of the same type
+    return {"<": a < b, "<=": a <= b, ">": a > b, ">=": a >= b}[op]
+
+
+# ----------------------------
+# 📄 Snapshots & References
+# ----------------------------
+
+class DocumentSnapshot:
+    def __init__(self, reference, data, create_time=None, update_time=None, fields=None):
+        self.reference = reference
+        self._data = data
+        self.create_time = create_time
+        self.update_time = update_time
+        self.read_time = _now()
+        self._fields = fields
+
+    @property
+    def id(self) -> str:
+        return self.reference.id
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self):
+        if self._data is None:
+            return None
+        if self._fields is None:
+            return copy.deepcopy(self._data)
+        projected = {}
+        for field in self._fields:
+            value = get_field(self._data, field)
+            if value is not _MISSING:
+                _set_path(projected, _split(field), copy.deepcopy(value))
+        return projected
+
+    def get(self, field_path: str):
+        value = get_field(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+
+class DocumentReference:
+    def __init__(self, client, path: str):
+        self._client = client
+        self.path = path
+
+    @property
+    def id(self) -> str:
+        return self.path.rsplit("/", 1)[-1]
+
+    @property
+    def parent(self):
+        return CollectionReference(self._client, self.path.rsplit("/", 1)[0])
+
+    def __eq__(self, other):
+        return isinstance(other, DocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def __deepcopy__(self, memo):
+        return self  # references are immutable; don't copy the client
+
+    def __repr__(self):
+        return f"<DocumentReference {self.path}>"
+
+    def collection(self, collection_id: str):
+        return CollectionReference(self._client, f"{self.path}/{collection_id}")
+
+    def collections(self):
+        self._client._round_trip("list")
+        return [CollectionReference(self._client, p) for p in self._client._subcollections(self.path)]
+
+    def get(self, field_paths=None, transaction=None, **_):
+        self._client._round_trip("get", 1)
+        return self._client._snapshot(self, field_paths)
+
+    def set(self, document_data: dict, merge: bool = False, **_):
+        self._client._round_trip("write")
+        self._client._commit([("set", self, document_data, merge)])
+
+    def update(self, field_updates: dict, **_):
+        self._client._round_trip("write")
+        self._client._commit([("update", self, field_updates, None)])
+
+    def create(self, document_data: dict, **_):
+        self._client._round_trip("write")
+        self._client._commit([("create", self, document_data, None)])
+
+    def delete(self, **_):
+        self._client._round_trip("write")
+        self._client._commit([("delete", self, None, None)])
+
+
+class _AggregationQuery:
+    def __init__(self, query, alias: str):
+        self._query = query
+        self._alias = alias
+
+    def get(self, transaction=None, **_):
+        matches = self._query._matching_documents()
+        self._query._client._round_trip("aggregate", 1)
+        return [[SimpleNamespace(alias=self._alias, value=len(matches))]]
+
+    stream = get
+
+
+class Query:
+    ASCENDING = "ASCENDING"
+    DESCENDING = "DESCENDING"
+
+    def __init__(self, client, path: str | None, group_id: str | None = None):
+        self._client = client
+        self._path = path
+        self._group_id = group_id
+        self._filters: list = []
+        self._orders: list = []
+        self._limit = None
+        self._offset = 0
+        self._fields = None
+
+    def _copy(self, **changes):
+        query = copy.copy(self)
+        query._filters = list(self._filters)
+        query._orders = list(self._orders)
+        for key, value in changes.items():
+            setattr(query, key, value)
+        return query
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path = getattr(filter, "field_path", None)
+            op_string = getattr(filter, "op_string", None)
+            value = getattr(filter, "value", None)
+        query = self._copy()
+        query._filters.append((field_path, op_string, value))
+        return query
+
+    def order_by(self, field_path: str, direction: str = ASCENDING):
+        query = self._copy()
+        query._orders.append((field_path, str(direction).upper().endswith("DESCENDING")))
+        return query
+
+    def limit(self, count: int):
+        return self._copy(_limit=count)
+
+    def offset(self, num_to_skip: int):
+        return self._copy(_offset=num_to_skip)
+
+    def select(self, field_paths):
+        return self._copy(_fields=list(field_paths))
+
+    def count(self, alias: str = "count"):
+        return _AggregationQuery(self, alias)
+
+    def _matching_documents(self) -> list:
+        with self._client._lock:
+            if self._group_id is not None:
+                candidates = [
+                    p for p in self._client._docs
+                    if p.rsplit("/", 2)[-2] == self._group_id
+                ]
+            else:
+                prefix = self._path + "/"
+                candidates = [
+                    p for p in self._client._docs
+                    if p.startswith(prefix) and "/" not in p[len(prefix):]
+                ]
+            rows = [(p, self._client._docs[p]) for p in candidates]
+
+        rows = [
+            (p, entry) for p, entry in rows
+            if all(_matches(entry["data"], f, op, v) for f, op, v in self._filters)
+        ]
+        # Ordering by a field skips documents that don't have it
+        for field, _ in self._orders:
+            rows = [(p, e) for p, e in rows if get_field(e["data"], field) is not _MISSING]
+        rows.sort(key=lambda r: r[0].rsplit("/", 1)[-1])
+        for field, descending in reversed(self._orders):
+            rows.sort(key=lambda r: sort_key(get_field(r[1]["data"], field)), reverse=descending)
+
+        rows = rows[self._offset:]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        return rows
+
+    def stream(self, transaction=None, **_):
+        rows = self._matching_documents()
+        self._client._round_trip("query", len(rows))
+        for path, entry in rows:
+            yield DocumentSnapshot(
+                DocumentReference(self._client, path),
+                copy.deepcopy(entry["data"]),
+                entry["create_time"],
+                entry["update_time"],
+                self._fields,
+            )
+
+    def get(self, transaction=None, **_):
+        return list(self.stream(transaction=transaction))
+
+
+class CollectionReference(Query):
+    def __init__(self, client, path: str):
+        super().__init__(client, path)
+
+    @property
+    def id(self) -> str:
+        return self._path.rsplit("/", 1)[-1]
+
+    @property
+    def parent(self):
+        if "/" not in self._path:
+            return None
+        return DocumentReference(self._client, self._path.rsplit("/", 1)[0])
+
+    def document(self, document_id: str | None = None):
+        return DocumentReference(self._client, f"{self._path}/{document_id or uuid.uuid4().hex[:20]}")
+
+    def add(self, document_data: dict, document_id: str | None = None, **_):
+        ref = self.document(document_id)
+        ref.create(document_data)
+        return _now(), ref
+
+    def list_documents(self, **_):
+        self._client._round_trip("list")
+        return [DocumentReference(self._client, p) for p, _ in Query(self._client, self._path)._matching_documents()]
+
+
+# ----------------------------
+# ✍️ Batches & Transactions
+# ----------------------------
+
+class WriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes: list = []
+
+    def set(self, reference, document_data: dict, merge: bool = False):
+        self._writes.append(("set", reference, document_data, merge))
+        return self
+
+    def update(self, reference, field_updates: dict):
+        self._writes.append(("update", reference, field_updates, None))
+        return self
+
+    def create(self, reference, document_data: dict):
+        self._writes.append(("create", reference, document_data, None))
+        return self
+
+    def delete(self, reference, **_):
+        self._writes.append(("delete", reference, None, None))
+        return self
+
+    def __len__(self):
+        return len(self._writes)
+
+    def commit(self, **_):
+        writes, self._writes = self._writes, []
+        if writes:
+            self._client._round_trip("commit")
+            self._client._commit(writes)
+        return [SimpleNamespace(update_time=_now()) for _ in writes]
+
+
+class Transaction(WriteBatch):
+    """Reads go straight to the store; writes are buffered until commit."""
+
+    def get(self, ref_or_query, **_):
+        if isinstance(ref_or_query, DocumentReference):
+            return iter([ref_or_query.get(transaction=self)])
+        return iter(list(ref_or_query.stream(transaction=self)))
+
+    def get_all(self, references, **_):
+        return self._client.get_all(references, transaction=self)
+
+
+def transactional(fn):
+    """Run ``fn(transaction, ...)`` atomically against the in-memory store.
+
+    The store lock is held for the whole function, so concurrent
+    transactions are serialized instead of retried.
+    """
+    def wrapper(transaction, *args, **kwargs):
+        with transaction._client._lock:
+            result = fn(transaction, *args, **kwargs)
+            transaction.commit()
+        return result
+
+    wrapper.__name__ = getattr(fn, "__name__", "transactional")
+    wrapper.__doc__ = getattr(fn, "__doc__", None)
+    return wrapper
+
+
+# ----------------------------
+# 🗄️ Client
+# ----------------------------
+
+class MemoryFirestore:
+    """In-memory Firestore client with simulated round-trip latency.
+
+    ``latency`` and ``jitter`` are seconds per RPC; ``per_doc`` is added for
+    every document a read returns.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, per_doc: float = 0.0, seed: int | None = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.per_doc = per_doc
+        self.stats = Counter()
+        self._docs: dict[str, dict] = {}
+        self._lock = threading.RLock()
+        self._rng = random.Random(seed)
+        self._listeners: list = []
+
+    # --- accounting -------------------------------------------------
+    def add_listener(self, callback) -> None:
+        """Call ``callback(kind, docs)`` on every simulated round trip."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def reset_stats(self) -> None:
+        self.stats = Counter()
+
+    def _round_trip(self, kind: str, docs: int = 0) -> None:
+        self.stats[kind] += 1
+        self.stats["docs_read"] += docs
+        for callback in list(self._listeners):
+            callback(kind, docs)
+        delay = self.latency + self.per_doc * docs
+        if self.jitter:
+            delay += self._rng.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    # --- API --------------------------------------------------------
+    def collection(self, path: str) -> CollectionReference:
+        return CollectionReference(self, path.strip("/"))
+
+    def document(self, path: str) -> DocumentReference:
+        return DocumentReference(self, path.strip("/"))
+
+    def collection_group(self, collection_id: str) -> Query:
+        return Query(self, None, group_id=collection_id)
+
+    def collections(self):
+        with self._lock:
+            roots = sorted({p.split("/", 1)[0] for p in self._docs})
+        return [CollectionReference(self, r) for r in roots]
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self)
+
+    def transaction(self, **_) -> Transaction:
+        return Transaction(self)
+
+    def get_all(self, references, field_paths=None, transaction=None, **_):
+        references = list(references)
+        self._round_trip("get_all", len(references))
+        for ref in references:
+            yield self._snapshot(ref, field_paths)
+
+    # --- storage ----------------------------------------------------
+    def _snapshot(self, ref: DocumentReference, field_paths=None) -> DocumentSnapshot:
+        with self._lock:
+            entry = self._docs.get(ref.path)
+            if entry is None:
+                return DocumentSnapshot(ref, None)
+            return DocumentSnapshot(
+                ref, copy.deepcopy(entry["data"]), entry["create_time"], entry["update_time"],
+                list(field_paths) if field_paths is not None else None,
+            )
+
+    def _subcollections(self, doc_path: str) -> list[str]:
+        prefix = doc_path + "/"
+        with self._lock:
+            return sorted({
+                prefix + p[len(prefix):].split("/", 1)[0]
+                for p in self._docs if p.startswith(prefix)
+            })
+
+    def _commit(self, writes: list) -> None:
+        """Apply writes atomically; nothing is applied if any write fails."""
+        with self._lock:
+            staged = {}
+            for op, ref, data, merge in writes:
+                path = ref.path
+                current = staged[path] if path in staged else self._docs.get(path)
+                now = _now()
+                if op == "delete":
+                    staged[path] = None
+                    continue
+                if op == "create" and current is not None:
+                    raise AlreadyExists(f"Document already exists: {path}")
+                if op == "update" and current is None:
+                    raise NotFound(f"No document to update: {path}")
+
+                if op == "update":
+                    new_data = copy.deepcopy(current["data"])
+                    for field, value in data.items():
+                        _set_path(new_data, _split(field), value)
+                elif merge and current is not None:
+                    new_data = copy.deepcopy(current["data"])
+                    _merge(new_data, data)
+                else:
+                    new_data = _fresh(data)
+                staged[path] = {
+                    "data": new_data,
+                    "create_time": current["create_time"] if current else now,
+                    "update_time": now,
+                }
+            for path, entry in staged.items():
+                if entry is None:
+                    self._docs.pop(path, None)
+                else:
+                    self._docs[path] = entry
+            self.stats["docs_written"] += len(writes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._docs.clear()
+
+    def document_count(self) -> int:
+        with self._lock:
+            return len(self._docs)
+
+
+# ----------------------------
+# 🪣 Storage Bucket
+# ----------------------------
+
+class MemoryBlob:
+    def __init__(self, bucket, name: str):
+        self.bucket = bucket
+        self.name = name
+        self.content_type = None
+
+    @property
+    def public_url(self) -> str:
+        return f"memory://{self.bucket.name}/{self.name}"
+
+    def upload_from_string(self, data, content_type=None, **_):
+        self.bucket._blobs[self.name] = (data.encode("utf-8") if isinstance(data, str) else bytes(data), content_type)
+
+    def upload_from_file(self, file_obj, content_type=None, **_):
+        self.upload_from_string(file_obj.read(), content_type=content_type)
+
+    def upload_from_filename(self, filename, content_type=None, **_):
+        with open(filename, "rb") as f:
+            self.upload_from_string(f.read(), content_type=content_type)
+
+    def download_as_bytes(self, **_) -> bytes:
+        if self.name not in self.bucket._blobs:
+            raise NotFound(f"No blob: {self.name}")
+        return self.bucket._blobs[self.name][0]
+
+    def download_as_text(self, encoding="utf-8", **_) -> str:
+        return self.download_as_bytes().decode(encoding)
+
+    def download_to_filename(self, filename, **_):
+        with open(filename, "wb") as f:
+            f.write(self.download_as_bytes())
+
+    def exists(self, **_) -> bool:
+        return self.name in self.bucket._blobs
+
+    def delete(self, **_):
+        self.bucket._blobs.pop(self.name, None)
+
+    def make_public(self, **_):
+        return None
+
+    def generate_signed_url(self, *args, **kwargs) -> str:
+        return self.public_url
+
+
+class MemoryBucket:
+    def __init__(self, name: str = "memory-bucket"):
+        self.name = name
+        self._blobs: dict[str, tuple] = {}
+
+    def blob(self, name: str) -> MemoryBlob:
+        return MemoryBlob(self, name)
+
+    def get_blob(self, name: str):
+        return MemoryBlob(self, name) if name in self._blobs else None
+
+    def list_blobs(self, prefix: str = "", **_):
+        return [MemoryBlob(self, n) for n in sorted(self._blobs) if n.startswith(prefix)]
+
+
+# ----------------------------
+# 📦 Module Shims
+# ----------------------------
+
+def firestore_module(client: MemoryFirestore):
+    """Stand-in for ``firebase_admin.firestore`` bound to ``client``."""
+    return SimpleNamespace(
+        client=lambda app=None: client,
+        transactional=transactional,
+        Increment=Increment,
+        ArrayUnion=ArrayUnion,
+        ArrayRemove=ArrayRemove,
+        DELETE_FIELD=DELETE_FIELD,
+        SERVER_TIMESTAMP=SERVER_TIMESTAMP,
+        Query=Query,
+    )
+
+
+def storage_module(bucket: MemoryBucket):
+    """Stand-in for ``firebase_admin.storage`` bound to ``bucket``."""
+    return SimpleNamespace(bucket=lambda name=None, app=None: bucket)
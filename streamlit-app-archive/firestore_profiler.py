@@ -0,0 +1,431 @@
+"""
+🔥 Firestore profiler
+Counts what every Streamlit rerun costs in Firestore:
+- A transparent wrapper around the client records each read, write,
+  query and commit with its shape (path with ids blanked, filters,
+  ordering) and the app function that issued it
+- Same-shape reads repeated within one rerun are flagged as likely N+1
+  patterns (e.g. one get per event inside a loop)
+- Totals are logged at the end of every rerun and shown in an admin
+  debug panel in the sidebar
+
+Enable with MM_FIRESTORE_PROFILE=1; MM_FIRESTORE_N_PLUS_ONE sets how many
+same-shape reads in one rerun get flagged (default 5). Work handed to
+other threads is counted under a shared "background" profile, and writes
+made through ``snapshot.reference`` are not seen. With MM_TRACE=1 each
+call also becomes a tracing span, and with MM_METRICS=1 it is counted in
+the metrics registry.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import streamlit as st
+
+from metrics import observe_firestore, observe_firestore_stream
+from tracing import record_span
+
+FIRESTORE_PROFILING = os.getenv("MM_FIRESTORE_PROFILE", "0") == "1"
+N_PLUS_ONE_THRESHOLD = int(os.getenv("MM_FIRESTORE_N_PLUS_ONE", "5"))
+
+READ_KINDS = ("get", "query", "aggregate", "get_all", "list")
+# Library plumbing between the app code and the client; skipped when
+# deciding which function issued a call
+_PLUMBING_FILES = {"firestore_profiler.py", "firestore_utils.py", "firestore_memory.py"}
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ----------------------------
+# 📒 Per-rerun Profile
+# ----------------------------
+
+class RerunProfile:
+    """Firestore activity of one rerun, grouped by operation shape and caller."""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.started = time.perf_counter()
+        self.totals = Counter()
+        self.shapes: dict = {}
+        self.callers: dict = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, shape: str, caller: str, reads: int = 0, writes: int = 0,
+               seconds: float = 0.0, round_trip: bool = True) -> None:
+        with self._lock:
+            entry = self.shapes.setdefault((kind, shape), {
+                "kind": kind, "shape": shape, "calls": 0, "docs": 0, "ms": 0.0, "callers": Counter(),
+            })
+            entry["calls"] += 1
+            entry["docs"] += reads
+            entry["ms"] += seconds * 1000
+            entry["callers"][caller] += 1
+            by_caller = self.callers.setdefault(caller, Counter())
+            for counter in (self.totals, by_caller):
+                counter[kind] += 1
+                counter["reads"] += reads
+                counter["writes"] += writes
+                counter["round_trips"] += 1 if round_trip else 0
+
+    def add_reads(self, kind: str, shape: str, caller: str, docs: int, seconds: float) -> None:
+        """Documents counted after a streamed query finishes."""
+        with self._lock:
+            entry = self.shapes[(kind, shape)]
+            entry["docs"] += docs
+            entry["ms"] += seconds * 1000
+            self.totals["reads"] += docs
+            self.callers[caller]["reads"] += docs
+
+    def n_plus_one(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list:
+        with self._lock:
+            flagged = [
+                {"kind": e["kind"], "shape": e["shape"], "calls": e["calls"], "docs": e["docs"],
+                 "callers": dict(e["callers"])}
+                for e in self.shapes.values()
+                if e["kind"] in READ_KINDS and e["calls"] >= threshold
+            ]
+        return sorted(flagged, key=lambda e: -e["calls"])
+
+    def summary(self) -> dict:
+        with self._lock:
+            shapes = sorted(self.shapes.values(), key=lambda e: (-e["docs"], -e["calls"]))
+            summary = {
+                "label": self.label,
+                "ms": round((time.perf_counter() - self.started) * 1000, 1),
+                "reads": self.totals["reads"],
+                "writes": self.totals["writes"],
+                "round_trips": self.totals["round_trips"],
+                "ops": {k: self.totals[k] for k in ("get", "query", "aggregate", "get_all", "list", "write", "commit") if self.totals[k]},
+                "callers": sorted(
+                    ({"caller": c, "reads": v["reads"], "writes": v["writes"], "round_trips": v["round_trips"]}
+                     for c, v in self.callers.items()),
+                    key=lambda r: (-r["reads"], -r["round_trips"]),
+                ),
+                "shapes": [
+                    {"kind": e["kind"], "shape": e["shape"], "calls": e["calls"], "docs": e["docs"],
+                     "ms": round(e["ms"], 1), "callers": dict(e["callers"])}
+                    for e in shapes[:50]
+                ],
+            }
+        summary["n_plus_one"] = self.n_plus_one()
+        return summary
+
+
+_local = threading.local()
+_background = RerunProfile("background")
+
+
+def current_profile() -> RerunProfile:
+    return getattr(_local, "profile", None) or _background
+
+
+def begin_rerun(label: str = "") -> RerunProfile:
+    _local.profile = RerunProfile(label)
+    return _local.profile
+
+
+def end_rerun(label: str | None = None, log: bool = True) -> dict | None:
+    """Finish the current rerun's profile; logs it and keeps it for the debug panel."""
+    profile = getattr(_local, "profile", None)
+    _local.profile = None
+    if profile is None:
+        return None
+    if label:
+        profile.label = label
+    summary = profile.summary()
+    if log:
+        print(
+            f"🔥 Firestore [{summary['label'] or 'rerun'}] {summary['reads']:,} reads, "
+            f"{summary['writes']:,} writes, {summary['round_trips']:,} round trips in {summary['ms']:.0f} ms"
+        )
+        for flagged in summary["n_plus_one"]:
+            callers = ", ".join(flagged["callers"])
+            print(f"⚠️ Possible N+1: {flagged['calls']}× {flagged['kind']} {flagged['shape']} from {callers}")
+    try:
+        st.session_state["firestore_profile"] = summary
+    except Exception:
+        pass
+    return summary
+
+
+@contextmanager
+def profile_rerun(label=lambda: ""):
+    """Profile the enclosed rerun when MM_FIRESTORE_PROFILE is on.
+
+    ``label`` is called at the end, so it can name the tab that was rendered.
+    """
+    if not FIRESTORE_PROFILING:
+        yield None
+        return
+    profile = begin_rerun()
+    try:
+        yield profile
+    finally:
+        end_rerun(label() if callable(label) else label)
+
+# ----------------------------
+# 🧭 Call Attribution
+# ----------------------------
+
+_skip_cache: dict = {}
+
+
+def _is_plumbing(filename: str) -> bool:
+    skip = _skip_cache.get(filename)
+    if skip is None:
+        path = os.path.abspath(filename)
+        skip = not path.startswith(_APP_DIR) or os.path.basename(path) in _PLUMBING_FILES
+        _skip_cache[filename] = skip
+    return skip
+
+
+def _caller() -> str:
+    """``module.function`` of the nearest app frame that isn't Firestore plumbing."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        if not _is_plumbing(code.co_filename) and not code.co_name.startswith(("<listcomp", "<genexpr", "<dictcomp", "<setcomp", "<lambda")):
+            module = os.path.splitext(os.path.basename(code.co_filename))[0]
+            return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+        frame = frame.f_back
+    return "unknown"
+
+# ----------------------------
+# 🪞 Client Wrapper
+# ----------------------------
+
+_DOC, _QUERY, _AGG, _WRITER, _CLIENT = "doc", "query", "aggregate", "writer", "client"
+_WRITE_METHODS = {"set", "update", "create", "delete"}
+_SHAPE_METHODS = {"where", "order_by", "limit", "limit_to_last", "offset", "select",
+                  "start_at", "start_after", "end_at", "end_before", "count"}
+
+
+def _kind_of(obj) -> str | None:
+    name = type(obj).__name__
+    if name == "DocumentReference":
+        return _DOC
+    if name in ("CollectionReference", "Query", "CollectionGroup"):
+        return _QUERY
+    if "AggregationQuery" in name:
+        return _AGG
+    if name in ("WriteBatch", "Transaction", "BulkWriteBatch"):
+        return _WRITER
+    return None
+
+
+def _blank_ids(path: str) -> str:
+    parts = path.strip("/").split("/")
+    return "/".join(p if i % 2 == 0 else "{id}" for i, p in enumerate(parts))
+
+
+def _child_shape(shape: str, name: str, args: tuple, kwargs: dict) -> str:
+    if name == "collection":
+        return f"{shape}/{args[0]}" if shape else _blank_ids(args[0])
+    if name == "document":
+        return f"{shape}/{{id}}" if shape else _blank_ids(args[0])
+    if name == "collection_group":
+        return f"**/{args[0]}"
+    if name == "where":
+        filt = kwargs.get("filter")
+        if filt is not None:
+            field = getattr(filt, "field_path", None)
+            op = getattr(filt, "op_string", None)
+            return f"{shape} where {field}{op}" if field else f"{shape} where {type(filt).__name__}"
+        field = args[0] if args else kwargs.get("field_path")
+        op = args[1] if len(args) > 1 else kwargs.get("op_string")
+        return f"{shape} where {field}{op}"
+    if name == "order_by":
+        return f"{shape} order_by {args[0] if args else kwargs.get('field_path')}"
+    if name == "select":
+        return f"{shape} select"
+    if name == "count":
+        return f"{shape} count()"
+    if name in _SHAPE_METHODS:
+        return f"{shape} {name}"
+    if name == "parent":
+        return shape.rsplit("/", 1)[0] if "/" in shape else shape
+    return shape
+
+
+def _unwrap(value):
+    if isinstance(value, _Profiled):
+        return value._target
+    if isinstance(value, (list, tuple)) and any(isinstance(v, _Profiled) for v in value):
+        return type(value)(_unwrap(v) for v in value)
+    return value
+
+
+def _wrap(value, shape: str):
+    kind = _kind_of(value)
+    return _Profiled(value, shape, kind) if kind else value
+
+
+class _Profiled:
+    """Forwards everything to the wrapped Firestore object, recording terminal calls."""
+
+    __slots__ = ("_target", "_shape", "_kind")
+
+    def __init__(self, target, shape: str = "", kind: str = _CLIENT):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_shape", shape)
+        object.__setattr__(self, "_kind", kind)
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if not callable(value):
+            return _wrap(value, _child_shape(self._shape, name, (), {}))
+        return lambda *args, **kwargs: self._call(name, value, args, kwargs)
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def __eq__(self, other):
+        return self._target == _unwrap(other)
+
+    def __hash__(self):
+        return hash(self._target)
+
+    def __bool__(self):
+        return True
+
+    def __len__(self):
+        return len(self._target)
+
+    def __repr__(self):
+        return repr(self._target)
+
+    def _call(self, name: str, fn, args: tuple, kwargs: dict):
+        raw_args = tuple(_unwrap(a) for a in args)
+        raw_kwargs = {k: _unwrap(v) for k, v in kwargs.items()}
+        if name == "get_all" and raw_args:
+            raw_args = ([_unwrap(r) for r in raw_args[0]],) + raw_args[1:]
+
+        op = self._operation(name, args)
+        if op is None:
+            result = fn(*raw_args, **raw_kwargs)
+            if result is self._target:
+                return self
+            return _wrap(result, _child_shape(self._shape, name, args, kwargs))
+
+        kind, shape, streamed = op
+        profile, caller = current_profile(), _caller()
+        start = time.perf_counter()
+        result = fn(*raw_args, **raw_kwargs)
+        end = time.perf_counter()
+
+        if streamed:
+            profile.record(kind, shape, caller, seconds=end - start)
+            observe_firestore(kind)
+            return _count_stream(result, profile, kind, shape, caller, start)
+        reads = writes = 0
+        if kind == "query":
+            result = list(result)
+            reads = len(result)
+        elif kind in ("get", "aggregate"):
+            reads = 1
+        elif kind == "write":
+            writes = 1
+        batched = kind == "write" and self._kind == _WRITER
+        profile.record(kind, shape, caller, reads=reads, writes=writes, seconds=end - start, round_trip=not batched)
+        observe_firestore(kind, reads=reads, writes=writes, seconds=None if batched else end - start)
+        if not batched:
+            record_span(f"firestore {kind}", "firestore", start, end, {"shape": shape, "caller": caller, "docs": reads})
+        if kind == "write" and result is self._target:
+            return self
+        return result
+
+    def _operation(self, name: str, args: tuple):
+        """(kind, shape, streamed) for calls that reach the server, else None."""
+        kind, shape = self._kind, self._shape
+        if kind == _DOC:
+            if name == "get":
+                return "get", shape, False
+            if name in _WRITE_METHODS:
+                return "write", shape, False
+            if name == "collections":
+                return "list", shape, False
+        elif kind == _QUERY:
+            if name == "stream":
+                return "query", shape, True
+            if name == "get":
+                return "query", shape, False
+            if name == "add":
+                return "write", f"{shape}/{{id}}", False
+            if name == "list_documents":
+                return "list", shape, False
+        elif kind == _AGG:
+            if name in ("get", "stream"):
+                return "aggregate", shape, False
+        elif kind == _WRITER:
+            if name in _WRITE_METHODS:
+                target = args[0] if args else None
+                return "write", getattr(target, "_shape", "?"), False
+            if name == "commit":
+                return "commit", "batch", False
+            if name == "get" and args:
+                target = args[0]
+                if getattr(target, "_kind", None) == _DOC:
+                    return "get", target._shape, True
+                return "query", getattr(target, "_shape", "?"), True
+            if name == "get_all":
+                return "get_all", _first_shape(args), True
+        elif kind == _CLIENT:
+            if name == "get_all":
+                return "get_all", _first_shape(args), True
+            if name == "collections":
+                return "list", "/", False
+        return None
+
+
+def _first_shape(args: tuple) -> str:
+    refs = list(args[0]) if args else []
+    return getattr(refs[0], "_shape", "?") if refs else "?"
+
+
+def _count_stream(iterator, profile: RerunProfile, kind: str, shape: str, caller: str, started: float):
+    resumed, count = time.perf_counter(), 0
+    try:
+        for item in iterator:
+            count += 1
+            yield item
+    finally:
+        end = time.perf_counter()
+        profile.add_reads(kind, shape, caller, count, end - resumed)
+        observe_firestore_stream(kind, count, end - started)
+        # The span covers the consumer's loop too: that is how long the call held the page
+        record_span(f"firestore {kind}", "firestore", started, end, {"shape": shape, "caller": caller, "docs": count})
+
+
+def profile_client(client):
+    """Wrap a Firestore client (real or in-memory) so its calls are profiled."""
+    return _Profiled(client)
+
+# ----------------------------
+# 🐞 Debug Panel
+# ----------------------------
+
+def render_firestore_debug_panel():
+    """Sidebar summary of the last profiled rerun (admins, profiling on)."""
+    summary = st.session_state.get("firestore_profile") if FIRESTORE_PROFILING else None
+    if not summary:
+        return
+    flagged = summary.get("n_plus_one", [])
+    title = f"🔥 Firestore: {summary['reads']:,} reads" + (f" · ⚠️ {len(flagged)} N+1" if flagged else "")
+    with st.sidebar.expander(title, expanded=bool(flagged)):
+        st.caption(f"{summary['label'] or 'Last rerun'} · {summary['ms']:.0f} ms")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Reads", f"{summary['reads']:,}")
+        col2.metric("Writes", f"{summary['writes']:,}")
+        col3.metric("Round trips", f"{summary['round_trips']:,}")
+        for entry in flagged:
+            st.warning(f"{entry['calls']}× {entry['kind']} `{entry['shape']}` from {', '.join(entry['callers'])}")
+        st.markdown("**By function**")
+        st.dataframe(summary["callers"], use_container_width=True, hide_index=True)
+        st.markdown("**By shape**")
+        st.dataframe(
+            [{k: v for k, v in s.items() if k != "callers"} for s in summary["shapes"]],
+            use_container_width=True, hide_index=True,
+        )
@@ -31,3 +31,123 @@ def get_doc_safe(collection: str, doc_id: str) -> dict | None:
     except Exception as e:
         print(f"⚠️ Error fetching document {doc_id}: {e}")
         return None
+
+# ----------------------------
+# 🔢 Counter / Rollup Helpers
+# ----------------------------
+
+def counter_key(value) -> str:
+    """Turn a free-text label (vendor, role, status...) into a safe counter map key."""
+    import re
+    key = re.sub(r"[^a-z0-9]+", "_", str(value or "").lower()).strip("_")
+    return key or "unknown"
+
+
+def guest_count(event: dict) -> int:
+    """An event's guest count as an int; older events stored floats or strings."""
+    try:
+        return int(float(event.get("guest_count") or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _set_path(nested: dict, path: str, value) -> None:
+    node = nested
+    parts = path.split(".")
+    for part in parts[:-1]:
+        node = node.setdefault(part, {})
+    node[parts[-1]] = value
+
+
+def nest_fields(flat: dict) -> dict:
+    """Turn dotted counter paths into nested maps: {"a.b": 1} -> {"a": {"b": 1}}."""
+    nested = {}
+    for path, value in flat.items():
+        _set_path(nested, path, value)
+    return nested
+
+
+def _nest_increments(deltas: dict) -> dict:
+    return nest_fields({path: firestore.Increment(delta) for path, delta in deltas.items() if delta})
+
+
+def increment_counters(doc_ref, deltas: dict, extra: dict | None = None, writer=None) -> None:
+    """Atomically add deltas to (dotted, possibly nested) numeric fields.
+
+    The document is created if missing. ``extra`` holds plain values merged
+    alongside the increments (e.g. display names, updated_at). ``writer``
+    may be a Transaction or WriteBatch; without one the write is immediate.
+    """
+    payload = _nest_increments(deltas)
+    for path, value in (extra or {}).items():
+        _set_path(payload, path, value)
+    if not payload:
+        return
+    if writer is not None:
+        writer.set(doc_ref, payload, merge=True)
+    else:
+        doc_ref.set(payload, merge=True)
+
+# ----------------------------
+# 🧮 Count Aggregations
+# ----------------------------
+
+def count_documents(query) -> int:
+    """Count matching documents with a server-side COUNT aggregation.
+
+    Falls back to a keys-only scan on clients without aggregation support.
+    """
+    try:
+        result = query.count(alias="n").get()
+        return int(result[0][0].value)
+    except AttributeError:
+        return sum(1 for _ in query.select([]).stream())
+
+
+def count_documents_many(queries: dict) -> dict:
+    """Run several count aggregations concurrently; returns {name: count}."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    if not queries:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(8, len(queries))) as pool:
+        futures = {name: pool.submit(count_documents, q) for name, q in queries.items()}
+        return {name: f.result() for name, f in futures.items()}
+
+
+def contribution_deltas(contribution, before: dict | None, after: dict | None) -> dict:
+    """Counter deltas for a document changing from ``before`` to ``after``.
+
+    ``contribution(doc)`` returns the counter values one document adds to a
+    rollup ({} when it should not be counted, e.g. soft-deleted).
+    """
+    old, new = contribution(before), contribution(after)
+    return {k: new.get(k, 0) - old.get(k, 0) for k in set(old) | set(new)}
+
+
+def write_with_counters(doc_ref, changes: dict, counters_ref, contribution, merge_update: bool = True, extra=None) -> None:
+    """Write a document and adjust a counters document in one transaction.
+
+    With ``merge_update`` the changes are applied with update() (the
+    document must exist); otherwise the document is replaced with set().
+    ``extra(after)`` may return plain fields to merge into the counters doc.
+    """
+    @firestore.transactional
+    def _txn(transaction):
+        snap = doc_ref.get(transaction=transaction)
+        before = snap.to_dict() if snap.exists else None
+        if merge_update:
+            after = dict(before or {})
+            after.update(changes)
+            transaction.update(doc_ref, changes)
+        else:
+            after = changes
+            transaction.set(doc_ref, changes)
+        increment_counters(
+            counters_ref,
+            contribution_deltas(contribution, before, after),
+            extra=extra(after) if extra else None,
+            writer=transaction,
+        )
+
+    _txn(db.transaction())
@@ -0,0 +1,259 @@
+"""
+🧪 Offline LLM backend
+An OpenAI-compatible stand-in (client.chat.completions.create) that
+answers from fixtures without any network, for benchmarks and load tests:
+- Deterministic, schema-valid responses for each AI feature
+- Configurable latency distribution and error injection
+- Token usage estimated from the request, so cost accounting still works
+
+Select it with MM_LLM_BACKEND=fake (see llm_gateway).
+
+    MM_LLM_FAKE_LATENCY      fixed:0.4 | uniform:0.2,1.5 | lognormal:0.8,0.5 (median s, sigma)
+    MM_LLM_FAKE_TTFT         seconds before the first streamed chunk (default 20% of latency)
+    MM_LLM_FAKE_ERROR_RATE   0..1 share of calls that fail
+    MM_LLM_FAKE_ERRORS       comma list of status codes to inject (default 429,500,503)
+    MM_LLM_FAKE_SEED         seed for latency/error draws (default 42)
+    MM_LLM_FAKE_FIXTURES     JSON file {"<fixture name>": "<content>" | {...}} overriding defaults
+"""
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+# ----------------------------
+# 📦 Fixtures
+# ----------------------------
+
+_RECIPE_NAMES = ["Mountain Chili", "Lemon Herb Chicken", "Roasted Vegetable Lasagna", "Black Bean Tacos", "Wild Rice Salad"]
+
+DEFAULT_FIXTURES = {
+    "recipes": {
+        "name": "Mountain Chili",
+        "ingredients": [
+            "2 lb ground beef", "1 large onion, diced", "3 cloves garlic, minced",
+            "2 cans (15 oz) kidney beans", "1 can (28 oz) crushed tomatoes",
+            "2 tbsp chili powder", "1 tsp cumin", "1 tsp salt",
+        ],
+        "instructions": [
+            "Brown the beef with the onion and garlic.",
+            "Stir in the spices, then the tomatoes and beans.",
+            "Simmer 45 minutes, stirring occasionally.",
+        ],
+        "serves": 8,
+        "tags": ["Dinner", "American", "Gluten-Free"],
+        "allergens": [],
+    },
+    "menus": {"menus": [{"day": "Day 1", "meal": "Dinner", "items": ["Mountain Chili", "Cornbread", "Green Salad"]}]},
+    "tags": {"tags": ["Dinner", "American", "Comfort Food"]},
+    "ingredients": {"ingredients": [
+        {"item": "ground beef", "quantity": 2, "unit": "lb"},
+        {"item": "onion", "quantity": 1, "unit": "large"},
+        {"item": "kidney beans", "quantity": 2, "unit": "can"},
+    ]},
+    "allergens": {"allergens": []},
+    "receipt": {
+        "vendor": "Costco",
+        "date": "2024-05-18",
+        "total": "86.47",
+        "items": [
+            {"name": "KS Butter", "quantity": "1", "price": "12.99"},
+            {"name": "Organic Eggs 24ct", "quantity": "2", "price": "15.98"},
+            {"name": "Chicken Thighs", "quantity": "6 lb", "price": "23.94"},
+            {"name": "Yellow Onions 10lb", "quantity": "1", "price": "7.49"},
+            {"name": "Olive Oil 2L", "quantity": "1", "price": "19.99"},
+        ],
+    },
+    "vision_text": (
+        "Mountain Chili\nServes 8\n\nIngredients:\n2 lb ground beef\n1 large onion, diced\n"
+        "2 cans kidney beans\n1 can crushed tomatoes\n2 tbsp chili powder\n\n"
+        "Instructions:\nBrown the beef. Add everything else. Simmer 45 minutes."
+    ),
+    "recipe_tags": "Dinner, American, Gluten-Free, Comfort Food",
+    "chat_summary": "- Planning dinner service for the active event\n- Chili and cornbread chosen as mains",
+    "chat": (
+        "## Plan\n\n1. **Menu** – Mountain Chili with cornbread and a green salad.\n"
+        "2. **Quantities** – about 1.5 cups of chili per guest; add 10% buffer.\n"
+        "3. **Prep timeline** – brown meat the day before, simmer on site.\n\n"
+        "I can turn this into a shopping list if you'd like."
+    ),
+}
+
+
+def _load_fixtures() -> dict:
+    fixtures = dict(DEFAULT_FIXTURES)
+    path = os.getenv("MM_LLM_FAKE_FIXTURES")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            fixtures.update(json.load(f))
+    return fixtures
+
+
+def _message_text(messages: list) -> str:
+    parts = []
+    for message in messages or []:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            parts.extend(p.get("text", "") for p in content if isinstance(p, dict))
+        else:
+            parts.append(str(content))
+    return "\n".join(parts)
+
+
+def _has_image(messages: list) -> bool:
+    return any(
+        isinstance(m.get("content"), list) and any(p.get("type") == "image_url" for p in m["content"])
+        for m in messages or []
+    )
+
+
+def fixture_name(kwargs: dict) -> str:
+    """Which fixture answers a request, from the request shape and prompt."""
+    messages = kwargs.get("messages", [])
+    text = _message_text(messages).lower()
+    if _has_image(messages):
+        return "receipt" if "receipt" in text else "vision_text"
+    if (kwargs.get("response_format") or {}).get("type") == "json_object":
+        for target in ("menus", "tags", "ingredients", "allergens"):
+            if f"extract structured {target} data" in text:
+                return target
+        return "recipes"
+    if "suggest concise tags" in text:
+        return "recipe_tags"
+    if "running summary" in text:
+        return "chat_summary"
+    return "chat"
+
+
+# ----------------------------
+# 🎲 Latency & Errors
+# ----------------------------
+
+def parse_latency(spec: str):
+    """Return a sampler ``f(rng) -> seconds`` for a latency spec string."""
+    kind, _, args = (spec or "fixed:0").partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()] or [0.0]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        low, high = values[0], values[-1]
+        return lambda rng: rng.uniform(low, high)
+    if kind == "lognormal":
+        median, sigma = values[0], (values[1] if len(values) > 1 else 0.5)
+        return lambda rng: rng.lognormvariate(math.log(max(median, 1e-6)), sigma)
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+class FakeAPIError(Exception):
+    """Injected failure shaped like openai.APIStatusError (status_code, response.headers)."""
+
+    def __init__(self, status_code: int, retry_after: float | None = None):
+        super().__init__(f"Injected fake LLM error {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+def _estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+# ----------------------------
+# 🤖 Fake Client
+# ----------------------------
+
+class _Completions:
+    def __init__(self, backend: "FakeLLMClient"):
+        self._backend = backend
+
+    def create(self, **kwargs):
+        return self._backend._create(**kwargs)
+
+
+class FakeLLMClient:
+    """OpenAI-compatible client answering from fixtures."""
+
+    def __init__(
+        self,
+        latency: str | None = None,
+        ttft: float | None = None,
+        error_rate: float | None = None,
+        error_codes: list[int] | None = None,
+        seed: int | None = None,
+        fixtures: dict | None = None,
+    ):
+        self._latency = parse_latency(latency or os.getenv("MM_LLM_FAKE_LATENCY", "lognormal:0.8,0.5"))
+        ttft_env = os.getenv("MM_LLM_FAKE_TTFT")
+        self._ttft = ttft if ttft is not None else (float(ttft_env) if ttft_env else None)
+        self.error_rate = error_rate if error_rate is not None else float(os.getenv("MM_LLM_FAKE_ERROR_RATE", "0"))
+        self.error_codes = error_codes or [
+            int(c) for c in os.getenv("MM_LLM_FAKE_ERRORS", "429,500,503").split(",") if c.strip()
+        ]
+        self._rng = random.Random(seed if seed is not None else int(os.getenv("MM_LLM_FAKE_SEED", "42")))
+        self._rng_lock = threading.Lock()
+        self.fixtures = fixtures or _load_fixtures()
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_Completions(self))
+
+    def _draw(self):
+        with self._rng_lock:
+            self.calls += 1
+            latency = max(0.0, self._latency(self._rng))
+            error = self._rng.choice(self.error_codes) if self._rng.random() < self.error_rate else None
+        return latency, error
+
+    def _content(self, kwargs: dict) -> str:
+        name = fixture_name(kwargs)
+        fixture = self.fixtures.get(name, "")
+        if name == "recipes" and isinstance(fixture, dict):
+            # Vary the name deterministically so bulk imports don't collide
+            digest = int(hashlib.sha1(_message_text(kwargs.get("messages")).encode("utf-8")).hexdigest(), 16)
+            fixture = dict(fixture, name=_RECIPE_NAMES[digest % len(_RECIPE_NAMES)])
+        return fixture if isinstance(fixture, str) else json.dumps(fixture)
+
+    def _usage(self, kwargs: dict, content: str):
+        prompt_tokens = _estimate_tokens(_message_text(kwargs.get("messages")))
+        if _has_image(kwargs.get("messages")):
+            prompt_tokens += 765  # one high-detail tile set
+        return SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=_estimate_tokens(content),
+            total_tokens=prompt_tokens + _estimate_tokens(content),
+            prompt_tokens_details=SimpleNamespace(cached_tokens=0),
+        )
+
+    def _create(self, **kwargs):
+        latency, error = self._draw()
+        content = self._content(kwargs)
+        if error is not None:
+            # Failures come back faster than a full answer
+            time.sleep(latency * 0.2)
+            raise FakeAPIError(error, retry_after=0.5 if error == 429 else None)
+        if kwargs.get("stream"):
+            return self._stream(kwargs, content, latency)
+        time.sleep(latency)
+        return SimpleNamespace(
+            id=f"fake-{self.calls}",
+            model=kwargs.get("model", "fake"),
+            choices=[SimpleNamespace(index=0, finish_reason="stop", message=SimpleNamespace(role="assistant", content=content))],
+            usage=self._usage(kwargs, content),
+        )
+
+    def _stream(self, kwargs: dict, content: str, latency: float):
+        ttft = self._ttft if self._ttft is not None else latency * 0.2
+        pieces = [content[i:i + 16] for i in range(0, len(content), 16)] or [""]
+        per_chunk = max(0.0, latency - ttft) / len(pieces)
+        time.sleep(ttft)
+        for piece, last in zip(pieces, itertools.chain([False] * (len(pieces) - 1), [True])):
+            yield SimpleNamespace(
+                choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=piece), finish_reason="stop" if last else None)],
+                usage=None,
+            )
+            time.sleep(per_chunk)
+        if (kwargs.get("stream_options") or {}).get("include_usage"):
+            yield SimpleNamespace(choices=[], usage=self._usage(kwargs, content))
@@ -0,0 +1,322 @@
+"""
+🤖 LLM gateway
+One shared OpenAI client for every AI feature, with:
+- a pooled HTTP client (keep-alive connections reused across calls)
+- token-bucket rate limiting (requests per minute, with a small burst)
+- exponential backoff with full jitter on 429 / 5xx / timeouts
+- a per-call timeout and a cap on requests in flight
+- per-feature latency recording and token/cost accounting (llm_usage)
+- a tracing span per call (tracing) and call/latency/token metrics (metrics)
+
+The client behind the gateway is a pluggable backend: anything exposing
+``chat.completions.create(**kwargs)`` like the OpenAI SDK. MM_LLM_BACKEND
+picks one of LLM_BACKENDS ("openai" by default, "fake" for the offline
+stand-in in llm_fake).
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+
+from llm_usage import record_call, usage_from_response
+from metrics import observe_ai_call
+from tracing import record_span
+
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("MM_LLM_RPM", "60"))
+LLM_BURST = int(os.getenv("MM_LLM_BURST", "10"))
+LLM_MAX_IN_FLIGHT = int(os.getenv("MM_LLM_MAX_IN_FLIGHT", "4"))
+LLM_TIMEOUT = float(os.getenv("MM_LLM_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.getenv("MM_LLM_MAX_RETRIES", "3"))
+# How long a call may wait for a rate-limit token or a free slot
+LLM_QUEUE_TIMEOUT = float(os.getenv("MM_LLM_QUEUE_TIMEOUT", "30"))
+LLM_BACKEND = os.getenv("MM_LLM_BACKEND", "openai")
+
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 20.0
+LATENCY_SAMPLES_KEPT = 500
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMUnavailable(RuntimeError):
+    """No API key or client library; AI features should degrade gracefully."""
+
+
+class LLMBusy(RuntimeError):
+    """The call could not start within LLM_QUEUE_TIMEOUT."""
+
+
+# ----------------------------
+# 🪣 Token Bucket
+# ----------------------------
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: int):
+        self.rate = rate_per_second
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float) -> bool:
+        """Take one token, waiting up to ``timeout`` seconds for a refill."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate if self.rate > 0 else timeout
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+# ----------------------------
+# 🔁 Retry Classification
+# ----------------------------
+
+def _status_code(error) -> int | None:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_retryable(error) -> bool:
+    name = type(error).__name__
+    if name in ("APITimeoutError", "APIConnectionError", "RateLimitError", "InternalServerError"):
+        return True
+    return _status_code(error) in RETRYABLE_STATUS
+
+
+def _retry_after(error) -> float | None:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return min(BACKOFF_CAP, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, error=None) -> float:
+    """Full-jitter exponential backoff, honouring Retry-After when sent."""
+    hinted = _retry_after(error) if error is not None else None
+    if hinted is not None:
+        return hinted + random.uniform(0, BACKOFF_BASE)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+# ----------------------------
+# 🚪 Gateway
+# ----------------------------
+
+class LLMGateway:
+    def __init__(
+        self,
+        client,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        burst: int = LLM_BURST,
+        max_in_flight: int = LLM_MAX_IN_FLIGHT,
+        timeout: float = LLM_TIMEOUT,
+        max_retries: int = LLM_MAX_RETRIES,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT,
+    ):
+        self.client = client
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.queue_timeout = queue_timeout
+        self._bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._latencies: dict[str, deque] = {}
+        self._stats_lock = threading.Lock()
+
+    def _record(self, feature: str, model: str, usage: dict, seconds: float, attempts: int, ok: bool) -> None:
+        end = time.perf_counter()
+        record_span(f"llm {feature}", "llm", end - seconds, end, dict(usage, model=model, attempts=attempts, ok=ok))
+        with self._stats_lock:
+            samples = self._latencies.setdefault(feature, deque(maxlen=LATENCY_SAMPLES_KEPT))
+            samples.append({"seconds": seconds, "attempts": attempts, "ok": ok, "at": time.time()})
+        record_call(feature, model, usage, seconds, attempts, ok)
+        observe_ai_call(feature, model, usage, seconds, ok)
+
+    def _create_with_retries(self, kwargs: dict):
+        """Call the API, retrying transient failures. Returns (response, attempts)."""
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            if not self._bucket.acquire(self.queue_timeout):
+                raise LLMBusy("AI request rate limit reached; please try again shortly.")
+            try:
+                return self.client.chat.completions.create(**kwargs), attempt + 1
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt, e)
+                print(f"⏳ LLM call failed ({type(e).__name__}); retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+
+    def chat(self, feature: str, **kwargs):
+        """chat.completions.create() with rate limiting, retries and a slot cap."""
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise LLMBusy("Too many AI requests in progress; please try again shortly.")
+        start = time.perf_counter()
+        attempts, ok, usage = 1, False, {}
+        try:
+            response, attempts = self._create_with_retries(dict(kwargs))
+            usage = usage_from_response(getattr(response, "usage", None))
+            ok = True
+            return response
+        finally:
+            self._slots.release()
+            self._record(feature, kwargs.get("model", ""), usage, time.perf_counter() - start, attempts, ok)
+
+    def stream_chat(self, feature: str, **kwargs):
+        """Streaming variant; yields chunks and holds its slot until the stream ends.
+
+        Only opening the stream is retried; a failure mid-stream is raised.
+        """
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise LLMBusy("Too many AI requests in progress; please try again shortly.")
+        start = time.perf_counter()
+        attempts, ok, usage = 1, False, {}
+        try:
+            stream, attempts = self._create_with_retries(dict(kwargs, stream=True))
+            for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = usage_from_response(chunk.usage)
+                yield chunk
+            ok = True
+        finally:
+            self._slots.release()
+            self._record(feature, kwargs.get("model", ""), usage, time.perf_counter() - start, attempts, ok)
+
+    def latency_summary(self) -> dict:
+        """{feature: {"calls", "errors", "retries", "p50", "p95"}} over recent calls."""
+        with self._stats_lock:
+            snapshot = {f: list(s) for f, s in self._latencies.items()}
+        summary = {}
+        for feature, samples in snapshot.items():
+            times = sorted(s["seconds"] for s in samples)
+            summary[feature] = {
+                "calls": len(samples),
+                "errors": sum(1 for s in samples if not s["ok"]),
+                "retries": sum(s["attempts"] - 1 for s in samples),
+                "p50": percentile(times, 50),
+                "p95": percentile(times, 95),
+            }
+        return summary
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+# ----------------------------
+# 🔌 Shared Instance
+# ----------------------------
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def _api_key() -> str:
+    # Secrets win over OPENAI_API_KEY so a stale shell variable can't override them
+    try:
+        key = st.secrets.get("openai", {}).get("api_key", "")
+    except Exception:
+        key = ""
+    return key or os.getenv("OPENAI_API_KEY", "")
+
+
+def _openai_backend():
+    import httpx
+    from openai import OpenAI
+
+    api_key = _api_key()
+    if not api_key:
+        return None
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_IN_FLIGHT * 2,
+            max_keepalive_connections=LLM_MAX_IN_FLIGHT,
+        ),
+        timeout=LLM_TIMEOUT,
+    )
+    # Retries are handled by the gateway so they share the rate limiter
+    return OpenAI(api_key=api_key, max_retries=0, timeout=LLM_TIMEOUT, http_client=http_client)
+
+
+def _fake_backend():
+    from llm_fake import FakeLLMClient
+    return FakeLLMClient()
+
+
+# name -> factory returning a client, or None when it can't be configured
+LLM_BACKENDS = {
+    "openai": _openai_backend,
+    "fake": _fake_backend,
+}
+
+
+def get_gateway() -> LLMGateway | None:
+    """Return the shared gateway, or None when no backend is available."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                factory = LLM_BACKENDS.get(LLM_BACKEND)
+                if factory is None:
+                    print(f"Unknown LLM backend: {LLM_BACKEND}")
+                    return None
+                try:
+                    client = factory()
+                except Exception as e:
+                    print(f"Failed to initialize {LLM_BACKEND} LLM backend: {e}")
+                    return None
+                if client is None:
+                    return None
+                _gateway = LLMGateway(client)
+    return _gateway
+
+
+def set_llm_backend(client, **gateway_options) -> LLMGateway:
+    """Replace the shared gateway with one around ``client`` (benchmarks, tests)."""
+    global _gateway
+    with _gateway_lock:
+        _gateway = LLMGateway(client, **gateway_options)
+    return _gateway
+
+
+def llm_available() -> bool:
+    return get_gateway() is not None
+
+
+def chat_completion(feature: str, **kwargs):
+    """Run a chat completion through the shared gateway.
+
+    ``feature`` names the calling AI feature for latency records.
+    Raises LLMUnavailable when AI is not configured.
+    """
+    gateway = get_gateway()
+    if gateway is None:
+        raise LLMUnavailable("OpenAI client not initialized")
+    return gateway.chat(feature, **kwargs)
+
+
+def stream_chat_completion(feature: str, **kwargs):
+    gateway = get_gateway()
+    if gateway is None:
+        raise LLMUnavailable("OpenAI client not initialized")
+    return gateway.stream_chat(feature, **kwargs)
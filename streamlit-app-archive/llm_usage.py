@@ -0,0 +1,233 @@
+"""
+💵 LLM usage accounting
+Every gateway call appends one JSON line to a local log with its feature,
+model, token counts, latency and prompt-cache hits. A rollup file with
+per-feature totals and latency histograms is refreshed periodically from
+the new part of the log, so the admin view never re-reads old records.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import streamlit as st
+
+LLM_USAGE_DIR = os.getenv("MM_LLM_USAGE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "llm"))
+LLM_USAGE_LOG = os.path.join(LLM_USAGE_DIR, "calls.jsonl")
+LLM_USAGE_ROLLUP = os.path.join(LLM_USAGE_DIR, "rollup.json")
+ROLLUP_INTERVAL_SECONDS = int(os.getenv("MM_LLM_ROLLUP_SECONDS", "300"))
+# Once rolled up, a log larger than this is rotated to calls.jsonl.1
+LLM_USAGE_LOG_MAX_BYTES = int(os.getenv("MM_LLM_USAGE_LOG_MAX_BYTES", str(20 * 1024 * 1024)))
+
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+}
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = [0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, float("inf")]
+
+_log_lock = threading.Lock()
+_rollup_lock = threading.Lock()
+_last_rollup = 0.0
+
+
+def call_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """Estimated USD cost of one call (0 for models without a price)."""
+    price = MODEL_PRICES.get(model)
+    if not price:
+        # Dated snapshots ("gpt-4o-mini-2024-07-18") share the base price
+        price = next((p for m, p in sorted(MODEL_PRICES.items(), key=lambda x: -len(x[0])) if model.startswith(m)), None)
+    if not price:
+        return 0.0
+    uncached = max(0, prompt_tokens - cached_tokens)
+    return (uncached * price[0] + cached_tokens * price[1] + completion_tokens * price[2]) / 1_000_000
+
+
+def usage_from_response(usage) -> dict:
+    """Token counts from an OpenAI usage object (or None)."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+    }
+
+
+def record_call(feature: str, model: str, usage: dict, seconds: float, attempts: int, ok: bool) -> None:
+    """Append one call record to the usage log; never raises."""
+    global _last_rollup
+    record = {
+        "ts": time.time(),
+        "feature": feature,
+        "model": model or "",
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "completion_tokens": usage.get("completion_tokens", 0),
+        "cached_tokens": usage.get("cached_tokens", 0),
+        "cache_hit": usage.get("cached_tokens", 0) > 0,
+        "latency": round(seconds, 4),
+        "attempts": attempts,
+        "ok": ok,
+    }
+    record["cost_usd"] = round(
+        call_cost(record["model"], record["prompt_tokens"], record["completion_tokens"], record["cached_tokens"]), 8
+    )
+    try:
+        line = json.dumps(record) + "\n"
+        with _log_lock:
+            os.makedirs(LLM_USAGE_DIR, exist_ok=True)
+            with open(LLM_USAGE_LOG, "a", encoding="utf-8") as f:
+                f.write(line)
+    except Exception as e:
+        print(f"⚠️ Could not record LLM usage: {e}")
+        return
+
+    if time.time() - _last_rollup > ROLLUP_INTERVAL_SECONDS:
+        _last_rollup = time.time()
+        threading.Thread(target=rollup_llm_usage, name="llm-usage-rollup", daemon=True).start()
+
+
+def _empty_rollup() -> dict:
+    return {"offset": 0, "updated_at": None, "features": {}, "days": {}}
+
+
+def load_rollup() -> dict:
+    try:
+        with open(LLM_USAGE_ROLLUP, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return _empty_rollup()
+
+
+def _add_record(rollup: dict, record: dict) -> None:
+    feature = rollup["features"].setdefault(record.get("feature", "unknown"), {
+        "calls": 0, "errors": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0,
+        "cached_tokens": 0, "cache_hits": 0, "cost_usd": 0.0,
+        "latency_hist": [0] * len(LATENCY_BUCKETS), "models": {},
+    })
+    feature["calls"] += 1
+    feature["errors"] += 0 if record.get("ok") else 1
+    feature["retries"] += max(0, record.get("attempts", 1) - 1)
+    for key in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+        feature[key] += record.get(key, 0)
+    feature["cache_hits"] += 1 if record.get("cache_hit") else 0
+    feature["cost_usd"] += record.get("cost_usd", 0.0)
+    latency = record.get("latency", 0.0)
+    bucket = next(i for i, bound in enumerate(LATENCY_BUCKETS) if latency <= bound)
+    feature["latency_hist"][bucket] += 1
+    model = record.get("model") or "unknown"
+    feature["models"][model] = feature["models"].get(model, 0) + 1
+
+    day = datetime.utcfromtimestamp(record.get("ts", 0)).strftime("%Y-%m-%d")
+    day_entry = rollup["days"].setdefault(day, {}).setdefault(record.get("feature", "unknown"), {"calls": 0, "cost_usd": 0.0})
+    day_entry["calls"] += 1
+    day_entry["cost_usd"] += record.get("cost_usd", 0.0)
+
+
+def rollup_llm_usage() -> dict:
+    """Fold log lines written since the last rollup into rollup.json."""
+    with _rollup_lock:
+        rollup = load_rollup()
+        try:
+            size = os.path.getsize(LLM_USAGE_LOG)
+        except OSError:
+            return rollup
+        if size < rollup["offset"]:
+            rollup["offset"] = 0  # log was rotated or replaced
+
+        with open(LLM_USAGE_LOG, "rb") as f:
+            f.seek(rollup["offset"])
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # partially written line; pick it up next time
+                rollup["offset"] += len(raw)
+                try:
+                    _add_record(rollup, json.loads(raw))
+                except ValueError:
+                    continue
+        rollup["updated_at"] = time.time()
+
+        with _log_lock:
+            if rollup["offset"] >= LLM_USAGE_LOG_MAX_BYTES and rollup["offset"] == os.path.getsize(LLM_USAGE_LOG):
+                os.replace(LLM_USAGE_LOG, LLM_USAGE_LOG + ".1")
+                rollup["offset"] = 0
+
+        tmp = LLM_USAGE_ROLLUP + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(rollup, f)
+        os.replace(tmp, LLM_USAGE_ROLLUP)
+        return rollup
+
+
+def histogram_percentile(hist: list, pct: float) -> float:
+    """Upper bound of the bucket holding the pct-th percentile."""
+    total = sum(hist)
+    if not total:
+        return 0.0
+    target = total * pct / 100
+    running = 0
+    for count, bound in zip(hist, LATENCY_BUCKETS):
+        running += count
+        if running >= target:
+            return bound
+    return LATENCY_BUCKETS[-1]
+
+
+# ----------------------------
+# 📊 Admin Report
+# ----------------------------
+
+def show_llm_usage_report():
+    """Per-feature AI cost and latency (admin view)."""
+    st.subheader("🤖 AI Cost & Latency")
+    try:
+        rollup = rollup_llm_usage()
+    except Exception as e:
+        st.error(f"Could not read AI usage log: {e}")
+        return
+
+    features = rollup.get("features", {})
+    if not features:
+        st.info("No AI calls recorded on this server yet.")
+        return
+
+    def _fmt_latency(seconds):
+        return "> 60s" if seconds == float("inf") else f"≤ {seconds:g}s"
+
+    total_cost = sum(f["cost_usd"] for f in features.values())
+    total_calls = sum(f["calls"] for f in features.values())
+    col1, col2, col3 = st.columns(3)
+    col1.metric("AI Calls", f"{total_calls:,}")
+    col2.metric("Estimated Cost", f"${total_cost:,.2f}")
+    col3.metric("Tokens", f"{sum(f['prompt_tokens'] + f['completion_tokens'] for f in features.values()):,}")
+
+    rows = []
+    for name, f in sorted(features.items(), key=lambda x: -x[1]["cost_usd"]):
+        rows.append({
+            "Feature": name,
+            "Calls": f["calls"],
+            "Errors": f["errors"],
+            "Retries": f["retries"],
+            "p50": _fmt_latency(histogram_percentile(f["latency_hist"], 50)),
+            "p95": _fmt_latency(histogram_percentile(f["latency_hist"], 95)),
+            "Tokens in": f["prompt_tokens"],
+            "Tokens out": f["completion_tokens"],
+            "Cache hits": f["cache_hits"],
+            "Cost ($)": round(f["cost_usd"], 4),
+            "Cost / call ($)": round(f["cost_usd"] / f["calls"], 5) if f["calls"] else 0,
+        })
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+
+    days = sorted(rollup.get("days", {}).items())[-30:]
+    if days:
+        st.markdown("#### Daily Cost by Feature")
+        st.bar_chart({
+            feature: {day: entry.get(feature, {}).get("cost_usd", 0.0) for day, entry in days}
+            for feature in features
+        })
+
+    if rollup.get("updated_at"):
+        st.caption(f"Rolled up {datetime.fromtimestamp(rollup['updated_at']).strftime('%Y-%m-%d %H:%M:%S')} from {LLM_USAGE_LOG}")
@@ -0,0 +1,389 @@
+"""
+📈 Metrics
+Process-level counters and histograms in the Prometheus text format:
+- Reruns and render latency per tab
+- Firestore operations and documents (via the firestore_profiler wrapper)
+- AI calls, latency and tokens (llm_gateway)
+- Upload / background-writer queue depth, cache hits and misses,
+  active sessions
+- Client-side numbers from mobile_components.track_mobile_performance
+
+Enable with MM_METRICS=1. The registry is served in-process on
+http://MM_METRICS_HOST:MM_METRICS_PORT/metrics (default 127.0.0.1:9464;
+port 0 turns the server off) and, if MM_METRICS_FILE is set, also written
+to that file after every rerun for node_exporter's textfile collector.
+"""
+
+import bisect
+import functools
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+METRICS_ENABLED = os.getenv("MM_METRICS", "0") == "1"
+METRICS_HOST = os.getenv("MM_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("MM_METRICS_PORT", "9464"))
+METRICS_FILE = os.getenv("MM_METRICS_FILE", "")
+# A session counts as active if it reran within this many seconds
+SESSION_WINDOW = int(os.getenv("MM_METRICS_SESSION_WINDOW", "300"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CLIENT_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# ----------------------------
+# 🧮 Metric Types
+# ----------------------------
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: tuple) -> tuple:
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {labels}")
+        return tuple(str(v) for v in labels)
+
+    def samples(self) -> list:
+        """(suffix, label string, value) triples for the exposition output."""
+        with self._lock:
+            return [("", _labels(self.label_names, k), v) for k, v in sorted(self._values.items())]
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{self.name}{suffix}{labels} {_number(value)}" for suffix, labels, value in self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        if not METRICS_ENABLED or amount <= 0:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """A settable value; ``callback`` (returning {label tuple: value}) is read at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), callback=None):
+        super().__init__(name, help_text, labels)
+        self.callback = callback
+
+    def set(self, *labels, value: float) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def samples(self) -> list:
+        if self.callback is not None:
+            try:
+                values = self.callback()
+            except Exception as e:
+                print(f"⚠️ Metric {self.name} unavailable: {e}")
+                values = {}
+            with self._lock:
+                self._values.update({self._key(k): v for k, v in values.items()})
+        return super().samples()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value: float) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                entry["counts"][index] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+
+    def samples(self) -> list:
+        out = []
+        with self._lock:
+            for key, entry in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, entry["counts"]):
+                    cumulative += count
+                    out.append(("_bucket", _labels(self.label_names, key, f'le="{_number(float(bound))}"'), cumulative))
+                out.append(("_bucket", _labels(self.label_names, key, 'le="+Inf"'), entry["count"]))
+                out.append(("_sum", _labels(self.label_names, key), entry["sum"]))
+                out.append(("_count", _labels(self.label_names, key), entry["count"]))
+        return out
+
+# ----------------------------
+# 🗂️ Registry
+# ----------------------------
+
+_registry: dict = {}
+_registry_lock = threading.Lock()
+
+
+def _register(metric: _Metric) -> _Metric:
+    with _registry_lock:
+        return _registry.setdefault(metric.name, metric)
+
+
+def counter(name: str, help_text: str, labels: tuple = ()) -> Counter:
+    return _register(Counter(name, help_text, labels))
+
+
+def gauge(name: str, help_text: str, labels: tuple = (), callback=None) -> Gauge:
+    return _register(Gauge(name, help_text, labels, callback))
+
+
+def histogram(name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help_text, labels, buckets))
+
+
+def render_metrics() -> str:
+    """The whole registry in Prometheus text exposition format."""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Queue-depth sources register here: name -> callable returning the depth
+_queues: dict = {}
+
+
+def register_queue(name: str, depth) -> None:
+    """Report ``depth()`` as mm_queue_depth{queue=name} on every scrape."""
+    _queues[name] = depth
+
+
+_sessions: dict = {}
+_sessions_lock = threading.Lock()
+
+
+def _active_sessions() -> dict:
+    cutoff = time.time() - SESSION_WINDOW
+    with _sessions_lock:
+        for session_id in [s for s, seen in _sessions.items() if seen < cutoff]:
+            del _sessions[session_id]
+        return {(): len(_sessions)}
+
+
+RERUNS = counter("mm_reruns_total", "Streamlit reruns by selected tab.", ("tab",))
+RENDER_SECONDS = histogram("mm_render_seconds", "Wall time of a full rerun by selected tab.", ("tab",))
+FIRESTORE_OPS = counter("mm_firestore_ops_total", "Firestore operations by kind (get, query, write, commit, ...).", ("kind",))
+FIRESTORE_DOCS = counter("mm_firestore_documents_total", "Firestore documents read or written.", ("direction",))
+FIRESTORE_SECONDS = histogram("mm_firestore_op_seconds", "Firestore round-trip time by operation kind.", ("kind",))
+AI_CALLS = counter("mm_ai_calls_total", "LLM calls by feature, model and outcome.", ("feature", "model", "outcome"))
+AI_SECONDS = histogram("mm_ai_call_seconds", "LLM call latency by feature, retries included.", ("feature",))
+AI_TOKENS = counter("mm_ai_tokens_total", "LLM tokens by feature and type.", ("feature", "type"))
+CACHE_REQUESTS = counter("mm_cache_requests_total", "Cache lookups by cache and result (hit, miss).", ("cache", "result"))
+CLIENT_METRICS = histogram("mm_client_performance", "Client-side metrics from track_mobile_performance.", ("metric",), CLIENT_BUCKETS)
+QUEUE_DEPTH = gauge("mm_queue_depth", "Items waiting in upload and background-writer queues.", ("queue",),
+                    callback=lambda: {(name,): depth() for name, depth in list(_queues.items())})
+SESSIONS = gauge("mm_sessions_active", f"Browser sessions that reran in the last {SESSION_WINDOW}s.",
+                 callback=_active_sessions)
+
+# ----------------------------
+# 📝 Recording Helpers
+# ----------------------------
+
+def in_queue(queue: str):
+    """Decorator: count calls in progress as mm_queue_depth{queue=...}."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not METRICS_ENABLED:
+                return fn(*args, **kwargs)
+            QUEUE_DEPTH.inc(queue)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                QUEUE_DEPTH.dec(queue)
+        return wrapper
+    return decorate
+
+
+def observe_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+def observe_ai_call(feature: str, model: str, usage: dict, seconds: float, ok: bool) -> None:
+    if not METRICS_ENABLED:
+        return
+    AI_CALLS.inc(feature, model or "unknown", "ok" if ok else "error")
+    AI_SECONDS.observe(feature, value=seconds)
+    for kind in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+        AI_TOKENS.inc(feature, kind.replace("_tokens", ""), amount=usage.get(kind, 0) or 0)
+
+
+def observe_firestore(kind: str, reads: int = 0, writes: int = 0, seconds: float | None = None) -> None:
+    if not METRICS_ENABLED:
+        return
+    FIRESTORE_OPS.inc(kind)
+    FIRESTORE_DOCS.inc("read", amount=reads)
+    FIRESTORE_DOCS.inc("write", amount=writes)
+    if seconds is not None:
+        FIRESTORE_SECONDS.observe(kind, value=seconds)
+
+
+def observe_firestore_stream(kind: str, reads: int, seconds: float) -> None:
+    """A streamed query once it ends; ``seconds`` includes the consumer's loop."""
+    if not METRICS_ENABLED:
+        return
+    FIRESTORE_DOCS.inc("read", amount=reads)
+    FIRESTORE_SECONDS.observe(kind, value=seconds)
+
+
+def observe_client_metric(metric: str, value: float) -> None:
+    CLIENT_METRICS.observe(metric, value=float(value))
+
+
+def _touch_session() -> None:
+    try:
+        session_id = st.session_state.setdefault("_metrics_session", uuid.uuid4().hex)
+    except Exception:
+        return
+    with _sessions_lock:
+        _sessions[session_id] = time.time()
+
+# ----------------------------
+# 📡 Export
+# ----------------------------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = {"instance": None, "started": False}
+_server_lock = threading.Lock()
+
+
+def start_metrics_server():
+    """Serve /metrics from a daemon thread; once per process, later calls are no-ops."""
+    if not METRICS_ENABLED or not METRICS_PORT:
+        return None
+    with _server_lock:
+        if _server["started"]:
+            return _server["instance"]
+        _server["started"] = True
+        try:
+            server = ThreadingHTTPServer((METRICS_HOST, METRICS_PORT), _MetricsHandler)
+        except OSError as e:
+            print(f"⚠️ Metrics server not started on {METRICS_HOST}:{METRICS_PORT}: {e}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        _server["instance"] = server
+        print(f"📈 Metrics on http://{METRICS_HOST}:{server.server_address[1]}/metrics")
+        return server
+
+
+# mkstemp creates files as 0600; the textfile is read by node_exporter, often
+# as another user, so it gets the mode a plain open() would have. os.umask
+# can only be read by setting it, so that happens once, at import.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_METRICS_FILE_MODE = 0o644 & ~_UMASK
+
+
+def write_metrics_file(path: str = METRICS_FILE) -> None:
+    """Atomically replace ``path`` with the current registry."""
+    if not path:
+        return
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # A temp file per write, so concurrent writers never share one
+        fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+        os.fchmod(fd, _METRICS_FILE_MODE)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(render_metrics())
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ Could not write metrics file: {e}")
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+
+
+@contextmanager
+def rerun_metrics(label=lambda: ""):
+    """Count one Streamlit rerun and time it under the tab selected when it ends."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    start_metrics_server()
+    _touch_session()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        tab = (label() if callable(label) else label) or "none"
+        RERUNS.inc(tab)
+        RENDER_SECONDS.observe(tab, value=time.perf_counter() - start)
+        write_metrics_file()
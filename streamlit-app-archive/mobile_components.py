@@ -3,6 +3,8 @@ from typing import List, Dict, Any, Optional, Callable
 import json
 from datetime import datetime
 
+from metrics import observe_client_metric
+
 # -----------------------------
 # Mobile Navigation Components
 # -----------------------------
@@ -738,6 +740,7 @@ def track_mobile_performance(metric: str, value: float) -> None:
         st.session_state.mobile_metrics = {}
     
     st.session_state.mobile_metrics[metric] = value
+    observe_client_metric(metric, value)
     
     # Send to analytics if available
     js_code = f"""
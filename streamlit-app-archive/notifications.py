@@ -2,12 +2,13 @@
 
 import streamlit as st
 from typing import List
+from firebase_init import firestore
 
-# Don't create the client at import time - use a function instead
 def get_db():
     """Get the Firestore database client"""
     try:
-        return firestore.client()
+        from firebase_init import get_db as _get_db
+        return _get_db()
     except Exception:
         # Firebase not initialized yet
         return None
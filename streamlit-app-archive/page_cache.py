@@ -0,0 +1,159 @@
+"""
+🗄️ On-disk cache for fetched recipe pages
+- Keyed by URL, bodies stored zlib-compressed in a small SQLite file
+- Revalidates with ETag / Last-Modified (If-None-Match / If-Modified-Since)
+- Total compressed size is capped; least recently used pages are evicted
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from metrics import observe_cache
+
+PAGE_CACHE_DIR = os.getenv("MM_PAGE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "pages"))
+PAGE_CACHE_MAX_BYTES = int(os.getenv("MM_PAGE_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+# Pages fetched more recently than this are served without revalidating
+PAGE_CACHE_FRESH_SECONDS = int(os.getenv("MM_PAGE_CACHE_FRESH_SECONDS", "3600"))
+
+
+class PageCache:
+    def __init__(self, path: str, max_bytes: int = PAGE_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_lru ON pages(last_access)")
+        self._conn.commit()
+
+    def get(self, url: str) -> dict | None:
+        """Return the cached entry for url (body decompressed) or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, encoding, etag, last_modified, fetched_at FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if not row:
+                return None
+            self._conn.execute("UPDATE pages SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        body, encoding, etag, last_modified, fetched_at = row
+        return {
+            "text": zlib.decompress(body).decode(encoding or "utf-8", errors="replace"),
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": fetched_at,
+        }
+
+    def put(self, url: str, text: str, etag: str | None = None, last_modified: str | None = None) -> None:
+        body = zlib.compress(text.encode("utf-8"), 6)
+        if len(body) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, body, len(body), "utf-8", etag, last_modified, now, now),
+            )
+            self._evict_locked()
+            self._conn.commit()
+
+    def touch(self, url: str) -> None:
+        """Mark a cached page as revalidated (e.g. after a 304)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, url)
+            )
+            self._conn.commit()
+
+    def _evict_locked(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._conn.execute(
+            "SELECT url, size FROM pages ORDER BY last_access ASC"
+        ).fetchall():
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.commit()
+
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> PageCache | None:
+    """Return the shared page cache, or None if the cache dir is unusable."""
+    global _page_cache
+    if _page_cache is None:
+        with _page_cache_lock:
+            if _page_cache is None:
+                try:
+                    _page_cache = PageCache(os.path.join(PAGE_CACHE_DIR, "pages.sqlite3"))
+                except Exception as e:
+                    print(f"⚠️ Page cache unavailable: {e}")
+                    return None
+    return _page_cache
+
+
+def fetch_with_cache(session, url: str, timeout=None) -> str:
+    """GET url through session, serving/revalidating from the page cache.
+
+    Raises requests.exceptions.RequestException on network/HTTP errors,
+    exactly like a plain session.get(...).raise_for_status() would.
+    """
+    cache = get_page_cache()
+    cached = cache.get(url) if cache else None
+
+    if cached and time.time() - cached["fetched_at"] < PAGE_CACHE_FRESH_SECONDS:
+        observe_cache("recipe_pages", True)
+        return cached["text"]
+
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    resp = session.get(url, headers=headers, timeout=timeout)
+    # A successful revalidation counts as a hit: the body came from the cache
+    observe_cache("recipe_pages", resp.status_code == 304 and cached is not None)
+    if resp.status_code == 304 and cached:
+        cache.touch(url)
+        return cached["text"]
+    resp.raise_for_status()
+
+    text = resp.text
+    if cache:
+        cache.put(
+            url,
+            text,
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+        )
+    return text
@@ -1,7 +1,9 @@
 # post_event.py
 
 import streamlit as st
-from firebase_init import get_db
+from firebase_init import get_db, firestore
+from firestore_utils import counter_key
+from post_event_rollup import apply_post_event_change, rollup_ref
 from auth import require_role
 from utils import format_date, get_scoped_query, is_event_scoped, get_event_scope_message, get_active_event_id
 from datetime import datetime
@@ -214,10 +216,8 @@ def _render_post_event_form(event_id: str, event_data: dict, user: dict) -> None
                     "completed_at": datetime.utcnow(),
                 }
                 
-                # Update event document
-                get_db().collection("events").document(event_id).update({
-                    "post_event_summary": summary_data
-                })
+                # Update event document and the analytics rollup together
+                save_post_event_summary(event_id, summary_data)
                 
                 st.success("✅ Post-event summary saved successfully!")
                 
@@ -236,6 +236,28 @@ def _render_post_event_form(event_id: str, event_data: dict, user: dict) -> None
             except Exception as e:
                 st.error(f"❌ Failed to save post-event summary: {e}")
 
+# ----------------------------
+# 📈 Post-Event Rollup
+# ----------------------------
+
+RATING_OPTIONS = ["Poor", "Fair", "Good", "Very Good", "Excellent"]
+
+@firestore.transactional
+def _save_post_event_txn(transaction, event_ref, summary_data: dict) -> None:
+    event_snap = event_ref.get(transaction=transaction)
+    rollup_snap = rollup_ref().get(transaction=transaction)
+    before = event_snap.to_dict() if event_snap.exists else {}
+    after = before | {"post_event_summary": summary_data}
+    rollup = rollup_snap.to_dict() if rollup_snap.exists else {}
+
+    transaction.update(event_ref, {"post_event_summary": summary_data})
+    apply_post_event_change(transaction, rollup, event_ref.id, before, after)
+
+def save_post_event_summary(event_id: str, summary_data: dict) -> None:
+    """Save a post-event form and update the analytics rollup atomically."""
+    db = get_db()
+    _save_post_event_txn(db.transaction(), db.collection("events").document(event_id), summary_data)
+
 # ----------------------------
 # 📊 Post-Event Analytics
 # ----------------------------
@@ -244,32 +266,17 @@ def show_post_event_analytics():
     """Show analytics across all post-event summaries"""
     st.subheader("📊 Post-Event Analytics")
     
-    # Get all events with post-event summaries
     try:
-        events_with_feedback = []
-        all_events = get_db().collection("events").where("deleted", "==", False).stream()
-        
-        for event_doc in all_events:
-            event_data = event_doc.to_dict()
-            if event_data.get("post_event_summary"):
-                events_with_feedback.append(event_data)
+        doc = rollup_ref().get()
+        rollup = doc.to_dict() if doc.exists else {}
+        total_events = rollup.get("events_reviewed", 0)
         
-        if not events_with_feedback:
+        if not total_events:
             st.info("No post-event feedback available yet.")
             return
         
-        # Calculate metrics
-        total_events = len(events_with_feedback)
-        
-        # Average costs
-        total_costs = [e.get("post_event_summary", {}).get("total_cost", 0) for e in events_with_feedback]
-        avg_cost = sum(total_costs) / len(total_costs) if total_costs else 0
-        
-        # Overall ratings distribution
-        ratings = [e.get("post_event_summary", {}).get("overall_rating", "Good") for e in events_with_feedback]
-        rating_counts = {}
-        for rating in ratings:
-            rating_counts[rating] = rating_counts.get(rating, 0) + 1
+        avg_cost = rollup.get("total_cost_cents", 0) / 100 / total_events
+        rating_counts = {r: rollup.get("ratings", {}).get(counter_key(r), 0) for r in RATING_OPTIONS}
         
         # Display metrics
         col1, col2, col3 = st.columns(3)
@@ -281,30 +288,24 @@ def show_post_event_analytics():
             st.metric("Average Event Cost", f"${avg_cost:,.2f}")
         
         with col3:
-            most_common_rating = max(rating_counts.items(), key=lambda x: x[1])[0] if rating_counts else "N/A"
+            most_common_rating = max(rating_counts.items(), key=lambda x: x[1])[0] if any(rating_counts.values()) else "N/A"
             st.metric("Most Common Rating", most_common_rating)
         
         # Show rating distribution
-        if rating_counts:
+        if any(rating_counts.values()):
             st.markdown("#### Rating Distribution")
-            for rating in ["Poor", "Fair", "Good", "Very Good", "Excellent"]:
+            for rating in RATING_OPTIONS:
                 count = rating_counts.get(rating, 0)
                 percentage = (count / total_events) * 100 if total_events > 0 else 0
                 st.write(f"**{rating}:** {count} events ({percentage:.1f}%)")
         
         # Common issues
         st.markdown("#### Common Issues Mentioned")
-        all_issues = []
-        for event in events_with_feedback:
-            summary = event.get("post_event_summary", {})
-            if summary.get("improvements"):
-                all_issues.append(summary["improvements"])
-            if summary.get("timing_issues"):
-                all_issues.append(summary["timing_issues"])
-        
-        if all_issues:
-            # This could be enhanced with text analysis
-            st.info(f"Found {len(all_issues)} improvement notes across all events")
+        note_count = rollup.get("improvement_notes", 0)
+        if note_count:
+            st.info(f"Found {note_count} improvement notes across all events")
+            for note in rollup.get("recent_notes", [])[:5]:
+                st.caption(f"**{note.get('event_name', 'Unnamed')}:** {note.get('text', '')}")
         
     except Exception as e:
         st.error(f"Could not load analytics: {e}")
@@ -0,0 +1,108 @@
+"""
+📈 Post-event rollup
+Counters behind the Post-Event Analytics view, kept in summaries/post_event:
+- Reviewed events, total cost and guests, rating counts, improvement notes
+- The most recent improvement / timing notes with their event id
+- Updated in the same transaction as the post-event form save and as every
+  event write (events._write_event_txn), so deleting an event takes its
+  numbers out too
+
+No Streamlit here: the event transaction imports it without pulling in
+the post-event UI.
+"""
+
+from datetime import datetime
+
+from firebase_init import get_db
+from firestore_utils import contribution_deltas, counter_key, guest_count, increment_counters, nest_fields
+from utils import parse_money_cents
+
+ROLLUP_REF = ("summaries", "post_event")
+RECENT_NOTES_KEPT = 20
+
+
+def rollup_ref():
+    return get_db().collection(ROLLUP_REF[0]).document(ROLLUP_REF[1])
+
+
+def post_event_contribution(event: dict | None) -> dict:
+    """Counter values one reviewed event adds to the post-event rollup."""
+    if not event or event.get("deleted") or not event.get("post_event_summary"):
+        return {}
+    summary = event["post_event_summary"]
+    notes = sum(1 for k in ("improvements", "timing_issues") if summary.get(k))
+    return {
+        "events_reviewed": 1,
+        # Older summaries stored costs as text such as "$1,200"
+        "total_cost_cents": parse_money_cents(summary.get("total_cost")),
+        "total_guests": guest_count(event),
+        f"ratings.{counter_key(summary.get('overall_rating', 'Good'))}": 1,
+        "improvement_notes": notes,
+    }
+
+
+def note_entries(event_id: str, event: dict) -> list[dict]:
+    summary = event.get("post_event_summary") or {}
+    entries = []
+    for kind in ("improvements", "timing_issues"):
+        text = (summary.get(kind) or "").strip()
+        if text:
+            entries.append({
+                "event_id": event_id,
+                "event_name": event.get("name", "Unnamed"),
+                "kind": kind,
+                "text": text[:500],
+                "at": summary.get("completed_at"),
+            })
+    return entries
+
+
+def affects_rollup(before: dict | None, after: dict | None) -> bool:
+    """Whether an event write has to touch the rollup at all."""
+    return bool(post_event_contribution(before) or post_event_contribution(after))
+
+
+def apply_post_event_change(transaction, rollup: dict, event_id: str, before: dict | None, after: dict | None) -> None:
+    """Queue the rollup update for one event going from ``before`` to ``after``.
+
+    ``rollup`` is the current rollup document, read earlier in the same
+    transaction. The event's recent notes are replaced where they stood
+    (or added at the front) and dropped when it no longer counts.
+    """
+    notes = rollup.get("recent_notes", [])
+    position = next((i for i, n in enumerate(notes) if n.get("event_id") == event_id), 0)
+    notes = [n for n in notes if n.get("event_id") != event_id]
+    if post_event_contribution(after):
+        notes[position:position] = note_entries(event_id, after)
+    increment_counters(
+        rollup_ref(),
+        contribution_deltas(post_event_contribution, before, after),
+        extra={"recent_notes": notes[:RECENT_NOTES_KEPT], "updated_at": datetime.utcnow()},
+        writer=transaction,
+    )
+
+
+def rebuild_post_event_rollup() -> int:
+    """Batch job: recompute the post-event rollup from all events.
+
+    Returns the number of reviewed events included.
+    """
+    totals: dict = {}
+    notes = []
+    for doc in get_db().collection("events").select(
+        ["post_event_summary", "deleted", "name", "guest_count"]
+    ).stream():
+        event = doc.to_dict()
+        contribution = post_event_contribution(event)
+        if not contribution:
+            continue
+        for key, value in contribution.items():
+            totals[key] = totals.get(key, 0) + value
+        notes.extend(note_entries(doc.id, event))
+
+    notes.sort(key=lambda n: n["at"].timestamp() if isinstance(n.get("at"), datetime) else 0, reverse=True)
+    rollup_ref().set({"ratings": {}} | nest_fields(totals) | {
+        "recent_notes": notes[:RECENT_NOTES_KEPT],
+        "updated_at": datetime.utcnow(),
+    })
+    return totals.get("events_reviewed", 0)
@@ -0,0 +1,146 @@
+"""
+🧾 Receipt image preprocessing
+Turns an uploaded receipt (PDF, PNG, JPEG...) into compact page images
+before OCR or vision parsing:
+- PDFs are rendered page by page
+- Each page is cropped to the receipt bounds
+- Pages are downscaled to what the vision model actually looks at
+- Pages are re-encoded as grayscale JPEG
+"""
+
+import base64
+import io
+import os
+
+from PIL import Image, ImageChops, ImageOps
+
+from tracing import span, traced
+
+# gpt-4o "high" detail first fits the image in 2048x2048, then scales the
+# shortest side down to 768px; anything larger is uploaded for nothing.
+VISION_MAX_SIDE = 2048
+VISION_SHORT_SIDE = 768
+# Below this size the model's "low" detail (one 512px tile) is enough
+VISION_LOW_DETAIL_SIDE = 512
+
+PDF_RENDER_DPI = 150
+MAX_RECEIPT_PAGES = 4
+JPEG_QUALITY = 70
+
+# Pixels this far from the border colour count as receipt content
+_CROP_THRESHOLD = 40
+_CROP_PADDING = 12
+
+
+def load_receipt_pages(file_path: str, max_pages: int = MAX_RECEIPT_PAGES) -> list[Image.Image]:
+    """Open a receipt file and return its pages as RGB/L PIL images."""
+    if file_path.lower().endswith(".pdf"):
+        import fitz  # PyMuPDF
+
+        pages = []
+        doc = fitz.open(file_path)
+        try:
+            zoom = PDF_RENDER_DPI / 72
+            for page in list(doc)[:max_pages]:
+                pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+                pages.append(Image.frombytes("RGB", (pix.width, pix.height), pix.samples))
+        finally:
+            doc.close()
+        return pages
+
+    image = Image.open(file_path)
+    # Phone photos are often stored sideways with an EXIF rotation flag
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    return [image]
+
+
+def crop_to_receipt(image: Image.Image) -> Image.Image:
+    """Crop away the background around the receipt.
+
+    The background colour is taken from the image border; everything that
+    differs from it noticeably is treated as receipt. If the detected area
+    is implausibly small the image is returned unchanged.
+    """
+    gray = image.convert("L")
+    w, h = gray.size
+    if w < 32 or h < 32:
+        return image
+
+    border = (
+        list(gray.crop((0, 0, w, 4)).getdata())
+        + list(gray.crop((0, h - 4, w, h)).getdata())
+        + list(gray.crop((0, 0, 4, h)).getdata())
+        + list(gray.crop((w - 4, 0, w, h)).getdata())
+    )
+    border.sort()
+    background = border[len(border) // 2]
+
+    diff = ImageChops.difference(gray, Image.new("L", gray.size, background))
+    mask = diff.point(lambda p: 255 if p > _CROP_THRESHOLD else 0)
+    bbox = mask.getbbox()
+    if not bbox:
+        return image
+
+    left, top, right, bottom = bbox
+    if (right - left) * (bottom - top) < 0.1 * w * h:
+        return image
+
+    return image.crop((
+        max(0, left - _CROP_PADDING),
+        max(0, top - _CROP_PADDING),
+        min(w, right + _CROP_PADDING),
+        min(h, bottom + _CROP_PADDING),
+    ))
+
+
+def fit_for_vision(image: Image.Image) -> Image.Image:
+    """Downscale to the resolution the vision model processes at."""
+    w, h = image.size
+    scale = min(1.0, VISION_MAX_SIDE / max(w, h), VISION_SHORT_SIDE / max(1, min(w, h)))
+    if scale < 1.0:
+        image = image.resize(
+            (max(1, int(w * scale)), max(1, int(h * scale))),
+            Image.Resampling.LANCZOS,
+        )
+    return image
+
+
+def encode_jpeg(image: Image.Image, quality: int = JPEG_QUALITY) -> bytes:
+    """Re-encode as an optimized grayscale JPEG (receipts are black text on paper)."""
+    buf = io.BytesIO()
+    ImageOps.autocontrast(image.convert("L"), cutoff=1).save(
+        buf, format="JPEG", quality=quality, optimize=True
+    )
+    return buf.getvalue()
+
+
+@traced(category="extract")
+def preprocess_receipt(file_path: str) -> list[Image.Image]:
+    """Load, crop and downscale every page of a receipt file."""
+    return [fit_for_vision(crop_to_receipt(page)) for page in load_receipt_pages(file_path)]
+
+
+def receipt_vision_parts(file_path: str) -> list[dict]:
+    """Return OpenAI ``image_url`` message parts for a receipt file.
+
+    Each page becomes one compact JPEG data URL with the detail level that
+    matches its final size. The file and payload sizes are recorded on the
+    tracing span.
+    """
+    with span("receipt_vision_parts", "extract") as trace_args:
+        parts = []
+        for page in preprocess_receipt(file_path):
+            b64 = base64.b64encode(encode_jpeg(page)).decode("utf-8")
+            detail = "low" if max(page.size) <= VISION_LOW_DETAIL_SIDE else "high"
+            parts.append({
+                "type": "image_url",
+                "image_url": {"url": f"data:image/jpeg;base64,{b64}", "detail": detail},
+            })
+        trace_args.update(
+            file_bytes=os.path.getsize(file_path),
+            payload_bytes=sum(len(p["image_url"]["url"]) for p in parts),
+            pages=len(parts),
+        )
+    return parts
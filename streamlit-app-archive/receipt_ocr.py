@@ -0,0 +1,256 @@
+"""
+🔎 Local receipt parser
+Runs tesseract over the preprocessed receipt pages and pulls out vendor,
+date, line items and total with compiled patterns plus per-vendor
+templates. Returns a confidence score so callers can fall back to the
+vision model only when the local result looks unreliable.
+"""
+
+import re
+from datetime import datetime
+
+from PIL import Image, ImageOps
+
+from receipt_images import load_receipt_pages, crop_to_receipt
+from tracing import span
+
+# Tesseract reads receipt fonts best at roughly 300 DPI on an 80mm roll
+OCR_TARGET_WIDTH = 1000
+OCR_CONFIG = "--oem 3 --psm 6"
+
+# Local results at or above this score are used without an AI call.
+# Reaching it requires a purchase date and line items that reconcile
+# with the total.
+LOCAL_CONFIDENCE_THRESHOLD = 0.8
+
+# ----------------------------
+# 🧩 Compiled Patterns
+# ----------------------------
+
+_PRICE = r"-?\$?\s?(\d{1,5}[.,]\d{2})"
+
+TOTAL_RE = re.compile(
+    r"^(?!.*\bsub\s*-?\s*total\b)[\s*#=-]*(?:grand\s+|order\s+|balance\s+)?total(?:\s+due)?\b[^\d-]*" + _PRICE,
+    re.IGNORECASE,
+)
+SUBTOTAL_RE = re.compile(r"\bsub\s*-?\s*total\b[^\d-]*" + _PRICE, re.IGNORECASE)
+TAX_RE = re.compile(r"^[\s*#=-]*(?:sales\s+)?tax\b[^\d-]*" + _PRICE, re.IGNORECASE)
+ITEM_RE = re.compile(
+    r"^(?P<name>[A-Za-z][^$]*?[A-Za-z)%])\s+"
+    r"(?:(?P<qty>\d+(?:\.\d+)?)\s*(?:@|x)\s*\$?\d+[.,]\d{2}\s+)?"
+    r"(?P<price>-?\$?\s?\d{1,5}[.,]\d{2})(?:\s*-)?(?:\s+[A-Z]{1,2})?\s*$"
+)
+TRAILING_MINUS_RE = re.compile(r"\d-\s*(?:[A-Z]{1,2})?\s*$")
+QTY_PREFIX_RE = re.compile(r"^(?P<qty>\d+(?:\.\d+)?)\s*(?:x|@|ea\b)?\s+(?P<name>.+)$", re.IGNORECASE)
+
+DATE_PATTERNS = [
+    (re.compile(r"\b(\d{4})[-/](\d{1,2})[-/](\d{1,2})\b"), ("y", "m", "d")),
+    (re.compile(r"\b(\d{1,2})/(\d{1,2})/(\d{4})\b"), ("m", "d", "y")),
+    (re.compile(r"\b(\d{1,2})-(\d{1,2})-(\d{4})\b"), ("m", "d", "y")),
+    (re.compile(r"\b(\d{1,2})/(\d{1,2})/(\d{2})\b"), ("m", "d", "y2")),
+]
+
+# Lines that carry money but are not purchased items
+NON_ITEM_RE = re.compile(
+    r"\b(sub\s*-?\s*total|total|tax|change|cash|visa|mastercard|amex|discover|debit|credit|"
+    r"tender|balance|payment|card|auth|approved|savings|you saved|tip|gratuity|rounding)\b",
+    re.IGNORECASE,
+)
+
+# ----------------------------
+# 🏪 Vendor Templates
+# ----------------------------
+
+# Each template needs a "match" pattern run against the receipt header.
+# Optional keys: "item_re" (overrides ITEM_RE), "skip_re" (extra non-item
+# lines), "total_re" (overrides TOTAL_RE).
+VENDOR_TEMPLATES = {
+    "Costco": {
+        "match": re.compile(r"\bcostco\b", re.IGNORECASE),
+        # Costco lines start with an item number: "E 123456 KS BUTTER 12.99 A"
+        "item_re": re.compile(
+            r"^(?:E\s+)?\d{3,7}\s+(?P<name>.+?)\s+(?P<price>\d{1,5}\.\d{2})(?:-)?(?:\s+[A-Z]{1,2})?\s*$"
+        ),
+        "skip_re": re.compile(r"\b(member|instant savings|items sold)\b", re.IGNORECASE),
+    },
+    "Restaurant Depot": {
+        "match": re.compile(r"\brestaurant\s+depot\b", re.IGNORECASE),
+        "skip_re": re.compile(r"\b(member|account|cases?)\s*#", re.IGNORECASE),
+    },
+    "Sam's Club": {
+        "match": re.compile(r"\bsam'?s\s+club\b", re.IGNORECASE),
+    },
+    "Smart & Final": {
+        "match": re.compile(r"\bsmart\s*(?:&|and)\s*final\b", re.IGNORECASE),
+    },
+    "Trader Joe's": {
+        "match": re.compile(r"\btrader\s+joe'?s\b", re.IGNORECASE),
+    },
+    "Whole Foods": {
+        "match": re.compile(r"\bwhole\s+foods\b", re.IGNORECASE),
+    },
+    "Safeway": {
+        "match": re.compile(r"\bsafeway\b", re.IGNORECASE),
+        "skip_re": re.compile(r"\b(club card|member savings)\b", re.IGNORECASE),
+    },
+    "Walmart": {
+        "match": re.compile(r"\bwal[-\s]?mart\b", re.IGNORECASE),
+        # Walmart lines carry a 12-digit UPC after the name
+        "item_re": re.compile(
+            r"^(?P<name>[A-Za-z][^$]*?)\s+\d{12}\s*[A-Z]?\s+(?P<price>\d{1,5}\.\d{2})(?:\s+[A-Z]{1,2})?\s*$"
+        ),
+    },
+}
+
+
+def _to_cents(text: str) -> int:
+    return int(round(float(text.replace("$", "").replace(",", ".").replace(" ", "")) * 100))
+
+
+def _fmt_cents(cents: int) -> str:
+    return f"{cents / 100:.2f}"
+
+
+def detect_vendor(lines: list[str]) -> tuple[str, dict | None]:
+    """Return (vendor_name, template) from the receipt header."""
+    header = "\n".join(lines[:8])
+    for name, template in VENDOR_TEMPLATES.items():
+        if template["match"].search(header):
+            return name, template
+    for line in lines[:4]:
+        cleaned = line.strip(" *-=#")
+        if sum(c.isalpha() for c in cleaned) >= 3 and not any(ch.isdigit() for ch in cleaned):
+            return cleaned.title(), None
+    return "", None
+
+
+def find_date(text: str) -> datetime | None:
+    for pattern, order in DATE_PATTERNS:
+        for match in pattern.finditer(text):
+            parts = dict(zip(order, match.groups()))
+            year = int(parts.get("y") or 2000 + int(parts["y2"]))
+            try:
+                return datetime(year, int(parts["m"]), int(parts["d"]))
+            except ValueError:
+                continue
+    return None
+
+
+def parse_receipt_text(text: str) -> dict:
+    """Parse OCR text into the receipt dict used by the receipts tab.
+
+    The result carries ``confidence`` (0..1) alongside the usual vendor,
+    date, total and items fields.
+    """
+    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    vendor, template = detect_vendor(lines)
+    template = template or {}
+    item_re = template.get("item_re", ITEM_RE)
+    total_re = template.get("total_re", TOTAL_RE)
+    skip_re = template.get("skip_re")
+
+    total_cents = subtotal_cents = tax_cents = None
+    items = []
+    for line in lines:
+        m = total_re.search(line)
+        if m:
+            # Last "TOTAL" line wins; earlier ones are often item counts
+            total_cents = _to_cents(m.group(1))
+            continue
+        m = SUBTOTAL_RE.search(line)
+        if m:
+            subtotal_cents = _to_cents(m.group(1))
+            continue
+        m = TAX_RE.search(line)
+        if m:
+            tax_cents = (tax_cents or 0) + _to_cents(m.group(1))
+            continue
+        if NON_ITEM_RE.search(line) or (skip_re and skip_re.search(line)):
+            continue
+        m = item_re.match(line)
+        if not m:
+            continue
+        name = m.group("name").strip()
+        qty = (m.groupdict().get("qty") or "").strip()
+        if not qty:
+            qm = QTY_PREFIX_RE.match(name)
+            if qm and len(qm.group("name")) > 2:
+                qty, name = qm.group("qty"), qm.group("name").strip()
+        price_cents = _to_cents(m.group("price"))
+        if TRAILING_MINUS_RE.search(line):
+            # "1.00-" marks a coupon or instant-savings line
+            price_cents = -abs(price_cents)
+        items.append({"name": name, "quantity": qty or "1", "price_cents": price_cents})
+
+    date = find_date(text)
+
+    # Score how much of the receipt we actually understood
+    score = 0.0
+    if vendor:
+        score += 0.15 if template else 0.1
+    if date:
+        score += 0.15
+    if total_cents is not None:
+        score += 0.3
+    if items:
+        score += 0.15
+        item_sum = sum(i["price_cents"] for i in items)
+        expected = subtotal_cents
+        if expected is None and total_cents is not None:
+            expected = total_cents - (tax_cents or 0)
+        if expected is not None and abs(item_sum - expected) <= max(2, len(items)):
+            score += 0.25
+    if not date:
+        # Never accept a receipt without a date: stamping it with today's
+        # date would misfile the spend in the date rollups
+        score = min(score, LOCAL_CONFIDENCE_THRESHOLD - 0.05)
+
+    return {
+        "vendor": vendor or "Unknown Vendor",
+        "date": date,
+        "total": _fmt_cents(total_cents) if total_cents is not None else "",
+        "items": [
+            {"name": i["name"], "quantity": i["quantity"], "price": _fmt_cents(i["price_cents"])}
+            for i in items
+        ],
+        "confidence": round(min(score, 1.0), 2),
+    }
+
+
+def _prepare_for_ocr(image: Image.Image) -> Image.Image:
+    gray = ImageOps.autocontrast(image.convert("L"), cutoff=1)
+    w, h = gray.size
+    if w != OCR_TARGET_WIDTH:
+        scale = OCR_TARGET_WIDTH / w
+        gray = gray.resize((OCR_TARGET_WIDTH, max(1, int(h * scale))), Image.Resampling.LANCZOS)
+    return gray
+
+
+def parse_receipt_locally(file_path: str) -> dict | None:
+    """OCR a receipt file and parse it without any network calls.
+
+    Returns None when tesseract is unavailable or no text was found; the
+    caller then falls back to the vision model. The "extract" span carries
+    the page count, confidence and any OCR error.
+    """
+    try:
+        import pytesseract
+    except ImportError:
+        return None
+
+    with span("parse_receipt_locally", "extract") as trace_args:
+        try:
+            pages = [_prepare_for_ocr(crop_to_receipt(p)) for p in load_receipt_pages(file_path)]
+            text = "\n".join(pytesseract.image_to_string(p, config=OCR_CONFIG) for p in pages)
+        except Exception as e:
+            trace_args["ocr_error"] = f"{type(e).__name__}: {e}"
+            return None
+        trace_args["pages"] = len(pages)
+
+        if not text.strip():
+            return None
+
+        result = parse_receipt_text(text)
+        result["parsed_by"] = "local"
+        trace_args["confidence"] = result["confidence"]
+        return result
@@ -1,11 +1,14 @@
 import streamlit as st
-from firebase_init import get_db, storage
+from firebase_init import get_db, storage, firestore
 from auth import require_login
-from utils import generate_id, get_scoped_query, is_event_scoped, get_event_scope_message, get_active_event_id, delete_button
+from utils import (
+    generate_id, get_scoped_query, is_event_scoped, get_event_scope_message, get_active_event_id,
+    delete_button, parse_money_cents, format_cents,
+)
+from firestore_utils import counter_key, increment_counters, nest_fields
 from datetime import datetime
 from PIL import Image
 import tempfile
-import base64
 import io
 import json
 import re
@@ -14,6 +17,11 @@ from firebase_init import get_db
 
 from mobile_helpers import safe_columns, safe_file_uploader
 from mobile_layout import render_mobile_navigation
+from receipt_images import receipt_vision_parts
+from llm_gateway import chat_completion, llm_available
+from tracing import traced
+from tag_utils import update_tag_index
+from receipt_ocr import parse_receipt_locally, LOCAL_CONFIDENCE_THRESHOLD
 
 db = get_db()
 
@@ -41,24 +49,17 @@ def receipt_upload_ui(user: dict) -> None:
 # 🤖 AI Receipt Parsing Logic
 # ----------------------------
 
+@traced(category="extract")
 def _parse_receipt_with_ai(file_path: str) -> dict:
-    try:
-        from openai import OpenAI
-        api_key = st.secrets.get("openai", {}).get("api_key", "")
-        if not api_key:
-            st.warning("⚠️ OpenAI API key not configured. Using manual entry.")
-            return _parse_receipt_fallback()
-
-        client = OpenAI(api_key=api_key)
-    except Exception as e:
-        st.warning(f"⚠️ OpenAI not available: {str(e)}. Using manual entry.")
+    if not llm_available():
+        st.warning("⚠️ OpenAI API key not configured. Using manual entry.")
         return _parse_receipt_fallback()
 
     try:
-        with open(file_path, "rb") as image_file:
-            image_data = image_file.read()
-
-        base64_image = base64.b64encode(image_data).decode('utf-8')
+        image_parts = receipt_vision_parts(file_path)
+        if not image_parts:
+            st.warning("⚠️ Could not read any pages from this receipt. Please enter details manually.")
+            return _parse_receipt_fallback()
 
         prompt = """Analyze this receipt image and extract the following information in JSON format:
         {
@@ -75,15 +76,13 @@ def _parse_receipt_with_ai(file_path: str) -> dict:
         }
         """
 
-        response = client.chat.completions.create(
+        response = chat_completion(
+            "receipt_parse",
             model="gpt-4o-mini",
             messages=[
                 {
                     "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}", "detail": "high"}}
-                    ]
+                    "content": [{"type": "text", "text": prompt}] + image_parts
                 }
             ],
             max_tokens=1000,
@@ -98,7 +97,8 @@ def _parse_receipt_with_ai(file_path: str) -> dict:
             "vendor": result_data.get("vendor", "Unknown Vendor"),
             "date": _parse_date(result_data.get("date", "")),
             "total": result_data.get("total", "0.00"),
-            "items": []
+            "items": [],
+            "parsed_by": "ai",
         }
 
         for item in result_data.get("items", []):
@@ -119,6 +119,15 @@ def _parse_receipt_with_ai(file_path: str) -> dict:
         st.warning(f"⚠️ AI parsing encountered an error: {str(e)}. Please enter details manually.")
         return _parse_receipt_fallback()
 
+@traced(category="extract")
+def _parse_receipt(file_path: str) -> dict:
+    """Parse a receipt locally with OCR, using the vision model only when needed."""
+    local = parse_receipt_locally(file_path)
+    if local and local["confidence"] >= LOCAL_CONFIDENCE_THRESHOLD:
+        st.success(f"✅ Parsed {len(local['items'])} items from receipt!")
+        return local
+    return _parse_receipt_with_ai(file_path)
+
 def _parse_receipt_fallback():
     return {
         "vendor": "",
@@ -145,68 +154,181 @@ def _parse_date(date_string: str) -> datetime:
 
     return datetime.today()
 
+# ----------------------------
+# 📈 Spend Rollups
+# ----------------------------
+
+ROLLUP_COLLECTION = "receipt_rollups"
+GLOBAL_ROLLUP_ID = "global"
+
+def _receipt_cents(receipt: dict) -> int:
+    """Receipt total in cents; older receipts only stored the total string."""
+    if receipt.get("total_cents") is not None:
+        return receipt["total_cents"]
+    return parse_money_cents(receipt.get("total"))
+
+def _rollup_writes(receipt: dict, sign: int) -> list[tuple[str, dict, dict]]:
+    """(doc_id, increments, plain_fields) for every rollup a receipt touches."""
+    cents = _receipt_cents(receipt) * sign
+    vendor = receipt.get("vendor") or "Unknown"
+    vkey = counter_key(vendor)
+    scope_deltas = {
+        "count": sign,
+        "total_cents": cents,
+        "ai_parsed": sign if receipt.get("ai_parsed") else 0,
+        "high_confidence": sign if receipt.get("parse_confidence") == "high" else 0,
+        f"vendors.{vkey}.count": sign,
+        f"vendors.{vkey}.total_cents": cents,
+    }
+    scope_extra = {f"vendors.{vkey}.name": vendor, "updated_at": datetime.utcnow()}
+
+    scopes = [GLOBAL_ROLLUP_ID]
+    if receipt.get("event_id"):
+        scopes.append(f"event_{receipt['event_id']}")
+    writes = [(scope, scope_deltas, scope_extra) for scope in scopes]
+    writes.append((
+        f"vendor_{vkey}",
+        {"count": sign, "total_cents": cents},
+        {"name": vendor, "updated_at": datetime.utcnow()},
+    ))
+    return writes
+
+def _apply_rollups(writer, receipt: dict, sign: int) -> None:
+    rollups = get_db().collection(ROLLUP_COLLECTION)
+    for doc_id, deltas, extra in _rollup_writes(receipt, sign):
+        increment_counters(rollups.document(doc_id), deltas, extra=extra, writer=writer)
+
+@firestore.transactional
+def _save_receipt_txn(transaction, receipt_ref, data: dict) -> None:
+    previous = receipt_ref.get(transaction=transaction)
+    before = previous.to_dict() if previous.exists else {}
+    if previous.exists:
+        _apply_rollups(transaction, before, -1)
+    _apply_rollups(transaction, data, +1)
+    transaction.set(receipt_ref, data)
+    update_tag_index(
+        "receipts", receipt_ref.id, data.get("name"), data.get("tags"),
+        previous_tags=before.get("tags"), writer=transaction,
+    )
+
+@firestore.transactional
+def _delete_receipt_txn(transaction, receipt_ref) -> None:
+    previous = receipt_ref.get(transaction=transaction)
+    if not previous.exists:
+        return
+    before = previous.to_dict()
+    _apply_rollups(transaction, before, -1)
+    transaction.delete(receipt_ref)
+    update_tag_index("receipts", receipt_ref.id, before.get("name"), [], previous_tags=before.get("tags"), writer=transaction)
+
+def save_receipt(data: dict) -> None:
+    """Write a receipt and update its spend rollups in one transaction."""
+    data["total_cents"] = parse_money_cents(data.get("total"))
+    db = get_db()
+    _save_receipt_txn(db.transaction(), db.collection("receipts").document(data["id"]), data)
+
+def delete_receipt(receipt_id: str) -> None:
+    """Delete a receipt and back its amount out of the spend rollups."""
+    db = get_db()
+    _delete_receipt_txn(db.transaction(), db.collection("receipts").document(receipt_id))
+
+def get_receipt_rollup(event_id: str | None = None) -> dict:
+    """Return the spend rollup for one event, or across all receipts."""
+    doc_id = f"event_{event_id}" if event_id else GLOBAL_ROLLUP_ID
+    doc = get_db().collection(ROLLUP_COLLECTION).document(doc_id).get()
+    return doc.to_dict() if doc.exists else {}
+
+def rebuild_receipt_rollups() -> int:
+    """Recompute every spend rollup from the receipts collection.
+
+    Used to backfill receipts saved before rollups existed or to repair
+    drift. Returns the number of receipts processed.
+    """
+    db = get_db()
+    totals: dict[str, dict] = {}
+    count = 0
+    for doc in db.collection("receipts").stream():
+        receipt = doc.to_dict()
+        count += 1
+        if receipt.get("total_cents") is None:
+            doc.reference.update({"total_cents": _receipt_cents(receipt)})
+        for doc_id, deltas, extra in _rollup_writes(receipt, +1):
+            entry = totals.setdefault(doc_id, {})
+            for path, delta in deltas.items():
+                entry[path] = entry.get(path, 0) + delta
+            entry.update(extra)
+
+    rollups = db.collection(ROLLUP_COLLECTION)
+    batch = db.batch()
+    pending = 0
+    for doc in rollups.stream():
+        if doc.id not in totals:
+            batch.delete(doc.reference)
+            pending += 1
+    for doc_id, fields in totals.items():
+        batch.set(rollups.document(doc_id), nest_fields(fields))
+        pending += 1
+        if pending >= 400:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+    return count
+
 def show_receipt_analytics():
     try:
-        query = get_scoped_query("receipts")
-        receipts = [doc.to_dict() for doc in query.stream()]
+        rollup = get_receipt_rollup(get_active_event_id() if is_event_scoped() else None)
+        receipt_count = rollup.get("count", 0)
 
-        if not receipts:
+        if not receipt_count:
             st.info("No receipts to analyze")
             return
 
+        total_cents = rollup.get("total_cents", 0)
+        vendors = {k: v for k, v in rollup.get("vendors", {}).items() if v.get("count", 0) > 0}
+
         st.markdown("### Receipt Analytics")
         col1, col2, col3, col4 = safe_columns(4)
 
         with col1:
-            st.metric("Total Receipts", len(receipts))
+            st.metric("Total Receipts", receipt_count)
         with col2:
-            total_amount = sum(float(r.get('total', '0').replace('$', '').replace(',', '')) for r in receipts if r.get('total'))
-            st.metric("Total Spent", f"${total_amount:,.2f}")
+            st.metric("Total Spent", format_cents(total_cents))
         with col3:
-            vendors = set(r.get('vendor') for r in receipts if r.get('vendor'))
             st.metric("Unique Vendors", len(vendors))
         with col4:
-            avg_amount = total_amount / len(receipts) if receipts else 0
-            st.metric("Average Receipt", f"${avg_amount:.2f}")
+            st.metric("Average Receipt", format_cents(total_cents // receipt_count))
 
-        ai_parsed = len([r for r in receipts if r.get('ai_parsed')])
+        ai_parsed = rollup.get("ai_parsed", 0)
         if ai_parsed > 0:
             st.markdown("#### AI Parsing Statistics")
             col1, col2 = safe_columns(2)
             with col1:
-                st.metric("AI Parsed", f"{ai_parsed}/{len(receipts)}")
+                st.metric("AI Parsed", f"{ai_parsed}/{receipt_count}")
             with col2:
-                high_confidence = len([r for r in receipts if r.get('parse_confidence') == 'high'])
-                st.metric("High Confidence", f"{high_confidence}/{ai_parsed}")
+                st.metric("High Confidence", f"{rollup.get('high_confidence', 0)}/{ai_parsed}")
 
         if vendors:
             st.markdown("#### Top Vendors")
-            vendor_totals = {}
-            for receipt in receipts:
-                vendor = receipt.get('vendor', 'Unknown')
-                amount = float(receipt.get('total', '0').replace('$', '').replace(',', ''))
-                vendor_totals[vendor] = vendor_totals.get(vendor, 0) + amount
-
-            for vendor, total in sorted(vendor_totals.items(), key=lambda x: x[1], reverse=True)[:5]:
-                st.write(f"**{vendor}:** ${total:,.2f}")
+            top = sorted(vendors.values(), key=lambda v: v.get("total_cents", 0), reverse=True)[:5]
+            for vendor in top:
+                st.write(f"**{vendor.get('name', 'Unknown')}:** {format_cents(vendor.get('total_cents', 0))}")
 
     except Exception as e:
         st.error(f"Could not load analytics: {e}")
 
 def _display_receipts(receipts: list) -> None:
-    total_amount = sum(
-        float(r.get('total', '0').replace('$', '').replace(',', ''))
-        for r in receipts if r.get('total')
-    )
+    total_cents = sum(_receipt_cents(r) for r in receipts)
 
     col1, col2, col3 = safe_columns(3)
     with col1:
         st.metric("Total Receipts", len(receipts))
     with col2:
-        st.metric("Total Spent", f"${total_amount:,.2f}")
+        st.metric("Total Spent", format_cents(total_cents))
     with col3:
-        avg = total_amount / len(receipts) if receipts else 0
-        st.metric("Average", f"${avg:.2f}")
+        avg = total_cents // len(receipts) if receipts else 0
+        st.metric("Average", format_cents(avg))
 
     st.markdown("---")
 
@@ -258,7 +380,7 @@ def _display_receipts(receipts: list) -> None:
 
             if delete_button("🗑️ Delete Receipt", key=f"del_{receipt['id']}"):
                 try:
-                    get_db().collection("receipts").document(receipt['id']).delete()
+                    delete_receipt(receipt['id'])
                     st.success("Receipt deleted")
                 except Exception as e:
                     st.error(f"Failed to delete: {e}")
@@ -284,7 +406,7 @@ def _upload_receipt_section(user: dict) -> None:
         with col2:
             st.info("📸 Receipt uploaded! Click below to analyze it.")
 
-            if st.button("🧠 Parse Receipt with AI", type="primary"):
+            if st.button("🧠 Parse Receipt", type="primary"):
                 with st.spinner("🔍 Analyzing receipt..."):
                     file_id = generate_id("receipt")
                     file_name = uploaded.name
@@ -294,7 +416,7 @@ def _upload_receipt_section(user: dict) -> None:
                         tmp.write(uploaded.getvalue())
                         tmp_path = tmp.name
 
-                    parsed_data = _parse_receipt_with_ai(tmp_path)
+                    parsed_data = _parse_receipt(tmp_path)
 
                     st.session_state['parsed_receipt'] = {
                         'file_id': file_id,
@@ -317,7 +439,7 @@ def _upload_receipt_section(user: dict) -> None:
 
             with col1:
                 vendor = st.text_input("Vendor", value=parsed.get("vendor", ""))
-                date = st.date_input("Purchase Date", value=parsed.get("date", datetime.today()))
+                date = st.date_input("Purchase Date", value=parsed.get("date") or datetime.today())
 
             with col2:
                 total = st.text_input("Total Amount", value=parsed.get("total", ""))
@@ -400,11 +522,12 @@ def _upload_receipt_section(user: dict) -> None:
                         "shopping_list_id": shopping_list_id or None,
                         "equipment_id": equipment_id or None,
                         "notes": notes,
-                        "ai_parsed": True,
+                        "ai_parsed": parsed.get("parsed_by") == "ai",
+                        "parsed_by": parsed.get("parsed_by", "manual"),
                         "parse_confidence": "high" if vendor and total else "low"
                     }
 
-                    get_db().collection("receipts").document(receipt_data['file_id']).set(firestore_data)
+                    save_receipt(firestore_data)
 
                     import os
                     os.unlink(receipt_data['tmp_path'])
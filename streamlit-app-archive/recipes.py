@@ -14,6 +14,7 @@ from ingredients import (
     search_recipes_by_ingredient,
 )
 from allergies import render_allergy_warning
+from tag_utils import update_tag_index
 
 db = get_db()
 bucket = get_bucket()
@@ -176,22 +177,21 @@ def save_recipe_to_firestore(recipe_data, user_id=None, file_id=None):
         "source_file_id": file_id,
     }
     db.collection("recipes").document(recipe_id).set(doc)
+    update_tag_index("recipes", recipe_id, doc["name"], doc["tags"])
     return recipe_id
 
 def save_event_to_firestore(event_data, user_id=None, file_id=None):
-    event_id = str(uuid.uuid4())
+    # Go through events.create_event so the event summary and file stay in step
+    from events import create_event
     doc = {
-        "id": event_id,
         "name": event_data.get("title", "Untitled Event"),
         "date": event_data.get("date"),
         "location": event_data.get("location"),
         "notes": event_data.get("notes", ""),
         "tags": event_data.get("tags", []),
-        "created_by": user_id,
         "source_file_id": file_id,
     }
-    db.collection("events").document(event_id).set(doc)
-    return event_id
+    return create_event(doc, user_id)
 
 def save_menu_to_firestore(menu_data, user_id=None, file_id=None):
     menu_id = str(uuid.uuid4())
@@ -370,6 +370,55 @@ def add_recipe_via_link_ui():
         st.markdown("</div>", unsafe_allow_html=True)
 
 
+# ----------------------------
+# 📚 Batch Import via Links UI
+# ----------------------------
+
+def add_recipes_via_links_batch_ui():
+    """Paste many recipe links, parse them concurrently and save the good ones."""
+    with st.expander("Batch Import from Links", expanded=False):
+        raw_urls = st.text_area(
+            "Recipe URLs (one per line)",
+            key="batch_recipe_links",
+            height=150,
+        )
+        if st.button("Import All", key="batch_import_links_btn"):
+            urls = [u.strip() for u in raw_urls.splitlines() if u.strip()]
+            if not urls:
+                st.warning("Paste at least one link.")
+            else:
+                with st.spinner(f"Fetching and parsing {len(urls)} recipes..."):
+                    from ai_parsing_engine import parse_recipes_from_urls
+
+                    st.session_state["batch_link_results"] = parse_recipes_from_urls(urls)
+
+        results = st.session_state.get("batch_link_results")
+        if not results:
+            return
+
+        ok = [r for r in results if r["status"] == "ok"]
+        st.markdown(f"**{len(ok)} of {len(results)} links parsed successfully**")
+        for r in results:
+            name = r["recipe"].get("name") or r["recipe"].get("title") or ""
+            icon = "✅" if r["status"] == "ok" else "⚠️"
+            detail = name if r["status"] == "ok" else f"{r['status']}: {r['error']}"
+            st.caption(f"{icon} {r['url']} — {detail}")
+
+        if ok and st.button(f"Save {len(ok)} Recipes", key="batch_save_links_btn"):
+            user = get_user()
+            user_id = user.get("id") if user else None
+            saved, skipped = 0, 0
+            for r in ok:
+                recipe = r["recipe"]
+                if find_recipe_by_name(recipe.get("name") or recipe.get("title") or ""):
+                    skipped += 1
+                    continue
+                save_recipe_to_firestore(recipe, user_id=user_id)
+                saved += 1
+            st.success(f"✅ Saved {saved} recipes" + (f" ({skipped} duplicates skipped)" if skipped else ""))
+            st.session_state.pop("batch_link_results", None)
+
+
 # ----------------------------
 # ✍️ Add Recipe Manually UI
 # ----------------------------
@@ -475,6 +524,7 @@ def add_recipe_manual_ui():
                 recipe_id = str(uuid.uuid4())
                 data["id"] = recipe_id
                 db.collection("recipes").document(recipe_id).set(data)
+                update_tag_index("recipes", recipe_id, data.get("name"), data.get("tags"))
                 parsed = parse_recipe_ingredients(ingredients)
                 if parsed:
                     update_recipe_with_parsed_ingredients(recipe_id, parsed)
@@ -763,6 +813,7 @@ def _render_recipe_card(recipe: dict, *, is_version: bool = False):
                     doc_ref.collection("versions").document(recipe["id"]).delete()
                 else:
                     db.collection("recipes").document(recipe["id"]).delete()
+                    update_tag_index("recipes", recipe["id"], recipe.get("name"), [], previous_tags=recipe.get("tags"))
                 st.rerun()
 
         if st.session_state.get(f"add_ver_{recipe['id']}"):
@@ -821,6 +872,7 @@ def recipes_page(user: dict | None = None) -> None:
     st.title("📚 Recipes")
 
     add_recipe_via_link_ui()
+    add_recipes_via_links_batch_ui()
     add_recipe_via_upload_ui()
     add_recipe_manual_ui()
 
@@ -8,7 +8,7 @@ from ingredients import parse_recipe_ingredients, update_recipe_with_parsed_ingr
 from allergies import render_allergy_warning
 from recipes import save_recipe_to_firestore
 from smart_recipe_scaler import scale_recipe
-from tag_utils import suggest_recipe_tags
+from tag_utils import suggest_recipe_tags, update_tag_index
 
 
 def render_ingredient_columns(items):
@@ -239,6 +239,10 @@ def recipe_editor_ui(recipe_id=None, prefill_data=None):
                     "updated_at": datetime.utcnow(),
                     "updated_by": user_id,
                 })
+                update_tag_index(
+                    "recipes", doc_id, data.get("name"), data["tags"],
+                    previous_tags=(recipe or {}).get("tags"),
+                )
                 update_recipe_with_parsed_ingredients(doc_id, data["ingredients"])
             else:
                 new_id = save_recipe_to_firestore(data, user_id=user_id)
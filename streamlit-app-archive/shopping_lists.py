@@ -2,6 +2,7 @@ import streamlit as st
 from firebase_init import get_db
 from datetime import datetime
 from utils import generate_id
+from tag_utils import update_tag_index
 
 db = get_db()
 
@@ -25,6 +26,7 @@ def create_shopping_list(list_data: dict, user_id: str | None = None) -> str | N
             "parsed_data": list_data.get("parsed_data", {}),
         }
         db.collection("shopping_lists").document(list_id).set(doc)
+        update_tag_index("shopping_lists", list_id, doc["name"], doc["tags"])
         return list_id
     except Exception as e:
         st.error(f"❌ Failed to create shopping list: {e}")
@@ -34,7 +36,18 @@ def update_shopping_list(list_id: str, updates: dict) -> bool:
     """Update an existing shopping list"""
     try:
         updates["updated_at"] = datetime.utcnow()
-        db.collection("shopping_lists").document(list_id).update(updates)
+        ref = db.collection("shopping_lists").document(list_id)
+        if "tags" not in updates and "name" not in updates:
+            ref.update(updates)
+            return True
+        current = ref.get().to_dict() or {}
+        batch = db.batch()
+        batch.update(ref, updates)
+        update_tag_index(
+            "shopping_lists", list_id, updates.get("name", current.get("name")),
+            updates.get("tags", current.get("tags")), previous_tags=current.get("tags"), writer=batch,
+        )
+        batch.commit()
         return True
     except Exception as e:
         st.error(f"❌ Failed to update shopping list: {e}")
@@ -43,10 +56,15 @@ def update_shopping_list(list_id: str, updates: dict) -> bool:
 def delete_shopping_list(list_id: str) -> bool:
     """Soft delete a shopping list"""
     try:
-        db.collection("shopping_lists").document(list_id).update({
+        ref = db.collection("shopping_lists").document(list_id)
+        current = ref.get().to_dict() or {}
+        batch = db.batch()
+        batch.update(ref, {
             "deleted": True,
             "deleted_at": datetime.utcnow(),
         })
+        update_tag_index("shopping_lists", list_id, current.get("name"), [], previous_tags=current.get("tags"), writer=batch)
+        batch.commit()
         return True
     except Exception as e:
         st.error(f"❌ Failed to delete shopping list: {e}")
@@ -24,7 +24,7 @@ def scale_recipe(recipe_data: dict, target_servings: float) -> dict:
         "recipe": recipe_data
     }
 
-    scaled_recipe = query_ai_parser(ai_prompt, mode="scaling")
+    scaled_recipe = query_ai_parser(ai_prompt, mode="scaling", feature="recipe_scaling")
     scaled_recipe["scaled_servings"] = target_servings
     scaled_recipe["scaling_method"] = "manual"
     scaled_recipe["scaling_notes"] = f"User scaled from {original_servings} to {target_servings} servings."
@@ -75,7 +75,7 @@ def scale_menu(event_file: dict, recipes: List[dict]) -> Dict[str, dict]:
             "recipe": recipe
         }
 
-        scaled = query_ai_parser(ai_prompt, mode="scaling")
+        scaled = query_ai_parser(ai_prompt, mode="scaling", feature="recipe_scaling")
         scaled["scaled_servings"] = overshoot_people
         scaled["scaling_method"] = "event_menu"
         scaled["scaling_notes"] = f"Scaled from {base_serves} to {overshoot_people} based on event size with 10% overshoot."
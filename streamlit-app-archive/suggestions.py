@@ -1,12 +1,11 @@
 # suggestions.py
 
 import streamlit as st
-from firebase_admin import firestore
+from firebase_init import db, firestore
 from datetime import datetime
 from auth import get_user_id
 from utils import generate_id
 
-db = firestore.client()
 COLLECTION = "suggestions"
 
 # ----------------------------
@@ -0,0 +1,613 @@
+"""
+🧬 Synthetic datasets
+Seeded, schema-faithful data for load and performance testing:
+- Users, ingredients, recipes (parsed_ingredients + versions), events
+  (meta/event_file menus, allergies, shopping items), menus, shopping
+  lists, receipts, files and years of logs / AI logs
+- The same scale + seed always produces the same documents
+- Loaded through bulk write batches into any get_db() backend, then the
+  summary/rollup documents are rebuilt with the app's own rebuild helpers
+
+    MM_FIRESTORE_BACKEND=memory python synthetic_data.py --scale large --seed 7
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from firestore_utils import counter_key
+
+# Firestore rejects batches over 500 writes
+BULK_BATCH_SIZE = 400
+
+# Fixed default anchor so generated timestamps are repeatable across days
+DEFAULT_ANCHOR = datetime(2025, 1, 1)
+
+SCALES = {
+    "tiny": {
+        "users": 5, "ingredients": 60, "recipes": 50, "events": 10,
+        "shopping_items": 200, "receipts": 20, "files": 20, "log_days": 30, "logs_per_day": 5,
+    },
+    "small": {
+        "users": 12, "ingredients": 300, "recipes": 500, "events": 100,
+        "shopping_items": 2_500, "receipts": 200, "files": 200, "log_days": 180, "logs_per_day": 12,
+    },
+    "medium": {
+        "users": 25, "ingredients": 800, "recipes": 2_500, "events": 500,
+        "shopping_items": 12_000, "receipts": 1_000, "files": 1_000, "log_days": 365, "logs_per_day": 20,
+    },
+    "large": {
+        "users": 40, "ingredients": 1_500, "recipes": 10_000, "events": 2_000,
+        "shopping_items": 50_000, "receipts": 4_000, "files": 4_000, "log_days": 3 * 365, "logs_per_day": 30,
+    },
+}
+
+# ----------------------------
+# 📚 Vocabulary
+# ----------------------------
+
+_INGREDIENTS = {
+    "Proteins": ["chicken thigh", "chicken breast", "ground beef", "pork shoulder", "salmon", "shrimp", "tofu", "egg", "turkey", "lamb"],
+    "Dairy": ["milk", "cheddar cheese", "yogurt", "butter", "cream", "sour cream", "mozzarella", "parmesan"],
+    "Vegetables": ["carrot", "celery", "onion", "garlic", "tomato", "bell pepper", "broccoli", "spinach", "lettuce", "potato", "zucchini", "mushroom"],
+    "Fruits": ["apple", "banana", "orange", "lemon", "lime", "strawberry", "blueberry", "peach", "mango"],
+    "Grains": ["rice", "pasta", "bread", "flour", "oats", "quinoa", "barley", "tortilla"],
+    "Herbs & Spices": ["salt", "black pepper", "basil", "oregano", "thyme", "rosemary", "paprika", "cumin", "cinnamon", "chili powder"],
+    "Oils & Fats": ["olive oil", "canola oil", "shortening"],
+    "Condiments": ["soy sauce", "ketchup", "mustard", "mayo", "vinegar", "salsa", "hot sauce"],
+    "Baking": ["sugar", "brown sugar", "baking powder", "baking soda", "yeast", "vanilla", "cocoa"],
+    "Beverages": ["chicken stock", "vegetable broth", "coffee", "tea", "orange juice"],
+}
+_INGREDIENT_VARIANTS = ["", "organic ", "fresh ", "smoked ", "frozen ", "local ", "aged ", "wild "]
+_ALLERGENS = {
+    "Dairy": "Dairy", "egg": "Eggs", "shrimp": "Shellfish", "salmon": "Fish", "flour": "Gluten",
+    "bread": "Gluten", "pasta": "Gluten", "tortilla": "Gluten", "soy sauce": "Soy", "tofu": "Soy",
+}
+_UNITS = ["cup", "cups", "tbsp", "tsp", "oz", "lb", "g", "kg", "cloves", "cans", "pieces", "bunches"]
+
+_DISH_STYLES = ["Roasted", "Grilled", "Braised", "Spicy", "Herbed", "Smoked", "Lemon", "Garlic", "Maple", "Campfire", "Mountain", "Rustic"]
+_DISH_FORMS = ["Stew", "Tacos", "Salad", "Pasta", "Chili", "Curry", "Bowls", "Skewers", "Casserole", "Soup", "Frittata", "Lasagna", "Burgers", "Flatbread"]
+_TAGS = ["Breakfast", "Lunch", "Dinner", "Dessert", "Vegetarian", "Vegan", "Gluten-Free", "Dairy-Free",
+         "Comfort Food", "Quick", "Make-Ahead", "Crowd Pleaser", "Mexican", "Italian", "Asian", "American"]
+_SPECIAL_VERSIONS = ["Gluten-Free", "Vegan", "Dairy-Free", "Nut-Free", "Low Sodium"]
+
+_EVENT_KINDS = ["Retreat", "Wedding", "Festival", "Workshop", "Reunion", "Camp", "Gala", "Conference"]
+_PLACES = ["Aspen Ridge", "Pine Hollow", "Cedar Lake", "Bear Creek", "Silver Falls", "Eagle Point", "Juniper Flats", "Granite Peak"]
+_LOCATIONS = ["Mountain Lodge", "Lakeside Pavilion", "Ridge Campground", "Valley Ranch", "Summit Hall", "Riverside Barn"]
+_MEALS = ["breakfast", "lunch", "dinner"]
+_SEVERITIES = ["Mild", "Moderate", "Severe", "Life-threatening"]
+_FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn", "Rowan", "Skyler"]
+_LAST_NAMES = ["Rivera", "Chen", "Patel", "Okafor", "Novak", "Larsen", "Silva", "Kim", "Moreau", "Haddad"]
+_ROLES = ["admin", "manager", "user", "user", "viewer"]
+_SHOP_CATEGORIES = ["Produce", "Protein", "Dairy", "Dry Goods", "Beverages", "Supplies", "Other"]
+_SHOP_UNITS = ["", "lbs", "kg", "oz", "cups", "pieces", "dozen", "cases"]
+_VENDORS = ["Costco", "Restaurant Depot", "Safeway", "Whole Foods", "Sysco", "Farmers Market", "Trader Joe's"]
+_FILE_TYPES = [
+    ("application/pdf", "pdf"), ("image/jpeg", "jpg"), ("image/png", "png"),
+    ("text/plain", "txt"), ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", "docx"),
+]
+_LOG_ACTIONS = ["login", "view_event", "edit_recipe", "upload_file", "create_event", "update_menu", "export_pdf", "add_receipt"]
+_AI_QUERIES = [
+    ("How many pounds of chicken for {n} guests?", "scaling"),
+    ("Suggest a vegetarian dinner for {n} people", "menu"),
+    ("What can replace eggs in pancakes?", "substitution"),
+    ("Build a shopping list for {n} guests", "shopping"),
+    ("Which dishes contain gluten?", "allergen"),
+]
+
+# ----------------------------
+# 🎲 Generation
+# ----------------------------
+
+class _Generator:
+    """Builds one dataset; all randomness comes from a single seeded RNG."""
+
+    def __init__(self, counts: dict, seed: int, anchor: datetime):
+        self.counts = counts
+        self.rng = random.Random(seed)
+        self.anchor = anchor
+        self._seen_ids: set = set()
+
+    def _id(self, prefix: str) -> str:
+        # Same shape as utils.generate_id, but drawn from the seeded RNG
+        while True:
+            doc_id = f"{prefix}_{self.rng.getrandbits(32):08x}"
+            if doc_id not in self._seen_ids:
+                self._seen_ids.add(doc_id)
+                return doc_id
+
+    def _past(self, max_days: float) -> datetime:
+        return self.anchor - timedelta(seconds=self.rng.uniform(0, max_days * 86400))
+
+    def _person(self) -> str:
+        return f"{self.rng.choice(_FIRST_NAMES)} {self.rng.choice(_LAST_NAMES)}"
+
+    def users(self):
+        self.user_ids = []
+        for i in range(self.counts["users"]):
+            user_id = self._id("user")
+            name = self._person()
+            self.user_ids.append(user_id)
+            yield ("users", user_id), {
+                "id": user_id,
+                "email": f"{name.lower().replace(' ', '.')}{i}@example.com",
+                "name": name,
+                "role": "admin" if i == 0 else self.rng.choice(_ROLES),
+                "email_verified": True,
+                "created_at": self._past(self.counts["log_days"]),
+            }
+
+    def _build_ingredients(self):
+        self.ingredients_list = []
+        pool = [(category, name) for category, names in _INGREDIENTS.items() for name in names]
+        for i in range(self.counts["ingredients"]):
+            category, base = pool[i % len(pool)]
+            variant = _INGREDIENT_VARIANTS[(i // len(pool)) % len(_INGREDIENT_VARIANTS)]
+            suffix = f" {i // (len(pool) * len(_INGREDIENT_VARIANTS)) + 1}" if i >= len(pool) * len(_INGREDIENT_VARIANTS) else ""
+            name = f"{variant}{base}{suffix}"
+            ingredient_id = self._id("ing")
+            allergen = _ALLERGENS.get(base) or _ALLERGENS.get(category)
+            entry = {
+                "id": ingredient_id,
+                "name": name.title(),
+                "normalized_name": name,
+                "category": category,
+                "created_at": self._past(self.counts["log_days"]),
+                "usage_count": 0,
+                "common_units": self.rng.sample(_UNITS, 3),
+                "substitutes": [],
+                "allergen_info": {"contains": [allergen]} if allergen else {},
+                "_allergen": allergen,
+            }
+            self.ingredients_list.append(entry)
+
+    def ingredients(self):
+        # Emitted after recipes so usage_count reflects the generated recipes
+        for entry in self.ingredients_list:
+            doc = {k: v for k, v in entry.items() if not k.startswith("_")}
+            yield ("ingredients", entry["id"]), doc
+
+    def _recipe_body(self, name: str, serves: int):
+        picks = self.rng.sample(self.ingredients_list, min(len(self.ingredients_list), self.rng.randint(5, 14)))
+        lines, parsed = [], []
+        for ingredient in picks:
+            quantity = str(self.rng.choice([0.5, 1, 1.5, 2, 3, 4, 6, 8]) * max(1, serves // 8))
+            unit = self.rng.choice(_UNITS)
+            original = f"{quantity} {unit} {ingredient['normalized_name']}"
+            lines.append(original)
+            parsed.append({
+                "original": original,
+                "quantity": quantity,
+                "unit": unit,
+                "name": ingredient["normalized_name"],
+                "normalized_name": ingredient["normalized_name"],
+                "ingredient_id": ingredient["id"],
+            })
+            ingredient["usage_count"] += 1
+        steps = [
+            f"{i + 1}. {self.rng.choice(['Prep', 'Combine', 'Season', 'Cook', 'Simmer', 'Bake', 'Rest', 'Serve'])} "
+            f"the {self.rng.choice(picks)['normalized_name']} for {self.rng.randint(2, 45)} minutes."
+            for i in range(self.rng.randint(3, 8))
+        ]
+        allergens = sorted({i["_allergen"] for i in picks if i["_allergen"]})
+        return "\n".join(lines), "\n".join(steps), parsed, allergens
+
+    def recipes(self):
+        self.recipe_names = []
+        versions_left = max(1, self.counts["recipes"] // 10)
+        for _ in range(self.counts["recipes"]):
+            recipe_id = self._id("recipe")
+            name = f"{self.rng.choice(_DISH_STYLES)} {self.rng.choice(_DISH_FORMS)}"
+            if name in self.recipe_names:
+                name = f"{name} #{len(self.recipe_names)}"
+            serves = self.rng.choice([4, 6, 8, 12, 24, 50])
+            ingredients, instructions, parsed, allergens = self._recipe_body(name, serves)
+            created_at = self._past(self.counts["log_days"])
+            recipe = {
+                "id": recipe_id,
+                "name": name,
+                "ingredients": ingredients,
+                "instructions": instructions,
+                "special_version": "",
+                "image_url": None,
+                "tags": self.rng.sample(_TAGS, self.rng.randint(1, 4)),
+                "serves": serves,
+                "allergens": allergens,
+                "ingredients_parsed": True,
+                "created_by": self.rng.choice(self.user_ids),
+                "created_at": created_at,
+                "source_file_id": None,
+                "parsed_ingredients": parsed,
+                "ingredient_ids": sorted({p["ingredient_id"] for p in parsed}),
+                "parsed_at": created_at,
+            }
+            self.recipe_names.append(name)
+            yield ("recipes", recipe_id), recipe
+
+            if versions_left and self.rng.random() < 0.15:
+                versions_left -= 1
+                for label in self.rng.sample(_SPECIAL_VERSIONS, self.rng.randint(1, 2)):
+                    version_id = self._id("ver")
+                    yield ("recipes", recipe_id, "versions", version_id), dict(
+                        recipe,
+                        id=version_id,
+                        name=f"{name} ({label})",
+                        special_version=label,
+                        tags=sorted(set(recipe["tags"]) | {label}),
+                        parent_id=recipe_id,
+                        timestamp=created_at + timedelta(days=self.rng.randint(1, 60)),
+                        edited_by=self.rng.choice(self.user_ids),
+                    )
+
+    def events(self):
+        self.event_ids = []
+        shopping_per_event = self.counts["shopping_items"] / max(1, self.counts["events"])
+        active_chosen = False
+        for i in range(self.counts["events"]):
+            event_id = self._id("evt")
+            start = (self.anchor + timedelta(days=self.rng.randint(-self.counts["log_days"], 120))).date()
+            if i == 0:
+                start = self.anchor.date()  # always one event in progress
+            days = self.rng.randint(1, 4)
+            end = start + timedelta(days=days - 1)
+            if end < self.anchor.date():
+                status = self.rng.choice(["complete", "complete", "complete", "planning"])
+            elif start <= self.anchor.date():
+                status = "active"
+            else:
+                status = "planning"
+            guest_count = self.rng.choice([20, 35, 50, 80, 120, 200, 350])
+            created_by = self.rng.choice(self.user_ids)
+            event = {
+                "id": event_id,
+                "name": f"{self.rng.choice(_PLACES)} {self.rng.choice(_EVENT_KINDS)} {start.year}",
+                "created_by": created_by,
+                "created_at": datetime.combine(start, datetime.min.time()) - timedelta(days=self.rng.randint(14, 180)),
+                "status": status,
+                "version": self.rng.randint(1, 5),
+                "deleted": self.rng.random() < 0.03,
+                "guest_count": guest_count,
+                "staff_count": max(2, guest_count // 15),
+                "menu": [],
+                "shopping_list": [],
+                "equipment_list": [],
+                "start_date": start.isoformat(),
+                "end_date": end.isoformat(),
+                "location": self.rng.choice(_LOCATIONS),
+                "tags": self.rng.sample(_TAGS, self.rng.randint(0, 2)),
+            }
+            self.event_ids.append(event_id)
+            yield ("events", event_id), event
+
+            if status == "active" and not active_chosen:
+                active_chosen = True
+                yield ("config", "global"), {"active_event": event_id}
+
+            menu = []
+            for day in range(days):
+                for meal in _MEALS:
+                    recipe = self.rng.choice(self.recipe_names)
+                    menu.append({
+                        "day": f"Day {day + 1}",
+                        "meal": meal,
+                        "recipe": recipe,
+                        "notes": "",
+                        "allergens": [],
+                        "tags": [meal.title()],
+                    })
+                    menu_id = self._id("menu")
+                    yield ("menus", menu_id), {
+                        "id": menu_id,
+                        "name": recipe,
+                        "category": meal.title(),
+                        "description": f"{meal.title()} on day {day + 1}",
+                        "ingredients": "",
+                        "event_id": event_id,
+                        "created_by": created_by,
+                        "created_at": event["created_at"],
+                    }
+
+            allergy_ids = []
+            for _ in range(self.rng.choice([0, 0, 1, 2, 3, 5])):
+                allergy_id = self._id("allergy")
+                allergy_ids.append(allergy_id)
+                picks = self.rng.sample(self.ingredients_list, 2)
+                yield ("events", event_id, "allergies", allergy_id), {
+                    "id": allergy_id,
+                    "person_name": self._person(),
+                    "allergies": sorted({i["_allergen"] or i["name"] for i in picks}),
+                    "severity": self.rng.choice(_SEVERITIES),
+                    "ingredient_ids": [i["id"] for i in picks],
+                    "created_at": event["created_at"],
+                }
+
+            yield ("events", event_id, "meta", "event_file"), {
+                "menu": menu,
+                "notes": "",
+                "guest_count": guest_count,
+                "staff_count": event["staff_count"],
+                "allergens": [],
+                "event_id": event_id,
+                "last_updated": event["created_at"] + timedelta(days=self.rng.randint(0, 10)),
+                "updated_by": created_by,
+            }
+
+            for _ in range(int(shopping_per_event) + (1 if self.rng.random() < shopping_per_event % 1 else 0)):
+                item_id = self._id("shop")
+                ingredient = self.rng.choice(self.ingredients_list)
+                yield ("events", event_id, "shopping_items", item_id), {
+                    "id": item_id,
+                    "name": ingredient["name"],
+                    "quantity": str(self.rng.randint(1, 40)),
+                    "unit": self.rng.choice(_SHOP_UNITS),
+                    "category": self.rng.choice(_SHOP_CATEGORIES),
+                    "purchased": status == "complete" or self.rng.random() < 0.3,
+                    "created_at": event["created_at"],
+                }
+
+    def shopping_lists(self):
+        for _ in range(max(1, self.counts["events"] // 4)):
+            list_id = self._id("shoplist")
+            items = [
+                {"name": i["name"], "quantity": str(self.rng.randint(1, 20)), "unit": self.rng.choice(_SHOP_UNITS)}
+                for i in self.rng.sample(self.ingredients_list, min(len(self.ingredients_list), self.rng.randint(5, 30)))
+            ]
+            yield ("shopping_lists", list_id), {
+                "id": list_id,
+                "name": f"{self.rng.choice(_VENDORS)} run",
+                "items": items,
+                "tags": self.rng.sample(_TAGS, self.rng.randint(0, 2)),
+                "created_by": self.rng.choice(self.user_ids),
+                "created_at": self._past(self.counts["log_days"]),
+                "deleted": False,
+                "source_file": None,
+                "parsed_data": {},
+                "event_id": self.rng.choice(self.event_ids) if self.event_ids else None,
+            }
+
+    def receipts(self):
+        for _ in range(self.counts["receipts"]):
+            receipt_id = self._id("receipt")
+            items = [
+                {"name": i["name"], "quantity": str(self.rng.randint(1, 6)), "price": f"{self.rng.uniform(1.5, 60):.2f}"}
+                for i in self.rng.sample(self.ingredients_list, min(len(self.ingredients_list), self.rng.randint(2, 15)))
+            ]
+            total = sum(float(i["price"]) for i in items)
+            ai_parsed = self.rng.random() < 0.7
+            uploaded_at = self._past(self.counts["log_days"])
+            yield ("receipts", receipt_id), {
+                "id": receipt_id,
+                "filename": f"{receipt_id}.jpg",
+                "url": f"https://storage.example.com/receipts/{receipt_id}.jpg",
+                "uploaded_by": self.rng.choice(self.user_ids),
+                "uploaded_at": uploaded_at,
+                "vendor": self.rng.choice(_VENDORS),
+                "date": uploaded_at.strftime("%Y-%m-%d"),
+                "total": f"{total:.2f}",
+                "total_cents": round(total * 100),
+                "items": items,
+                "event_id": self.rng.choice(self.event_ids) if self.event_ids and self.rng.random() < 0.8 else None,
+                "shopping_list_id": None,
+                "equipment_id": None,
+                "notes": "",
+                "ai_parsed": ai_parsed,
+                "parsed_by": "ai" if ai_parsed else "manual",
+                "parse_confidence": "high" if self.rng.random() < 0.85 else "low",
+            }
+
+    def files(self):
+        for _ in range(self.counts["files"]):
+            file_id = self._id("file")
+            mimetype, ext = self.rng.choice(_FILE_TYPES)
+            name = f"{self.rng.choice(self.recipe_names).lower().replace(' ', '_').replace('#', '')}.{ext}"
+            event_id = self.rng.choice(self.event_ids) if self.event_ids and self.rng.random() < 0.5 else None
+            yield ("files", file_id), {
+                "id": file_id,
+                "name": name,
+                "size": self.rng.randint(2_000, 4_000_000),
+                "type": mimetype,
+                "uploaded_by": self.rng.choice(self.user_ids),
+                "event_id": event_id,
+                "linked_to": {"events": [event_id]} if event_id else {},
+                "created_at": self._past(self.counts["log_days"]),
+                "storage_path": f"uploads/{file_id}/{name}",
+                "public_url": f"https://storage.example.com/uploads/{file_id}/{name}",
+                "deleted": self.rng.random() < 0.05,
+                "raw_text": "",
+                "parsed_data": {},
+                "tags": self.rng.sample(_TAGS, self.rng.randint(0, 3)),
+            }
+
+    def logs(self):
+        daily: dict = {}
+        per_user: dict = {}
+        for day in range(self.counts["log_days"]):
+            date = self.anchor - timedelta(days=day + 1)
+            for _ in range(self.rng.randint(self.counts["logs_per_day"] // 2, self.counts["logs_per_day"])):
+                timestamp = date + timedelta(seconds=self.rng.randint(0, 86399))
+                user_id = self.rng.choice(self.user_ids)
+                action = self.rng.choice(_LOG_ACTIONS)
+                log = {"action": action, "user_id": user_id, "timestamp": timestamp, "details": {}}
+                yield ("logs", self._id("log")), log
+                if action in ("create_event", "edit_recipe", "update_menu"):
+                    yield ("audit_logs", self._id("audit")), log
+
+            for _ in range(self.rng.randint(0, max(1, self.counts["logs_per_day"] // 3))):
+                template, category = self.rng.choice(_AI_QUERIES)
+                user_id = self.rng.choice(self.user_ids)
+                prompt_tokens = self.rng.randint(300, 2_500)
+                completion_tokens = self.rng.randint(80, 700)
+                created_at = date + timedelta(seconds=self.rng.randint(0, 86399))
+                yield ("ai_logs", self._id("ailog")), {
+                    "query": template.format(n=self.rng.choice([20, 50, 120])),
+                    "response": "Synthetic response.",
+                    "user_id": user_id,
+                    "user_role": "user",
+                    "category": category,
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "created_at": created_at,
+                    "event_id": self.rng.choice(self.event_ids) if self.event_ids else None,
+                }
+                day_key = created_at.strftime("%Y-%m-%d")
+                user_key = counter_key(user_id)
+                entry = daily.setdefault(day_key, {"date": day_key, "queries": 0, "prompt_tokens": 0,
+                                                   "completion_tokens": 0, "categories": {}, "users": {}})
+                entry["queries"] += 1
+                entry["prompt_tokens"] += prompt_tokens
+                entry["completion_tokens"] += completion_tokens
+                entry["categories"][category] = entry["categories"].get(category, 0) + 1
+                user_entry = entry["users"].setdefault(user_key, {"queries": 0, "tokens": 0})
+                user_entry["queries"] += 1
+                user_entry["tokens"] += prompt_tokens + completion_tokens
+                totals = per_user.setdefault(user_key, {"queries": 0, "prompt_tokens": 0,
+                                                        "completion_tokens": 0, "categories": {}})
+                totals["queries"] += 1
+                totals["prompt_tokens"] += prompt_tokens
+                totals["completion_tokens"] += completion_tokens
+                totals["categories"][category] = totals["categories"].get(category, 0) + 1
+
+        # AI usage counters, as log_conversation would have incremented them
+        for day_key, entry in daily.items():
+            yield ("ai_usage_daily", day_key), entry
+        for user_key, totals in per_user.items():
+            yield ("ai_usage_users", user_key), totals
+
+    def documents(self):
+        yield from self.users()
+        self._build_ingredients()
+        yield from self.recipes()
+        yield from self.ingredients()
+        yield from self.events()
+        yield from self.shopping_lists()
+        yield from self.receipts()
+        yield from self.files()
+        yield from self.logs()
+
+
+def scale_counts(scale: str = "small", **overrides) -> dict:
+    """Document counts for a named scale, with per-key overrides."""
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale '{scale}' (choose from {', '.join(SCALES)})")
+    counts = dict(SCALES[scale])
+    counts.update({k: v for k, v in overrides.items() if v is not None})
+    return counts
+
+
+def generate_dataset(scale: str = "small", seed: int = 42, anchor: datetime | None = None, **overrides):
+    """Yield ``(path, data)`` for every document of a dataset.
+
+    ``path`` alternates collection and document ids, e.g.
+    ``("events", "evt_1a2b3c4d", "meta", "event_file")``. Documents are
+    produced lazily, so large scales never sit in memory all at once.
+    """
+    counts = scale_counts(scale, **overrides)
+    yield from _Generator(counts, seed, anchor or DEFAULT_ANCHOR).documents()
+
+# ----------------------------
+# 📥 Bulk Loading
+# ----------------------------
+
+def _doc_ref(db, path: tuple):
+    ref = db.collection(path[0]).document(path[1])
+    for i in range(2, len(path), 2):
+        ref = ref.collection(path[i]).document(path[i + 1])
+    return ref
+
+
+def rebuild_summaries() -> dict:
+    """Recompute rollups, summaries and the tag index from loaded data."""
+    from events import rebuild_event_summary
+    from file_storage import reconcile_file_stats
+    from receipts import rebuild_receipt_rollups
+    from tag_utils import rebuild_tag_index
+
+    return {
+        "event_summary": rebuild_event_summary(),
+        "receipt_rollups": rebuild_receipt_rollups(),
+        "file_stats": len(reconcile_file_stats()),
+        "tag_index": rebuild_tag_index(),
+    }
+
+
+def load_dataset(
+    db=None,
+    scale: str = "small",
+    seed: int = 42,
+    anchor: datetime | None = None,
+    batch_size: int = BULK_BATCH_SIZE,
+    rebuild: bool = True,
+    progress=None,
+    **overrides,
+) -> dict:
+    """Write a generated dataset with bulk batches; returns per-collection counts.
+
+    ``db`` defaults to firebase_init.get_db(). Summary documents are only
+    rebuilt when loading into that same client, since the rebuild helpers
+    read through it. ``progress(written)`` is called after each commit.
+    """
+    from firebase_init import get_db
+
+    target = db or get_db()
+    counts: dict = {}
+    batch, pending, written = target.batch(), 0, 0
+    for path, data in generate_dataset(scale, seed, anchor, **overrides):
+        batch.set(_doc_ref(target, path), data)
+        collection = "/".join(path[::2])
+        counts[collection] = counts.get(collection, 0) + 1
+        pending += 1
+        if pending >= batch_size:
+            batch.commit()
+            written += pending
+            batch, pending = target.batch(), 0
+            if progress:
+                progress(written)
+    if pending:
+        batch.commit()
+        written += pending
+        if progress:
+            progress(written)
+
+    if rebuild and target is get_db():
+        counts["_summaries"] = rebuild_summaries()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate and load a synthetic Mountain Medicine dataset.")
+    parser.add_argument("--scale", default="small", choices=sorted(SCALES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", default=None, help="YYYY-MM-DD the data is generated up to, or 'today'")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    parser.add_argument("--no-rebuild", action="store_true", help="skip rebuilding summaries and rollups")
+    for key in SCALES["small"]:
+        parser.add_argument(f"--{key.replace('_', '-')}", type=int, default=None, dest=key)
+    args = parser.parse_args(argv)
+
+    if args.anchor == "today":
+        anchor = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    else:
+        anchor = datetime.fromisoformat(args.anchor) if args.anchor else None
+    overrides = {key: getattr(args, key) for key in SCALES["small"]}
+
+    start = time.perf_counter()
+    counts = load_dataset(
+        scale=args.scale,
+        seed=args.seed,
+        anchor=anchor,
+        batch_size=min(args.batch_size, 500),
+        rebuild=not args.no_rebuild,
+        progress=lambda n: print(f"  {n:,} documents written", end="\r"),
+        **overrides,
+    )
+    summaries = counts.pop("_summaries", None)
+    print(f"\n✅ Loaded {sum(counts.values()):,} documents in {time.perf_counter() - start:.1f}s")
+    for collection, count in sorted(counts.items()):
+        print(f"  {collection}: {count:,}")
+    if summaries:
+        print(f"  rebuilt: {summaries}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+🗂️ Tab registry
+Maps each top-nav tab to the module and function that renders it:
+- A tab's module is imported the first time the tab is shown, so a cold
+  start only pays for the app shell (auth, layout, dashboard) instead of
+  every tab and the parsing / OCR / AI libraries behind them
+- First imports are timed as "import" tracing spans (MM_TRACE=1)
+
+    python benchmarks.py --imports   # cold import time per tab module
+"""
+
+import importlib
+import sys
+import time
+
+from tracing import span
+
+# Tab name -> (module, entry point). "Upload" also uses upload.py and
+# file_storage.show_file_analytics; "Admin Panel" is role-checked in app.py.
+TAB_ENTRY_POINTS = {
+    "Dashboard": ("dashboard", "render_dashboard"),
+    "Events": ("events", "enhanced_event_ui"),
+    "Recipes": ("recipes", "recipes_page"),
+    "Ingredients": ("ingredients", "ingredient_catalogue_ui"),
+    "Allergies": ("allergies", "allergy_management_ui"),
+    "Historical Menus": ("historical_menus", "historical_menus_ui"),
+    "Upload": ("file_storage", "file_manager_ui"),
+    "Receipts": ("receipts", "receipt_upload_ui"),
+    "Admin Panel": ("roles", "role_admin_ui"),
+    "Assistant": ("ai_chat", "ai_chat_ui"),
+}
+
+# Seconds spent on each module's first import in this process
+import_times: dict = {}
+
+
+def import_tab_module(module: str):
+    """Import a tab module, timing (and tracing) the first import."""
+    loaded = sys.modules.get(module)
+    if loaded is not None:
+        return loaded
+    start = time.perf_counter()
+    with span(f"import {module}", "import"):
+        loaded = importlib.import_module(module)
+    import_times.setdefault(module, time.perf_counter() - start)
+    return loaded
+
+
+def lazy_tab(module: str, attr: str):
+    """An entry point that imports ``module`` on its first call."""
+    def render(*args, **kwargs):
+        return getattr(import_tab_module(module), attr)(*args, **kwargs)
+    render.__name__ = render.__qualname__ = attr
+    return render
+
+
+def load_tab(tab: str):
+    """The render function for a registered tab name."""
+    return lazy_tab(*TAB_ENTRY_POINTS[tab])
@@ -1,8 +1,15 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
 import streamlit as st
 import networkx as nx
 from pyvis.network import Network
-from firebase_admin import firestore
+from firebase_init import get_db
 from utils import session_get
+from tag_utils import TAGGED_COLLECTIONS, get_tag_index_entry
+from metrics import observe_cache
 
 # ------------------------------
 # 🔍 UI Entry Point
@@ -29,39 +36,84 @@ def tag_explorer_ui():
 # 📊 Tag Usage Collector
 # ------------------------------
 def _get_tag_usage(tag: str) -> dict:
-    db = firestore.client()
-    tag_data = {
-        "events": [],
-        "recipes": [],
-        "files": [],
-        "shopping_lists": [],
-        "equipment_lists": [],
-        "receipts": []
-    }
+    """Return {collection: [compact refs]} for a tag.
+
+    Uses the tag_index (one batched read of the tag's entry and ``_meta``)
+    once it has been built; until then the six collection queries run
+    concurrently and only fetch the name fields.
+    """
+    indexed = get_tag_index_entry(tag)
+    if indexed is not None:
+        return indexed
+    return _query_tag_usage(tag)
 
-    collections = {
-        "events": "events",
-        "recipes": "recipes",
-        "files": "files",
-        "shopping_lists": "shopping_lists",
-        "equipment_lists": "equipment_lists",
-        "receipts": "receipts"
-    }
 
-    for key, collection in collections.items():
+def _query_tag_usage(tag: str) -> dict:
+    from concurrent.futures import ThreadPoolExecutor
+
+    db = get_db()
+
+    def _lookup(collection):
         try:
-            docs = db.collection(collection).where("tags", "array_contains", tag).stream()
-            tag_data[key] = [doc.to_dict() | {"id": doc.id} for doc in docs]
+            docs = (
+                db.collection(collection)
+                .where("tags", "array_contains", tag)
+                .select(["name", "title", "deleted"])
+                .stream()
+            )
+            return [
+                {"type": collection, "id": doc.id, "name": d.get("name") or d.get("title") or doc.id}
+                for doc in docs
+                for d in [doc.to_dict()]
+                if not d.get("deleted")
+            ]
         except Exception:
-            tag_data[key] = []  # Silently skip if collection missing or malformed
+            return []  # Silently skip if collection missing or malformed
 
-    return tag_data
+    with ThreadPoolExecutor(max_workers=len(TAGGED_COLLECTIONS)) as pool:
+        results = pool.map(_lookup, TAGGED_COLLECTIONS)
+        return dict(zip(TAGGED_COLLECTIONS, results))
 
 
 # ------------------------------
 # 🕸️ Tag Constellation Graph
 # ------------------------------
+
+# Rendered graph HTML keyed by (tag, usage version), least recently used first
+GRAPH_CACHE_SIZE = 64
+_graph_cache: OrderedDict = OrderedDict()
+_graph_cache_lock = threading.Lock()
+
+
+def _usage_version(tag_data: dict) -> str:
+    """Fingerprint of the tag's references; changes whenever the index does."""
+    refs = sorted(
+        (category, entry.get("id") or "", entry.get("name") or entry.get("title") or "")
+        for category, items in tag_data.items()
+        for entry in items
+    )
+    return hashlib.sha1(json.dumps(refs).encode("utf-8")).hexdigest()
+
+
 def _render_constellation(tag: str, tag_data: dict):
+    key = (tag.strip().lower(), _usage_version(tag_data))
+    with _graph_cache_lock:
+        html = _graph_cache.get(key)
+        if html is not None:
+            _graph_cache.move_to_end(key)
+    observe_cache("tag_graph", html is not None)
+
+    if html is None:
+        html = _build_constellation_html(tag, tag_data)
+        with _graph_cache_lock:
+            _graph_cache[key] = html
+            while len(_graph_cache) > GRAPH_CACHE_SIZE:
+                _graph_cache.popitem(last=False)
+
+    st.components.v1.html(html, height=620, scrolling=False)
+
+
+def _build_constellation_html(tag: str, tag_data: dict) -> str:
     G = nx.Graph()
     main_node = tag
     G.add_node(main_node, size=25, title=f"Tag: {tag}")
@@ -85,7 +137,7 @@ def _render_constellation(tag: str, tag_data: dict):
 
     # Add usage summary node
     usage_summary = "<br>".join([
-        f"{category_labels[k]}s: {len(v)}"
+        f"{category_labels.get(k, k.title())}s: {len(v)}"
         for k, v in tag_data.items() if v
     ])
     G.nodes[main_node]['title'] += "<br><br>" + usage_summary
@@ -94,7 +146,5 @@ def _render_constellation(tag: str, tag_data: dict):
     net.from_nx(G)
     net.repulsion(node_distance=220, spring_length=220)
 
-    net.save_graph("tag_graph.html")
-    with open("tag_graph.html", "r", encoding="utf-8") as f:
-        html = f.read()
-        st.components.v1.html(html, height=620, scrolling=False)
+    # Render in memory; no shared tag_graph.html between sessions
+    return net.generate_html(notebook=False)
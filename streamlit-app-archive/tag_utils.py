@@ -1,14 +1,12 @@
+import hashlib
+
 import streamlit as st
-try:
-    from openai import OpenAI
-    client = OpenAI(api_key=st.secrets["openai"]["api_key"])
-except Exception:
-    client = None
+from llm_gateway import chat_completion, llm_available
 
 
 def suggest_recipe_tags(name: str, ingredients: str, instructions: str, special_version: str = "") -> list[str]:
     """Use OpenAI to suggest tags for a recipe."""
-    if not client:
+    if not llm_available():
         return []
     prompt = (
         "Suggest concise tags for the following recipe. "
@@ -16,7 +14,8 @@ def suggest_recipe_tags(name: str, ingredients: str, instructions: str, special_
         f"Title: {name}\nSpecial Version: {special_version}\nIngredients: {ingredients}\nInstructions: {instructions[:500]}"
     )
     try:
-        res = client.chat.completions.create(
+        res = chat_completion(
+            "recipe_tags",
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.2,
@@ -27,3 +26,141 @@ def suggest_recipe_tags(name: str, ingredients: str, instructions: str, special_
     except Exception as e:
         st.warning(f"Tag suggestion failed: {e}")
         return []
+
+
+# ----------------------------
+# 🗂️ Tag Index
+# ----------------------------
+
+# tag_index/<tag_key> holds compact references to everything carrying a tag:
+#   {"tag": "vegan", "refs": {"recipes__abc": {"type": "recipes", "id": "abc", "name": "..."}}}
+# tag_key is the sha1 of the normalized tag, so every distinct tag ("café",
+# "gluten-free", "gluten free") gets its own entry; the readable tag lives in
+# the doc. tag_index/_meta records whether the index has been fully built,
+# and with which key format.
+# Every writer of a TAGGED_COLLECTIONS document calls update_tag_index (events
+# via _write_event_txn, receipts via their save/delete transactions); deleted
+# documents are dropped from the index. equipment_lists has no in-app writer,
+# so only rebuild_tag_index touches it.
+TAG_INDEX_COLLECTION = "tag_index"
+TAGGED_COLLECTIONS = ["events", "recipes", "files", "shopping_lists", "equipment_lists", "receipts"]
+# Bumped when tag_key changes; an index built with another format is ignored
+# until rebuilt
+TAG_KEY_FORMAT = "sha1"
+
+
+def normalize_tag(tag) -> str:
+    return str(tag).strip().lower()
+
+
+def tag_key(tag) -> str:
+    """Collision-free index doc ID for a tag."""
+    return hashlib.sha1(normalize_tag(tag).encode("utf-8")).hexdigest()
+
+
+def _index_built(meta: dict | None) -> bool:
+    return bool(meta and meta.get("built") and meta.get("key_format") == TAG_KEY_FORMAT)
+
+
+def _ref_key(entity_type: str, entity_id: str) -> str:
+    return f"{entity_type}__{entity_id}"
+
+
+def update_tag_index(entity_type: str, entity_id: str, name: str, tags, previous_tags=None, writer=None) -> None:
+    """Add/refresh references for ``tags`` and drop them for removed tags.
+
+    Call after writing a tagged document. ``writer`` may be a batch or
+    transaction to make the index update part of the same write.
+    """
+    from firebase_init import db, firestore
+
+    new_keys = {tag_key(t): t for t in (tags or []) if str(t).strip()}
+    old_keys = {tag_key(t) for t in (previous_tags or []) if str(t).strip()}
+    ref_key = _ref_key(entity_type, entity_id)
+    index = db.collection(TAG_INDEX_COLLECTION)
+    own_batch = writer is None
+    writer = writer or db.batch()
+
+    for key, label in new_keys.items():
+        writer.set(index.document(key), {
+            "tag": normalize_tag(label),
+            "refs": {ref_key: {"type": entity_type, "id": entity_id, "name": name or entity_id}},
+        }, merge=True)
+    for key in old_keys - set(new_keys):
+        writer.set(index.document(key), {"refs": {ref_key: firestore.DELETE_FIELD}}, merge=True)
+
+    if own_batch and (new_keys or old_keys):
+        writer.commit()
+
+
+def tag_index_ready() -> bool:
+    from firebase_init import db
+    doc = db.collection(TAG_INDEX_COLLECTION).document("_meta").get()
+    return doc.exists and _index_built(doc.to_dict())
+
+
+def get_tag_index_entry(tag: str) -> dict | None:
+    """Return {type: [refs]} for a tag from the index, or None if unbuilt.
+
+    One batched read of two documents: the tag's entry and ``_meta``.
+    """
+    from firebase_init import db
+    snaps = db.get_all([
+        db.collection(TAG_INDEX_COLLECTION).document(tag_key(tag)),
+        db.collection(TAG_INDEX_COLLECTION).document("_meta"),
+    ])
+    entry, built = {}, False
+    for snap in snaps:
+        if snap.id == "_meta":
+            built = snap.exists and _index_built(snap.to_dict())
+        elif snap.exists:
+            entry = snap.to_dict()
+    if not built:
+        return None
+    grouped = {c: [] for c in TAGGED_COLLECTIONS}
+    for ref in (entry.get("refs") or {}).values():
+        grouped.setdefault(ref.get("type"), []).append(ref)
+    return grouped
+
+
+def rebuild_tag_index() -> int:
+    """Batch job: rebuild tag_index from every tagged collection.
+
+    Returns the number of tags indexed.
+    """
+    from firebase_init import db
+
+    index: dict[str, dict] = {}
+    for collection in TAGGED_COLLECTIONS:
+        for doc in db.collection(collection).select(["tags", "name", "title", "deleted"]).stream():
+            data = doc.to_dict()
+            if data.get("deleted"):
+                continue
+            tags = data.get("tags") or []
+            if not isinstance(tags, list):
+                continue
+            name = data.get("name") or data.get("title") or doc.id
+            for tag in tags:
+                if not str(tag).strip():
+                    continue
+                entry = index.setdefault(tag_key(tag), {"tag": normalize_tag(tag), "refs": {}})
+                entry["refs"][_ref_key(collection, doc.id)] = {"type": collection, "id": doc.id, "name": name}
+
+    coll = db.collection(TAG_INDEX_COLLECTION)
+    batch, pending = db.batch(), 0
+    for doc in coll.select([]).stream():
+        if doc.id != "_meta" and doc.id not in index:
+            batch.delete(doc.reference)
+            pending += 1
+    for key, entry in index.items():
+        batch.set(coll.document(key), entry)
+        pending += 1
+        if pending >= 400:
+            batch.commit()
+            batch, pending = db.batch(), 0
+    from datetime import datetime
+    batch.set(coll.document("_meta"), {
+        "built": True, "built_at": datetime.utcnow(), "tags": len(index), "key_format": TAG_KEY_FORMAT,
+    })
+    batch.commit()
+    return len(index)
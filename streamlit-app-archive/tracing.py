@@ -0,0 +1,176 @@
+"""
+🧵 Tracing
+Nested timing spans showing where a rerun's wall time goes:
+- One root span per rerun, with handle_auth and the tab render inside it
+- A span for every Firestore call (via the firestore_profiler wrapper),
+  every LLM call (llm_gateway) and every text-extraction / OCR step
+- Exported in the Chrome trace event format; open the files in
+  https://ui.perfetto.dev or chrome://tracing
+
+Enable with MM_TRACE=1. Each process appends to its own file in
+MM_TRACE_DIR (default .cache/traces next to this module), starting a
+new one past MM_TRACE_MAX_BYTES. Spans are buffered in memory and
+written when a rerun finishes.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+TRACING = os.getenv("MM_TRACE", "0") == "1"
+TRACE_DIR = os.getenv("MM_TRACE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "traces"))
+TRACE_MAX_BYTES = int(os.getenv("MM_TRACE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+_PID = os.getpid()
+_events: list = []
+# Thread id -> name; every trace file starts with a thread_name event for each
+_thread_names: dict = {}
+_buffer_lock = threading.Lock()
+_file_lock = threading.Lock()
+_trace_file = {"path": None, "size": 0}
+
+# ----------------------------
+# ⏱️ Spans
+# ----------------------------
+
+def _us(seconds: float) -> int:
+    return int(seconds * 1_000_000)
+
+
+def record_span(name: str, category: str, start: float, end: float, args: dict | None = None) -> None:
+    """Record a finished span; ``start``/``end`` are time.perf_counter() values."""
+    if not TRACING:
+        return
+    thread = threading.current_thread()
+    event = {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": _us(start),
+        "dur": max(0, _us(end) - _us(start)),
+        "pid": _PID,
+        "tid": thread.ident,
+    }
+    if args:
+        event["args"] = {k: v if isinstance(v, (int, float, bool, str)) or v is None else str(v) for k, v in args.items()}
+    with _buffer_lock:
+        if _thread_names.get(thread.ident) != thread.name:
+            _thread_names[thread.ident] = thread.name
+            _events.append(_thread_name_event(thread.ident, thread.name))
+        _events.append(event)
+
+
+def _thread_name_event(tid: int, name: str) -> dict:
+    return {"name": "thread_name", "ph": "M", "pid": _PID, "tid": tid, "args": {"name": name}}
+
+
+@contextmanager
+def span(name: str, category: str = "app", **args):
+    """Time the enclosed block; the yielded dict can be filled with extra span args."""
+    if not TRACING:
+        yield args
+        return
+    start = time.perf_counter()
+    try:
+        yield args
+    except Exception as e:
+        args["error"] = type(e).__name__
+        raise
+    finally:
+        record_span(name, category, start, time.perf_counter(), args)
+
+
+def traced(name: str | None = None, category: str = "app"):
+    """Decorator form of ``span``; the span is named after the function by default."""
+    def decorate(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not TRACING:
+                return fn(*args, **kwargs)
+            with span(span_name, category):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# ----------------------------
+# 💾 Export
+# ----------------------------
+
+def _open_trace_file() -> str:
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    path = os.path.join(TRACE_DIR, f"trace-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{_PID}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+    _trace_file.update(path=path, size=1)
+    return path
+
+
+def flush_traces() -> str | None:
+    """Append buffered spans to the trace file; returns its path.
+
+    The file is a JSON array whose closing bracket is written at exit;
+    trace viewers accept it without one, so a crashed process still
+    leaves a readable trace.
+    """
+    with _buffer_lock:
+        events = _events[:]
+        _events.clear()
+        thread_names = dict(_thread_names)
+    if not events:
+        return _trace_file["path"]
+    try:
+        with _file_lock:
+            if _trace_file["path"] is None or _trace_file["size"] > TRACE_MAX_BYTES:
+                _close_trace_file()
+                _open_trace_file()
+                # A new file names every thread seen so far, not just new ones
+                events = [_thread_name_event(tid, name) for tid, name in thread_names.items()] + [
+                    e for e in events if e["ph"] != "M"
+                ]
+            chunk = ",\n".join(json.dumps(e, separators=(",", ":")) for e in events)
+            chunk = ("\n" if _trace_file["size"] == 1 else ",\n") + chunk
+            with open(_trace_file["path"], "a", encoding="utf-8") as f:
+                f.write(chunk)
+            _trace_file["size"] += len(chunk)
+            return _trace_file["path"]
+    except OSError as e:
+        print(f"⚠️ Could not write trace: {e}")
+        return None
+
+
+def _close_trace_file() -> None:
+    if _trace_file["path"]:
+        with open(_trace_file["path"], "a", encoding="utf-8") as f:
+            f.write("\n]\n")
+        _trace_file.update(path=None, size=0)
+
+
+@atexit.register
+def _finish():
+    if TRACING:
+        flush_traces()
+        with _file_lock:
+            _close_trace_file()
+
+
+@contextmanager
+def trace_rerun(label=lambda: ""):
+    """Root span for one Streamlit rerun; spans are written when it ends."""
+    if not TRACING:
+        yield None
+        return
+    start = time.perf_counter()
+    args = {}
+    try:
+        yield args
+    finally:
+        args["tab"] = label() if callable(label) else label
+        record_span(f"rerun {args['tab']}".strip(), "rerun", start, time.perf_counter(), args)
+        flush_traces()
@@ -5,6 +5,7 @@ from auth import get_user_id
 from shopping_lists import create_shopping_list
 from datetime import datetime
 from recipes import save_menu_to_firestore
+from events import create_event
 from ai_parsing_engine import is_meaningful_recipe
 
 # ----------------------------
@@ -89,14 +90,13 @@ def show_save_file_actions(upload_info: dict):
 
     with col_event:
         if st.button("📅 Save as Event", key=f"save_as_event_{file_id}"):
-            event_doc = {
+            event_id = create_event({
                 "name": uploaded_name,
                 "source_file": file_id,
-                "created_at": datetime.utcnow().isoformat(),
                 "parsed_data": parsed,
-            }
-            db.collection("events").document().set(event_doc)
-            st.success("✅ File saved as Event")
+            }, get_user_id())
+            if event_id:
+                st.success("✅ File saved as Event")
 
     with col_menu:
         if st.button("📖 Save as Menu", key=f"save_as_menu_{file_id}"):
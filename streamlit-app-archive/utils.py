@@ -290,6 +290,29 @@ def normalize_recipe_quantities(data):
             normalize_recipe_quantities(item)
     return data
 
+# ----------------------------
+# 💵 Money Helpers
+# ----------------------------
+
+def parse_money_cents(value) -> int:
+    """Convert '$1,234.56', '12.5' or 12.5 into integer cents (0 if unparseable)."""
+    if value is None or value == "":
+        return 0
+    if isinstance(value, (int, float)):
+        return int(round(value * 100))
+    text = str(value).strip().replace("$", "").replace(",", "").replace(" ", "")
+    negative = text.startswith("-") or text.endswith("-") or (text.startswith("(") and text.endswith(")"))
+    text = text.strip("-()")
+    try:
+        cents = int(round(float(text) * 100))
+    except ValueError:
+        return 0
+    return -cents if negative else cents
+
+def format_cents(cents) -> str:
+    """Format integer cents as '$1,234.56'."""
+    return f"${(cents or 0) / 100:,.2f}"
+
 # ----------------------------
 # 📝 Convert Parsed Values
 # ----------------------------